@@ -11,8 +11,8 @@ import time
 import requests
 import tempfile
 import base64
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union
 from PIL import Image
 from io import BytesIO
 from langchain_core.messages import HumanMessage
@@ -31,6 +31,13 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Pool for re-encoding decoded frames (PIL's JPEG encoder releases the GIL,
+# so threads scale across cores without pickling images to a process pool)
+_ENCODE_POOL = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix='jpeg-encode'
+)
+
 
 class RecipeAnalyzer:
     """Analyzes video frames using Gemini Vision to extract recipe data"""
@@ -154,16 +161,19 @@ class RecipeAnalyzer:
                 "Please configure at least one of: GEMINI_API_KEYS, GROK_API_KEYS, OPENAI_API_KEYS"
             )
 
-    def _image_to_base64(self, image: Image.Image) -> str:
+    def _image_to_base64(self, image: Union[Image.Image, bytes]) -> str:
         """
         Convert PIL Image to base64 string for LangChain
 
         Args:
-            image: PIL Image object
+            image: PIL Image object, or already-encoded JPEG bytes (sent as-is)
 
         Returns:
             Base64-encoded image string with data URI prefix
         """
+        if isinstance(image, bytes):
+            return f"data:image/jpeg;base64,{base64.b64encode(image).decode()}"
+
         buffered = BytesIO()
         # Convert to RGB if needed (handle RGBA, grayscale, etc.)
         if image.mode not in ('RGB', 'L'):
@@ -172,12 +182,18 @@ class RecipeAnalyzer:
         img_str = base64.b64encode(buffered.getvalue()).decode()
         return f"data:image/jpeg;base64,{img_str}"
 
-    def _call_llm_api_with_retry(self, images: List[Image.Image], is_single_image: bool = False) -> Dict[str, Any]:
+    def _call_llm_api_with_retry(
+        self,
+        images: List[Union[Image.Image, bytes]],
+        is_single_image: bool = False
+    ) -> Dict[str, Any]:
         """
         Call LLM API with retry mechanism (supports multiple providers)
 
+        All images go into a single multi-image request.
+
         Args:
-            images: List of PIL Image objects
+            images: List of PIL Image objects or encoded JPEG bytes
             is_single_image: True if analyzing single product photo (requires inference)
 
         Returns:
@@ -186,6 +202,18 @@ class RecipeAnalyzer:
         Raises:
             Exception: If all retry attempts fail
         """
+        # Convert images to base64 once (reused across retries); decoded
+        # images are re-encoded in parallel, encoded bytes need no pool
+        needs_encoding = sum(not isinstance(img, bytes) for img in images)
+        if needs_encoding > 1:
+            urls = list(_ENCODE_POOL.map(self._image_to_base64, images))
+        else:
+            urls = [self._image_to_base64(img) for img in images]
+        image_contents = [
+            {"type": "image_url", "image_url": {"url": url}}
+            for url in urls
+        ]
+
         @retry(
             stop=stop_after_attempt(self.max_retries),
             wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -198,12 +226,6 @@ class RecipeAnalyzer:
         def _api_call():
             start_time = time.time()
             try:
-                # Convert images to base64
-                image_contents = [
-                    {"type": "image_url", "image_url": {"url": self._image_to_base64(img)}}
-                    for img in images
-                ]
-
                 # Select prompt based on image count
                 if is_single_image:
                     prompt_text = self.SYSTEM_PROMPT + self.SINGLE_IMAGE_ADDITIONAL_PROMPT
@@ -336,14 +358,14 @@ class RecipeAnalyzer:
 
     def analyze_frames(
         self,
-        frame_paths: List[str],
+        frame_paths: List[Union[str, bytes]],
         thumbnail_url: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Analyze video frames to extract recipe information
 
         Args:
-            frame_paths: List of paths to frame images
+            frame_paths: List of paths to frame images, or encoded image bytes
             thumbnail_url: Optional URL or path to video thumbnail/cover image
                           If provided, this will be inserted as the first image for analysis
 
@@ -371,8 +393,11 @@ class RecipeAnalyzer:
                 else:
                     logger.warning(f"Failed to load thumbnail, proceeding with frames only")
 
-            # Load video frames
+            # Load video frames (in-memory JPEG frames are sent without decoding)
             for frame_path in frame_paths:
+                if isinstance(frame_path, bytes):
+                    images.append(frame_path)
+                    continue
                 try:
                     img = Image.open(frame_path)
                     images.append(img)
@@ -428,6 +453,8 @@ class RecipeAnalyzer:
         finally:
             # CRITICAL: Close all PIL Image objects to free file handles and memory
             for img in images:
+                if isinstance(img, bytes):
+                    continue
                 try:
                     img.close()
                 except Exception as e:
@@ -531,7 +558,7 @@ class RecipeAnalyzer:
 
 # Convenience function for single-use analysis
 def analyze_recipe_from_frames(
-    frame_paths: List[str],
+    frame_paths: List[Union[str, bytes]],
     api_key: Optional[str] = None,
     thumbnail_url: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -539,7 +566,7 @@ def analyze_recipe_from_frames(
     Analyze recipe from video frames
 
     Args:
-        frame_paths: List of frame image paths
+        frame_paths: List of frame image paths, or encoded image bytes
         api_key: DEPRECATED - API keys are now managed via environment variables
         thumbnail_url: Optional URL or path to video thumbnail/cover image
 
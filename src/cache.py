@@ -0,0 +1,127 @@
+"""
+Recipe Response Cache
+Caches URL analysis results so repeated URLs skip download, FFmpeg and LLM calls
+
+Uses Redis when REDIS_URL is configured (shared across workers), otherwise an
+in-process TTL cache. Both store JSON text, so callers never share dicts.
+"""
+import json
+import logging
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+try:
+    from .config import REDIS_URL, RECIPE_CACHE_TTL_SECONDS
+except ImportError:
+    from config import REDIS_URL, RECIPE_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Entries kept by the in-process fallback (each is one recipe JSON)
+MEMORY_CACHE_MAX_ENTRIES = 256
+
+
+def _cache_key(video_url: str) -> str:
+    """Cache key for a video URL"""
+    return f"recipe:{hashlib.blake2b(video_url.encode(), digest_size=16).hexdigest()}"
+
+
+class RecipeCache:
+    """Caches recipe analysis results by video URL"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = REDIS_URL,
+        ttl_seconds: int = RECIPE_CACHE_TTL_SECONDS
+    ):
+        """
+        Initialize recipe cache
+
+        Args:
+            redis_url: Redis connection URL (None for in-process cache only)
+            ttl_seconds: How long cached results stay valid
+        """
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple] = OrderedDict()
+        self._redis = None
+
+        if redis_url and redis_asyncio is not None:
+            self._redis = redis_asyncio.from_url(redis_url)
+            logger.info("Recipe cache: using Redis")
+        elif redis_url:
+            logger.warning("⚠️  REDIS_URL set but redis package not installed, using in-process cache")
+
+    async def get(self, video_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached result for a video URL
+
+        Args:
+            video_url: Analyzed video URL (or canonical video id)
+
+        Returns:
+            Cached recipe data, or None on a miss
+        """
+        key = _cache_key(video_url)
+
+        if self._redis is not None:
+            try:
+                cached = await self._redis.get(key)
+                return json.loads(cached) if cached else None
+            except Exception as e:
+                logger.warning("Redis get failed, falling back to in-process cache: %s", e)
+
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return json.loads(value)
+
+    async def set(self, video_url: str, value: Dict[str, Any]) -> None:
+        """
+        Cache result for a video URL
+
+        Args:
+            video_url: Analyzed video URL (or canonical video id)
+            value: Recipe data (JSON-serializable)
+        """
+        key = _cache_key(video_url)
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, json.dumps(value), ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                logger.warning("Redis set failed, falling back to in-process cache: %s", e)
+
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, json.dumps(value))
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_CACHE_MAX_ENTRIES:
+            self._memory.popitem(last=False)
+
+    async def close(self) -> None:
+        """Close the Redis connection pool (if any)"""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+# Global instance (shares one Redis connection pool per worker)
+_cache: Optional[RecipeCache] = None
+
+
+def get_recipe_cache() -> RecipeCache:
+    """Get or create global recipe cache"""
+    global _cache
+    if _cache is None:
+        _cache = RecipeCache()
+    return _cache
@@ -40,6 +40,8 @@ PORT = int(os.getenv('PORT', 8000))
 
 # Worker configuration
 UVICORN_WORKERS = int(os.getenv('UVICORN_WORKERS', 0))  # 0 means auto-detect
+WORKER_MEMORY_MB = int(os.getenv('WORKER_MEMORY_MB', 350))  # Budgeted RSS per worker when sizing the pool
+THREADPOOL_SIZE = int(os.getenv('THREADPOOL_SIZE', 40))  # Threads for blocking analysis work per worker
 
 # CORS configuration
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*')
@@ -48,9 +50,23 @@ ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*')
 PROCESSOR_MODE = os.getenv('PROCESSOR_MODE', 'passive')  # 'passive' or 'active'
 BACKEND_API_URL = os.getenv('BACKEND_API_URL', 'http://localhost:3000')
 POLL_INTERVAL_MS = int(os.getenv('POLL_INTERVAL_MS', 60000))  # 60 seconds default
+MAX_CONCURRENT_JOBS = int(os.getenv('MAX_CONCURRENT_JOBS', 3))  # Active-mode jobs processed in parallel
+
+# Recipe result cache (Redis if configured, otherwise in-process)
+REDIS_URL = os.getenv('REDIS_URL')
+RECIPE_CACHE_TTL_SECONDS = int(os.getenv('RECIPE_CACHE_TTL_SECONDS', 7 * 24 * 3600))  # 7 days default
+
+# LLM analysis cache (disk, keyed by frame content)
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '/tmp/aizhu-helper/llm_cache')
+LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))  # 7 days default
+
+# Downloaded videos kept for re-analysis (analyze_recipe_from_url(retain_video=True))
+VIDEO_CACHE_DIR = os.getenv('VIDEO_CACHE_DIR', '/tmp/recipeai_video_cache')
+VIDEO_CACHE_MAX_BYTES = int(os.getenv('VIDEO_CACHE_MAX_BYTES', 2 * 1024 ** 3))  # Least recently used evicted beyond this
 
 # Frame extraction mode configuration
 EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'balanced')  # 'fast', 'balanced', or 'accurate'
+MIN_RECIPE_VIDEO_SECONDS = float(os.getenv('MIN_RECIPE_VIDEO_SECONDS', 0))  # Shorter videos are rejected before the LLM call (0 = no floor)
 
 # Gemini model configuration
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')
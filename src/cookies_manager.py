@@ -8,7 +8,7 @@ import tempfile
 import urllib.request
 import logging
 from typing import Optional, Generator
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
 import certifi
 
 logger = logging.getLogger(__name__)
@@ -30,29 +30,23 @@ class CookiesManager:
             'youtube': 'www.youtube.com_cookies.txt',
         }
 
-    @contextmanager
-    def get_cookies_file(self, platform: str) -> Generator[Optional[str], None, None]:
+    def fetch_cookies_file(self, platform: str) -> Optional[str]:
         """
-        Download cookies file and return temporary file path (context manager)
+        Download cookies file from R2 into a temporary file
 
-        Usage:
-            with cookies_manager.get_cookies_file('instagram') as cookie_file:
-                # Use cookie_file
-                pass
-            # File is automatically deleted after context exits
+        Unlike get_cookies_file(), the caller owns the returned file and is
+        responsible for deleting it (allows reuse across several downloads).
 
         Args:
             platform: Platform name ('instagram', 'youtube', etc.)
 
-        Yields:
-            Temporary file path or None if no cookies configured
+        Returns:
+            Temporary file path or None if no cookies configured / download failed
         """
         if platform not in self.cookies_mapping:
             logger.info(f"No cookies configured for platform: {platform}")
-            yield None
-            return
+            return None
 
-        temp_file_path = None
         try:
             filename = self.cookies_mapping[platform]
             cookies_url = f"{self.r2_base_url}/{filename}"
@@ -68,7 +62,8 @@ class CookiesManager:
                 headers={'User-Agent': 'AizhuHelper-VideoProcessor/1.0'}
             )
 
-            with urllib.request.urlopen(req, context=ssl_context) as response:
+            # Bounded so a background prefetch can never hang a worker thread
+            with urllib.request.urlopen(req, context=ssl_context, timeout=10) as response:
                 cookies_content = response.read().decode('utf-8')
 
             # Create temporary cookies file
@@ -79,13 +74,32 @@ class CookiesManager:
             )
             temp_file.write(cookies_content)
             temp_file.close()
-            temp_file_path = temp_file.name
 
-            logger.info(f"Using {platform} cookies: {temp_file_path}")
+            logger.info(f"Using {platform} cookies: {temp_file.name}")
+            return temp_file.name
 
         except Exception as e:
             logger.warning(f"Failed to download cookies: {e}")
-            temp_file_path = None
+            return None
+
+    @contextmanager
+    def get_cookies_file(self, platform: str) -> Generator[Optional[str], None, None]:
+        """
+        Download cookies file and return temporary file path (context manager)
+
+        Usage:
+            with cookies_manager.get_cookies_file('instagram') as cookie_file:
+                # Use cookie_file
+                pass
+            # File is automatically deleted after context exits
+
+        Args:
+            platform: Platform name ('instagram', 'youtube', etc.)
+
+        Yields:
+            Temporary file path or None if no cookies configured
+        """
+        temp_file_path = self.fetch_cookies_file(platform)
 
         # Always yield (either path or None), then handle any exceptions from the caller
         try:
@@ -95,9 +109,7 @@ class CookiesManager:
             raise
         finally:
             # Guarantee cleanup
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
+            if temp_file_path:
+                with suppress(OSError):
                     os.unlink(temp_file_path)
                     logger.debug(f"Cleaned up cookies file: {temp_file_path}")
-                except Exception as e:
-                    logger.error(f"Failed to cleanup cookies: {e}")
@@ -4,31 +4,261 @@ Downloads cooking videos from various platforms for recipe extraction
 Version: 2.0.0 (Android client for YouTube bot detection bypass)
 """
 import os
+import re
+import time
+import atexit
 import logging
 import subprocess
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from dataclasses import dataclass
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlsplit
+from dataclasses import InitVar, dataclass, field
 import yt_dlp
+try:
+    import av  # PyAV: optional in-process decode for thumbnails
+except ImportError:
+    av = None
 # tenacity removed - retry logic handled by backend worker layer
-from .thumbnail_generator import proxy_thumbnail_to_r2
+from .thumbnail_generator import get_thumbnail_proxy, proxy_thumbnail_to_r2
 from .cookies_manager import CookiesManager
 from .config import R2_COOKIES_BASE_URL
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _keyword_pattern(keywords: list[str]) -> re.Pattern:
+    """Compile keywords into one case-insensitive alternation (single scan per message)"""
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+# Errors indicating authentication is needed (Tier 1 -> Tier 2 fallback)
+_AUTH_RE = _keyword_pattern([
+    'sign in', 'login required', 'bot', 'age-restricted',
+    'private', 'members-only', 'not available',
+    'cannot parse data', 'unable to extract video url'
+])
+
+# Permanent errors that should not be retried by worker
+_PERMANENT_RE = _keyword_pattern([
+    'video unavailable',
+    'private video',
+    'deleted',
+    'copyright',
+    'removed',
+    'account terminated',
+    'channel not found',
+    'unsupported url'
+])
+
+_RATE_RE = _keyword_pattern(['rate-limit', 'too many requests'])
+_LOGIN_RE = _keyword_pattern(['login required', 'sign in'])
+_UNSUPPORTED_URL_RE = _keyword_pattern(['unsupported url'])
+_PHOTO_RE = _keyword_pattern(['photo'])
+
+# Image types produced by gallery-dl for photo carousels
+_PHOTO_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp'})
+
+# Concurrent R2 uploads for photo carousels (network-bound, threads overlap PUTs)
+PHOTO_UPLOAD_WORKERS = 8
+
+# Background thumbnail processing (R2 proxy / ffmpeg) so the video is returned first.
+# Module-level because download_video() builds a new VideoDownloader per call.
+_THUMBNAIL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='thumbnail')
+atexit.register(_THUMBNAIL_POOL.shutdown, wait=False)
+
+# Cookies for auth-capable platforms are fetched while Tier 1 runs, so a Tier 2
+# retry doesn't wait on the R2 round-trip
+_COOKIE_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cookies')
+atexit.register(_COOKIE_PREFETCH_POOL.shutdown, wait=False)
+
+# yt-dlp request pacing is only applied on retries or shortly after a rate limit,
+# so healthy first attempts don't pay 5-10s of artificial sleep
+RATE_LIMIT_COOLDOWN_SECONDS = 300
+_last_rate_limited_at: Optional[float] = None
+
+
+def _in_rate_limit_cooldown() -> bool:
+    """Check if a rate limit was hit within RATE_LIMIT_COOLDOWN_SECONDS"""
+    return (
+        _last_rate_limited_at is not None
+        and time.monotonic() - _last_rate_limited_at < RATE_LIMIT_COOLDOWN_SECONDS
+    )
+
+
+def _note_rate_limited() -> None:
+    """Record a rate limit, starting a RATE_LIMIT_COOLDOWN_SECONDS cooldown"""
+    global _last_rate_limited_at
+    _last_rate_limited_at = time.monotonic()
+
+
+# R2 cookies reused across downloads: platform -> (fetched_at, cookies file contents)
+# Module-level because download_video() builds a fresh VideoDownloader per call.
+# Each download gets its own file: yt-dlp writes its cookie jar back on exit
+COOKIE_CACHE_TTL_SECONDS = 600
+_cookie_cache: dict[str, tuple[float, bytes]] = {}
+_cookie_cache_lock = threading.Lock()
+
+
+def _remove_cookie_file(path: str) -> None:
+    """Delete a cookies file (never raises; already-gone is fine)"""
+    with suppress(OSError):
+        os.unlink(path)
+        logger.debug("Cleaned up cookies file: %s", path)
+
+
+def _write_cookie_file(content: bytes) -> str:
+    """Write cookies to a new temporary file owned by the caller"""
+    fd, path = tempfile.mkstemp(prefix='cookies_', suffix='.txt')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def _discard_prefetched_cookies(cookie_future: Optional[Future]) -> None:
+    """Delete the cookies file of an unused prefetch once it is ready"""
+    def remove(done: Future) -> None:
+        if done.exception() is None and done.result():
+            _remove_cookie_file(done.result())
+
+    if cookie_future is not None:
+        cookie_future.add_done_callback(remove)
+
+
+# Registrable domains per platform (subdomains like www./m. match too)
+_PLATFORM_DOMAINS = {
+    'youtube': ('youtube.com', 'youtu.be', 'youtube-nocookie.com'),
+    'instagram': ('instagram.com',),
+    'facebook': ('facebook.com', 'fb.watch'),
+}
+
+
+@lru_cache(maxsize=4096)
+def _platform_for_host(host: str) -> str:
+    """
+    Map a (lowercase) hostname to its video platform (memoized)
+
+    Args:
+        host: URL hostname, e.g. from urlsplit(url).hostname
+
+    Returns:
+        Platform name ('youtube', 'instagram', 'facebook', 'other')
+    """
+    for platform, domains in _PLATFORM_DOMAINS.items():
+        if any(host == domain or host.endswith('.' + domain) for domain in domains):
+            return platform
+    return 'other'
+
+
+def _detect_platform(url: str) -> str:
+    """
+    Detect video platform from URL hostname
+
+    Args:
+        url: Video URL
+
+    Returns:
+        Platform name ('youtube', 'instagram', 'facebook', 'other')
+    """
+    # urlsplit already lowercases the hostname
+    return _platform_for_host(urlsplit(url).hostname or '')
+
+
+# Video ids in platform URL paths (query-string ids like ?v= are read separately)
+_YOUTUBE_PATH_ID_RE = re.compile(r'^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})')
+_YOUTU_BE_ID_RE = re.compile(r'^/([A-Za-z0-9_-]{11})')
+_YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_TIKTOK_ID_RE = re.compile(r'/(?:video|photo)/(\d+)')
+_INSTAGRAM_CODE_RE = re.compile(r'^/(?:[\w.]+/)?(?:p|reels?|tv)/([A-Za-z0-9_-]+)')
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical identity of the video behind a URL
+
+    Share links, short links and tracking parameters for the same YouTube
+    video, TikTok post or Instagram post map to one id, so results can be
+    cached per video rather than per URL spelling.
+
+    Args:
+        url: Video URL
+
+    Returns:
+        'youtube:<id>', 'tiktok:<id>' or 'instagram:<shortcode>' when the id is
+        in the URL; otherwise the URL without fragment (lowercased host)
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').removeprefix('www.').removeprefix('m.')
+    path = parts.path
+
+    if host == 'youtu.be':
+        match = _YOUTU_BE_ID_RE.match(path)
+        if match:
+            return f"youtube:{match.group(1)}"
+    elif _platform_for_host(host) == 'youtube':
+        video_id = parse_qs(parts.query).get('v', [''])[0]
+        if _YOUTUBE_ID_RE.match(video_id):
+            return f"youtube:{video_id}"
+        match = _YOUTUBE_PATH_ID_RE.match(path)
+        if match:
+            return f"youtube:{match.group(1)}"
+    elif host == 'tiktok.com' or host.endswith('.tiktok.com'):
+        match = _TIKTOK_ID_RE.search(path)
+        if match:
+            return f"tiktok:{match.group(1)}"
+    elif _platform_for_host(host) == 'instagram':
+        match = _INSTAGRAM_CODE_RE.match(path)
+        if match:
+            return f"instagram:{match.group(1)}"
+
+    return parts._replace(netloc=parts.netloc.lower(), fragment='').geturl()
+
+
+@dataclass(slots=True, frozen=True)
 class DownloadResult:
     """
     Result of video/photo download operation
 
     Supports tuple unpacking for backward compatibility:
         video_path, thumbnail_url, photo_paths = result
+
+    Results from with_pending_thumbnail() hold a Future while thumbnail
+    processing runs in the background; thumbnail_url blocks on it only when
+    first read.
+    photo_urls (R2 URLs of carousel photos) and photo_bytes (their total size,
+    taken while the photos were collected) are not part of tuple unpacking.
     """
     video_path: Optional[str] = None
-    thumbnail_url: Optional[str] = None
+    thumbnail_url: InitVar[Optional[str]] = None
     photo_paths: Optional[list[str]] = None
+    photo_urls: Optional[list[str]] = None
+    photo_bytes: Optional[int] = None
+    _thumbnail: Union[str, Future, None] = field(default=None, init=False)
+
+    def __post_init__(self, thumbnail_url: Optional[str]):
+        """Store the thumbnail_url constructor argument (frozen: bypass __setattr__)"""
+        object.__setattr__(self, '_thumbnail', thumbnail_url)
+
+    @classmethod
+    def with_pending_thumbnail(cls, video_path: str, thumbnail: Future) -> 'DownloadResult':
+        """
+        Video result whose thumbnail URL is still being processed
+
+        Args:
+            video_path: Downloaded video path
+            thumbnail: Future resolving to the thumbnail URL (or None)
+
+        Returns:
+            DownloadResult whose thumbnail_url waits for the Future
+        """
+        result = cls(video_path=video_path)
+        object.__setattr__(result, '_thumbnail', thumbnail)
+        return result
 
     def __iter__(self):
         """Enable tuple unpacking: video_path, thumbnail, photos = result"""
@@ -45,6 +275,19 @@ class DownloadResult:
         return self.photo_paths is not None and len(self.photo_paths) > 0
 
 
+def _resolve_thumbnail_url(result: DownloadResult) -> Optional[str]:
+    """Thumbnail URL, waiting for background processing if still pending"""
+    if isinstance(result._thumbnail, Future):
+        return result._thumbnail.result()
+    return result._thumbnail
+
+
+# thumbnail_url is a constructor argument (InitVar); reads go through the
+# pending-thumbnail Future. Set after @dataclass, which would otherwise take
+# the property as the argument's default
+DownloadResult.thumbnail_url = property(_resolve_thumbnail_url)
+
+
 class VideoDownloader:
     """Downloads videos from supported platforms using yt-dlp"""
 
@@ -59,26 +302,52 @@ class VideoDownloader:
         self.output_dir = output_dir or os.path.join(os.getcwd(), 'downloads')
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
         self.cookies_manager = CookiesManager(R2_COOKIES_BASE_URL)
+        # Shared proxy: one R2 client / connection pool across all downloads
+        self._proxy = get_thumbnail_proxy()
+        self._thumb_pool = _THUMBNAIL_POOL
+
+    # Kept as a static alias so existing callers/tests using the method keep working
+    _detect_platform = staticmethod(_detect_platform)
 
-    def _detect_platform(self, url: str) -> str:
+    def _get_cookies_file(self, platform: str) -> Optional[str]:
         """
-        Detect video platform from URL
+        Get a cookies file for platform, reusing recently fetched cookies
+
+        Bursts of auth-required downloads share one R2 fetch per platform
+        until COOKIE_CACHE_TTL_SECONDS elapses. Every call returns its own
+        file, which the caller deletes.
 
         Args:
-            url: Video URL
+            platform: Platform name ('instagram', 'youtube', etc.)
 
         Returns:
-            Platform name ('youtube', 'instagram', 'facebook', 'other')
+            Local cookies file path or None if no cookies available
         """
-        url_lower = url.lower()
-        if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-            return 'youtube'
-        elif 'instagram.com' in url_lower:
-            return 'instagram'
-        elif 'facebook.com' in url_lower or 'fb.watch' in url_lower:
-            return 'facebook'
-        else:
-            return 'other'
+        with _cookie_cache_lock:
+            cached = _cookie_cache.get(platform)
+        if cached and time.monotonic() - cached[0] < COOKIE_CACHE_TTL_SECONDS:
+            logger.info("Reusing cached %s cookies", platform)
+            return _write_cookie_file(cached[1])
+
+        # Fetched outside the lock so a slow R2 round-trip doesn't hold up other platforms
+        path = self.cookies_manager.fetch_cookies_file(platform)
+        if not path:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            logger.warning("Failed to read fetched %s cookies: %s", platform, e)
+            _remove_cookie_file(path)
+            return None
+        with _cookie_cache_lock:
+            _cookie_cache[platform] = (time.monotonic(), content)
+        return path
+
+    def _invalidate_cookies_file(self, platform: str) -> None:
+        """Drop cached cookies for platform (e.g. after they were rejected)"""
+        with _cookie_cache_lock:
+            _cookie_cache.pop(platform, None)
 
     def download(self, url: str, filename_prefix: str = "video") -> DownloadResult:
         """
@@ -102,56 +371,70 @@ class VideoDownloader:
             ValueError: If URL is invalid or unsupported
             Exception: If download fails after all retries
         """
-        if not url or not url.startswith(('http://', 'https://')):
+        # Single parse: validates scheme/host and feeds platform detection
+        parts = urlsplit(url) if url else None
+        if not parts or parts.scheme not in ('http', 'https') or not parts.hostname:
             raise ValueError(f"Invalid URL: {url}")
 
-        platform = self._detect_platform(url)
+        platform = _platform_for_host(parts.hostname)
+
+        # Prefetch cookies in the background (no-op after the first fetch thanks to the cache)
+        cookie_future = None
+        if platform in self.cookies_manager.cookies_mapping:
+            cookie_future = _COOKIE_PREFETCH_POOL.submit(self._get_cookies_file, platform)
 
         # Tier 1: Try without cookies (optimal for public content)
-        logger.info(f"Attempting download without cookies (Tier 1)...")
+        logger.info("Attempting download without cookies (Tier 1)...")
         try:
-            return self._download_with_ydl(url, filename_prefix, cookie_file=None)
+            result = self._download_with_ydl(url, filename_prefix, cookie_file=None, platform=platform)
         except (ValueError, Exception) as e:
-            error_msg = str(e).lower()
-
             # Check if error indicates authentication is needed
-            needs_auth = any(keyword in error_msg for keyword in [
-                'sign in', 'login required', 'bot', 'age-restricted',
-                'private', 'members-only', 'not available',
-                'cannot parse data', 'unable to extract video url'
-            ])
+            needs_auth = _AUTH_RE.search(str(e)) is not None
 
             if not needs_auth:
                 # Not an auth issue, re-raise immediately
                 logger.error(f"Tier 1 failed with non-auth error: {e}")
+                _discard_prefetched_cookies(cookie_future)
                 raise
 
             logger.warning(f"Tier 1 failed (auth required): {e}")
-            logger.info(f"Attempting download with cookies (Tier 2)...")
-
-        # Tier 2: Try with cookies from R2
-        with self.cookies_manager.get_cookies_file(platform) as cookie_file:
-            if not cookie_file:
-                raise ValueError(
-                    f"Authentication required but no cookies available for {platform}. "
-                    f"Please configure cookies following YOUTUBE_COOKIES_SETUP.md"
-                )
+            logger.info("Attempting download with cookies (Tier 2)...")
+        else:
+            _discard_prefetched_cookies(cookie_future)
+            return result
+
+        # Tier 2: Try with cookies from R2 (prefetched during Tier 1, cached across downloads)
+        cookie_file = cookie_future.result() if cookie_future else self._get_cookies_file(platform)
+        if not cookie_file:
+            raise ValueError(
+                f"Authentication required but no cookies available for {platform}. "
+                f"Please configure cookies following YOUTUBE_COOKIES_SETUP.md"
+            )
 
-            try:
-                return self._download_with_ydl(url, filename_prefix, cookie_file)
-            except Exception as e:
-                logger.error(f"Tier 2 (with cookies) also failed: {e}")
-                raise ValueError(
-                    f"Failed to download even with cookies. "
-                    f"Cookies may have expired or video is unavailable. "
-                    f"Original error: {e}"
-                )
+        try:
+            return self._download_with_ydl(
+                url, filename_prefix, cookie_file, platform=platform, cooldown=True
+            )
+        except Exception as e:
+            logger.error(f"Tier 2 (with cookies) also failed: {e}")
+            if _AUTH_RE.search(str(e)):
+                # Cookies were rejected (likely expired); force a fresh R2 fetch next time
+                self._invalidate_cookies_file(platform)
+            raise ValueError(
+                f"Failed to download even with cookies. "
+                f"Cookies may have expired or video is unavailable. "
+                f"Original error: {e}"
+            )
+        finally:
+            _remove_cookie_file(cookie_file)
 
     def _download_with_ydl(
         self,
         url: str,
         filename_prefix: str,
-        cookie_file: Optional[str]
+        cookie_file: Optional[str],
+        platform: Optional[str] = None,
+        cooldown: bool = False
     ) -> DownloadResult:
         """
         Perform actual video download using yt-dlp with retry logic
@@ -160,6 +443,8 @@ class VideoDownloader:
             url: Video URL
             filename_prefix: Prefix for output filename
             cookie_file: Path to cookies file (optional)
+            platform: Platform already resolved by download() (detected if omitted)
+            cooldown: Pace requests (retry path); also forced after a recent rate limit
 
         Returns:
             DownloadResult with video_path and thumbnail_url
@@ -169,21 +454,32 @@ class VideoDownloader:
             f"{filename_prefix}_%(id)s.%(ext)s"
         )
 
-        # yt-dlp options with aggressive rate limiting for bot detection avoidance
         ydl_opts = {
             'outtmpl': output_template,
             'noplaylist': True,
             'quiet': False,
             'no_warnings': True,
-            # YouTube recommends 5-10s delays to avoid "content not available" errors
-            'sleep_interval': 5,           # Minimum wait between requests
-            'max_sleep_interval': 10,      # Maximum wait between requests
-            'sleep_interval_requests': 1,  # Wait 1s between fragment downloads
+            # Only the media file is needed: skip sidecar writes and post-processing
+            'writeinfojson': False,
+            'writedescription': False,
+            'writethumbnail': False,
+            'postprocessors': [],
         }
 
+        # Aggressive rate limiting for bot detection avoidance, only when needed
+        if cooldown or _in_rate_limit_cooldown():
+            logger.info("Applying request cooldown (retry or recent rate limit)")
+            ydl_opts.update({
+                # YouTube recommends 5-10s delays to avoid "content not available" errors
+                'sleep_interval': 5,           # Minimum wait between requests
+                'max_sleep_interval': 10,      # Maximum wait between requests
+                'sleep_interval_requests': 1,  # Wait 1s between fragment downloads
+            })
+
         # For YouTube: Use Android client to bypass bot detection
         # Android client typically doesn't require authentication and avoids most bot checks
-        platform = self._detect_platform(url)
+        if platform is None:
+            platform = _detect_platform(url)
         if platform == 'youtube':
             logger.info("Using Android client to bypass bot detection (no cookies required)")
             ydl_opts['extractor_args'] = {
@@ -192,68 +488,63 @@ class VideoDownloader:
                     'skip': ['hls', 'dash']  # Skip certain formats to reduce detection
                 }
             }
+            # DASH is skipped, so pick a progressive format and never invoke the merger
+            ydl_opts['format'] = 'best'
 
         if cookie_file:
             ydl_opts['cookiefile'] = cookie_file
-            logger.info(f"Using cookies file: {cookie_file}")
-
-        # Permanent errors that should not be retried by worker
-        PERMANENT_ERRORS = [
-            'video unavailable',
-            'private video',
-            'deleted',
-            'copyright',
-            'removed',
-            'account terminated',
-            'channel not found',
-            'unsupported url'
-        ]
+            logger.info("Using cookies file: %s", cookie_file)
 
         # Perform download (single attempt, retry handled by worker layer)
         try:
-            logger.info(f"Downloading video from {url}")
+            logger.info("Downloading video from %s", url)
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=True)
                 if not info:
                     raise ValueError(f"Failed to extract video info from {url}")
 
-                # Get downloaded file path
-                video_id = info.get('id', 'unknown')
-                ext = info.get('ext', 'mp4')
-                video_path = os.path.join(
-                    self.output_dir,
-                    f"{filename_prefix}_{video_id}.{ext}"
-                )
+                # yt-dlp reports the final path (after post-processor extension changes)
+                requested = info.get('requested_downloads') or [{}]
+                video_path = requested[0].get('filepath')
 
-                if not os.path.exists(video_path):
-                    raise Exception(f"Download succeeded but file not found: {video_path}")
+                if not video_path:
+                    # Fallback: rebuild path from output template
+                    video_id = info.get('id', 'unknown')
+                    ext = info.get('ext', 'mp4')
+                    video_path = os.path.join(
+                        self.output_dir,
+                        f"{filename_prefix}_{video_id}.{ext}"
+                    )
+                    if not os.path.exists(video_path):
+                        raise Exception(f"Download succeeded but file not found: {video_path}")
 
-                # Process thumbnail (pass video_path for fallback extraction)
-                thumbnail_url = self._process_thumbnail(info, video_path)
+                # Process thumbnail in the background (pass video_path for fallback extraction)
+                thumbnail_future = self._thumb_pool.submit(self._process_thumbnail, info, video_path)
 
-                logger.info(f"Downloaded video to {video_path}")
-                return DownloadResult(video_path=video_path, thumbnail_url=thumbnail_url)
+                logger.info("Downloaded video to %s", video_path)
+                return DownloadResult.with_pending_thumbnail(video_path, thumbnail_future)
 
         except yt_dlp.utils.DownloadError as e:
-            error_msg = str(e).lower()
+            error_msg = str(e)
 
             # Check for TikTok photo carousel FIRST (before permanent error check)
             # This is a special case where 'unsupported url' + 'photo' should fallback to gallery-dl
-            if 'unsupported url' in error_msg and 'photo' in error_msg:
+            if _UNSUPPORTED_URL_RE.search(error_msg) and _PHOTO_RE.search(error_msg):
                 logger.info("Detected TikTok photo carousel, switching to gallery-dl")
                 return self._download_photos_with_gallery_dl(url, filename_prefix)
 
             # Check if this is a permanent error (should not retry)
-            if any(keyword in error_msg for keyword in PERMANENT_ERRORS):
+            if _PERMANENT_RE.search(error_msg):
                 logger.error(f"Permanent download error (will not retry): {e}")
                 raise ValueError(f"[PERMANENT] Video cannot be downloaded: {e}")
 
             # Rate limit or transient errors (worker will retry with backoff)
-            if 'rate-limit' in error_msg or 'too many requests' in error_msg:
+            if _RATE_RE.search(error_msg):
+                _note_rate_limited()
                 logger.warning(f"Rate limit detected (worker will retry): {e}")
                 raise ValueError(f"[RETRYABLE] Rate limit: {e}")
 
-            if 'login required' in error_msg or 'sign in' in error_msg:
+            if _LOGIN_RE.search(error_msg):
                 logger.warning(f"Authentication required (worker will retry): {e}")
                 raise ValueError(f"[RETRYABLE] Login required: {e}")
 
@@ -277,21 +568,17 @@ class VideoDownloader:
         # Check for thumbnails array (TikTok, some platforms)
         thumbnails = info.get('thumbnails')
         if thumbnails and isinstance(thumbnails, list) and len(thumbnails) > 0:
-            logger.info(f"Found {len(thumbnails)} thumbnails in metadata")
-
-            # Sort by preference (higher is better)
-            sorted_thumbnails = sorted(
-                thumbnails,
-                key=lambda t: t.get('preference', 0),
-                reverse=True
-            )
+            logger.info("Found %d thumbnails in metadata", len(thumbnails))
 
-            # Get the best thumbnail URL
-            best_thumbnail = sorted_thumbnails[0]
+            # Pick highest preference in one pass (None treated as 0; ties keep first)
+            best_thumbnail = max(thumbnails, key=lambda t: t.get('preference') or 0)
             thumbnail_url = best_thumbnail.get('url')
             thumbnail_id = best_thumbnail.get('id', 'unknown')
 
-            logger.info(f"Selected thumbnail: id={thumbnail_id}, preference={best_thumbnail.get('preference', 0)}")
+            logger.info(
+                "Selected thumbnail: id=%s, preference=%s",
+                thumbnail_id, best_thumbnail.get('preference', 0)
+            )
             return thumbnail_url
 
         # Fallback to single thumbnail field
@@ -303,9 +590,29 @@ class VideoDownloader:
 
         return thumbnail_url
 
+    def _extract_thumbnail_with_pyav(self, video_path: str, thumbnail_path: str) -> bool:
+        """
+        Decode one keyframe near 1s in-process with PyAV (no ffmpeg process spawn)
+
+        Args:
+            video_path: Path to video file
+            thumbnail_path: Output JPEG path
+
+        Returns:
+            True if a frame was written, False if the stream yielded no frames
+        """
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.codec_context.skip_frame = 'NONKEY'
+            container.seek(av.time_base, backward=True)  # ~1s, snapped to prior keyframe
+            for frame in container.decode(stream):
+                frame.to_image().save(thumbnail_path, 'JPEG', quality=90)
+                return True
+        return False
+
     def _extract_thumbnail_from_video(self, video_path: str) -> Optional[str]:
         """
-        Extract a thumbnail frame from video file using FFmpeg
+        Extract a thumbnail frame from video file (PyAV in-process, FFmpeg CLI fallback)
 
         Args:
             video_path: Path to video file
@@ -323,15 +630,27 @@ class VideoDownloader:
             video_name = os.path.splitext(os.path.basename(video_path))[0]
             thumbnail_path = os.path.join(video_dir, f"{video_name}_thumb.jpg")
 
-            logger.info(f"Extracting thumbnail from video using FFmpeg...")
-            logger.info(f"  Video: {video_path}")
-            logger.info(f"  Output: {thumbnail_path}")
+            if av is not None:
+                try:
+                    if self._extract_thumbnail_with_pyav(video_path, thumbnail_path):
+                        logger.info("✓ Extracted thumbnail in-process with PyAV: %s", thumbnail_path)
+                        return thumbnail_path
+                    logger.warning("PyAV decoded no frames, falling back to FFmpeg")
+                except Exception as e:
+                    logger.warning(f"PyAV thumbnail extraction failed, falling back to FFmpeg: {e}")
+
+            logger.info("Extracting thumbnail from video using FFmpeg...")
+            logger.info("  Video: %s", video_path)
+            logger.info("  Output: %s", thumbnail_path)
 
             # Use FFmpeg to extract frame at 1 second
+            # -ss before -i seeks on the input (keyframe-level) instead of decoding up to 1s
             cmd = [
                 'ffmpeg',
+                '-loglevel', 'error',
+                '-ss', '00:00:01',   # Extract at 1 second (input seek)
+                '-noaccurate_seek',  # Nearest keyframe is fine for a thumbnail
                 '-i', video_path,
-                '-ss', '00:00:01',  # Extract at 1 second
                 '-vframes', '1',     # Extract 1 frame
                 '-q:v', '2',         # High quality (2 = high, 31 = low)
                 '-y',                # Overwrite output file
@@ -354,7 +673,7 @@ class VideoDownloader:
                 logger.error(f"Thumbnail extraction succeeded but file not found")
                 return None
 
-            logger.info(f"✓ Successfully extracted thumbnail from video!")
+            logger.info("✓ Successfully extracted thumbnail from video!")
             return thumbnail_path
 
         except subprocess.TimeoutExpired:
@@ -391,18 +710,23 @@ class VideoDownloader:
                 return self._extract_and_upload_thumbnail(video_path)
             return None
 
+        # Already hosted on R2 (e.g. reprocessing cached metadata): nothing to do
+        if self._proxy.is_r2_url(thumbnail_url):
+            logger.info("✓ Thumbnail already on R2: %.80s...", thumbnail_url)
+            return thumbnail_url
+
         # Check if thumbnail needs CORS proxy (Instagram only)
         needs_proxy = any(domain in thumbnail_url.lower() for domain in [
             'instagram', 'cdninstagram'
         ])
 
         if needs_proxy:
-            logger.info(f"🔍 Detected Instagram thumbnail (CORS-blocked), proxying to R2...")
-            logger.info(f"   Original URL: {thumbnail_url[:80]}...")
+            logger.info("🔍 Detected Instagram thumbnail (CORS-blocked), proxying to R2...")
+            logger.info("   Original URL: %.80s...", thumbnail_url)
             try:
                 r2_thumbnail_url = proxy_thumbnail_to_r2(thumbnail_url)
-                logger.info(f"✅ Successfully proxied to R2!")
-                logger.info(f"   R2 URL: {r2_thumbnail_url}")
+                logger.info("✅ Successfully proxied to R2!")
+                logger.info("   R2 URL: %s", r2_thumbnail_url)
                 return r2_thumbnail_url
             except Exception as e:
                 logger.error(f"❌ R2 proxy FAILED - Instagram CDN blocked or URL expired")
@@ -419,7 +743,7 @@ class VideoDownloader:
                     logger.warning(f"⚠️  Frontend may encounter CORS issues with this URL!")
                     return thumbnail_url
         else:
-            logger.info(f"✓ Thumbnail URL (no proxy needed): {thumbnail_url[:80]}...")
+            logger.info("✓ Thumbnail URL (no proxy needed): %.80s...", thumbnail_url)
             return thumbnail_url
 
     def _extract_and_upload_thumbnail(self, video_path: str) -> Optional[str]:
@@ -442,12 +766,10 @@ class VideoDownloader:
 
             # Step 2: Upload to R2
             logger.info("Uploading extracted thumbnail to R2...")
-            from .thumbnail_generator import ThumbnailProxy
-            proxy = ThumbnailProxy()
-            r2_url = proxy.upload_to_r2(thumbnail_path)
+            r2_url = self._proxy.upload_to_r2(thumbnail_path)
 
-            logger.info(f"✅ Fallback successful! Uploaded video-extracted thumbnail to R2")
-            logger.info(f"   R2 URL: {r2_url}")
+            logger.info("✅ Fallback successful! Uploaded video-extracted thumbnail to R2")
+            logger.info("   R2 URL: %s", r2_url)
             return r2_url
 
         except Exception as e:
@@ -456,12 +778,10 @@ class VideoDownloader:
             return None
         finally:
             # Cleanup: remove extracted thumbnail file
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                try:
-                    os.remove(thumbnail_path)
-                    logger.debug(f"Cleaned up extracted thumbnail: {thumbnail_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup thumbnail: {e}")
+            if thumbnail_path:
+                with suppress(OSError):
+                    os.unlink(thumbnail_path)
+                    logger.debug("Cleaned up extracted thumbnail: %s", thumbnail_path)
 
     def _upload_photo_thumbnail(self, photo_path: str) -> str:
         """
@@ -476,13 +796,10 @@ class VideoDownloader:
         Raises:
             Exception: If upload fails
         """
-        from .thumbnail_generator import ThumbnailProxy
-
-        logger.info(f"Uploading photo thumbnail to R2: {photo_path}")
+        logger.info("Uploading photo thumbnail to R2: %s", photo_path)
         try:
-            proxy = ThumbnailProxy()
-            thumbnail_url = proxy.upload_to_r2(photo_path)
-            logger.info(f"Photo thumbnail uploaded: {thumbnail_url}")
+            thumbnail_url = self._proxy.upload_to_r2(photo_path)
+            logger.info("Photo thumbnail uploaded: %s", thumbnail_url)
             return thumbnail_url
         except Exception as e:
             logger.error(f"Failed to upload photo thumbnail to R2: {e}")
@@ -490,6 +807,23 @@ class VideoDownloader:
             logger.warning("Falling back to local path (frontend may not be able to access)")
             return photo_path
 
+    def _upload_photos(self, photo_paths: list[str]) -> list[str]:
+        """
+        Upload all carousel photos to R2 concurrently
+
+        Args:
+            photo_paths: Local photo paths (order is preserved)
+
+        Returns:
+            Public R2 URLs in the same order (local path for any failed upload)
+        """
+        if not photo_paths:
+            return []
+
+        workers = min(PHOTO_UPLOAD_WORKERS, len(photo_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._upload_photo_thumbnail, photo_paths))
+
     def _download_photos_with_gallery_dl(
         self,
         url: str,
@@ -503,17 +837,21 @@ class VideoDownloader:
             filename_prefix: Prefix for output directory
 
         Returns:
-            DownloadResult with thumbnail_url and photo_paths
+            DownloadResult with thumbnail_url, photo_paths and photo_urls
 
         Raises:
             ValueError: If download fails
         """
-        logger.info(f"Downloading TikTok photo carousel with gallery-dl: {url}")
+        logger.info("Downloading TikTok photo carousel with gallery-dl: %s", url)
+
+        # Per-job directory so concurrent downloads never pick up each other's photos
+        job_dir = Path(self.output_dir) / f"{filename_prefix}_{uuid.uuid4().hex}"
+        job_dir.mkdir(parents=True)
 
         # Run gallery-dl to download photos
         cmd = [
             'gallery-dl',
-            '--directory', self.output_dir,
+            '--directory', str(job_dir),
             '--quiet',
             url
         ]
@@ -531,29 +869,32 @@ class VideoDownloader:
                 logger.error(f"gallery-dl failed with code {result.returncode}: {result.stderr}")
                 raise ValueError(f"Failed to download photos: {result.stderr}")
 
-            logger.info(f"gallery-dl completed with return code {result.returncode}")
+            logger.info("gallery-dl completed with return code %d", result.returncode)
 
-            # Find downloaded images
-            photo_paths = []
-            for ext in ['*.jpg', '*.jpeg', '*.png', '*.webp']:
-                photo_paths.extend(Path(self.output_dir).rglob(ext))
+            # Find downloaded images and their sizes (single directory walk)
+            photo_sizes = {
+                str(p): p.stat().st_size for p in job_dir.rglob('*')
+                if p.suffix.lower() in _PHOTO_EXTENSIONS
+            }
 
-            if not photo_paths:
+            if not photo_sizes:
                 raise ValueError("No photos downloaded from TikTok carousel")
 
             # Sort by filename to maintain order
-            photo_paths = sorted(photo_paths)
-            photo_path_strs = [str(p) for p in photo_paths]
+            photo_path_strs = sorted(photo_sizes)
 
-            logger.info(f"Downloaded {len(photo_path_strs)} photos from carousel")
+            logger.info("Downloaded %d photos from carousel", len(photo_path_strs))
 
-            # Upload first photo to R2 as thumbnail (return public URL instead of local path)
-            if photo_path_strs:
-                thumbnail_url = self._upload_photo_thumbnail(photo_path_strs[0])
-            else:
-                thumbnail_url = None
+            # Upload all photos to R2 in parallel; first one doubles as thumbnail
+            photo_urls = self._upload_photos(photo_path_strs)
+            thumbnail_url = photo_urls[0] if photo_urls else None
 
-            return DownloadResult(thumbnail_url=thumbnail_url, photo_paths=photo_path_strs)
+            return DownloadResult(
+                thumbnail_url=thumbnail_url,
+                photo_paths=photo_path_strs,
+                photo_urls=photo_urls,
+                photo_bytes=sum(photo_sizes.values())
+            )
 
         except subprocess.TimeoutExpired:
             logger.error("gallery-dl timed out after 60 seconds")
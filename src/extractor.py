@@ -7,30 +7,448 @@ Supports multiple extraction strategies:
 - scene: FFmpeg scene detection (detects visual changes)
 - hybrid: Combination of scene detection + uniform sampling
 """
+import hashlib
+import re
 import subprocess
+import tempfile
+import threading
+from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Literal
+from functools import lru_cache
+from io import BytesIO
+from typing import Callable, Iterable, Iterator, List, Literal, Optional, Tuple, TypeVar, Union
 import logging
 import os
+from PIL import Image
 
 logger = logging.getLogger(__name__)
 
 ExtractionStrategy = Literal['uniform', 'scene', 'hybrid']
 
+T = TypeVar('T')
+
+# (timestamp in seconds, frame path) - sorting these gives temporal order
+TimedFrame = Tuple[float, str]
+
+# JPEG markers used to split FFmpeg's MJPEG pipe output into frames
+_JPEG_SOI = b'\xff\xd8'
+_JPEG_EOI = b'\xff\xd9'
+_JPEG_SOS = 0xDA
+
+# FFmpeg output args: MJPEG stream on stdout
+_MJPEG_PIPE_OUTPUT = ('-f', 'image2pipe', '-c:v', 'mjpeg', 'pipe:1')
+
+# Max frame height sent to the vision model (larger frames only add upload
+# bytes and image tokens, not recipe detail)
+ANALYSIS_FRAME_HEIGHT = 768
+
+# Pipe read size (large reads keep syscall count low at high frame rates)
+_PIPE_CHUNK_SIZE = 1 << 20
+
+# FFmpeg MJPEG runs still going after this long are killed (stalled input)
+MJPEG_PIPE_TIMEOUT_S = 600
+
+# Max bytes buffered without completing a frame (output is not splitting into JPEGs)
+_MJPEG_MAX_FRAME_BYTES = 64 << 20
+
+# FFmpeg progress line on stderr; the last match is the number of frames written
+_FFMPEG_FRAME_RE = re.compile(rb'frame=\s*(\d+)')
+
+# Frame time and scene score in metadata=print output (one block per kept frame)
+_SCENE_METADATA_RE = re.compile(
+    r'pts_time:(\d+(?:\.\d+)?)\s+lavfi\.scene_score=(\d+(?:\.\d+)?)'
+)
+
+# Time of each kept frame in metadata=print output
+_FRAME_TIME_RE = re.compile(r'pts_time:(\d+(?:\.\d+)?)')
+
+# File in output_dir receiving scene-detected frame times and scores
+_SCENE_TIMES_FILENAME = 'scene_times.txt'
+
+# File in output_dir receiving the times of hybrid uniform frames
+_UNIFORM_TIMES_FILENAME = 'uniform_times.txt'
+
+# Scene score a frame needs to be a candidate; low enough that one pass
+# usually yields more candidates than requested, which are then thinned
+# by accumulated change (see _dynamic_scene_picks)
+SCENE_CANDIDATE_THRESHOLD = 0.1
+
+# Timestamps at least this far apart are extracted with parallel input seeks;
+# closer ones are cheaper to pick out of a single decode pass
+SEEK_EXTRACTION_MIN_SPACING_S = 10.0
+
+# Bytes of the video head hashed (with its size) to fingerprint a video file
+VIDEO_FINGERPRINT_HEAD_BYTES = 4 << 20
+
+# Videos shorter than this many seconds per requested frame skip scene
+# detection: uniform 1fps sampling is already as dense as typical cuts
+SCENE_DETECTION_MIN_SECONDS_PER_FRAME = 2.0
+
+# Difference-hash grid (DHASH_SIZE x DHASH_SIZE bits) and the max number of
+# differing bits for consecutive frames to count as the same shot. A 16x16
+# grid still sees text overlays change (ingredient amounts), unlike 8x8.
+DHASH_SIZE = 16
+DEDUPE_MAX_DISTANCE = 10
+
+# Caps concurrent FFmpeg processes across all extractors/threads
+_CPU_COUNT = os.cpu_count() or 1
+_FFMPEG_SLOTS = threading.BoundedSemaphore(_CPU_COUNT)
+
+# Hardware decoders that failed here while software decoding worked; shared
+# across extractors so later videos skip straight to software decoding
+_FAILED_HWACCELS = set()
+
+
+@lru_cache(maxsize=256)
+def _probe_duration(video_path: str, mtime_ns: int, size: int) -> float:
+    """
+    Run ffprobe for video duration (memoized)
+
+    mtime_ns and size are only part of the cache key, so a rewritten file
+    at the same path is probed again.
+    """
+    duration_cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        video_path
+    ]
+    result = subprocess.run(
+        duration_cmd, capture_output=True, text=True, bufsize=_PIPE_CHUNK_SIZE
+    )
+    return float(result.stdout.strip())
+
+
+def _get_video_duration(video_path: str) -> float:
+    """Get video duration in seconds, reusing earlier ffprobe results"""
+    st = os.stat(video_path)
+    return _probe_duration(os.path.abspath(video_path), st.st_mtime_ns, st.st_size)
+
+
+def _jpeg_end(data: bytearray, start: int) -> int:
+    """
+    Find the end offset of the JPEG starting at start
+
+    Header segments are skipped by their declared length (so marker-like bytes
+    inside tables are ignored); after SOS the entropy-coded data byte-stuffs
+    0xFF, so the first EOI found is the real one.
+
+    Returns:
+        Offset just past EOI, or -1 if the frame is not complete yet
+    """
+    i = start + 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return -1
+        marker = data[i + 1]
+        i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+        if marker == _JPEG_SOS:
+            end = data.find(_JPEG_EOI, i)
+            return -1 if end == -1 else end + 2
+    return -1
+
+
+def _stream_mjpeg_frames(
+    cmd: List[str],
+    stdin=None,
+    timeout: float = MJPEG_PIPE_TIMEOUT_S
+) -> Iterator[bytes]:
+    """
+    Run FFmpeg with MJPEG output on stdout and yield each encoded frame
+
+    Args:
+        cmd: FFmpeg command writing '-f image2pipe -c:v mjpeg pipe:1'
+        stdin: Optional file object fed to FFmpeg (for '-i pipe:0' input)
+        timeout: Seconds before FFmpeg is killed (whole run, including consumer time)
+
+    Yields:
+        JPEG bytes per frame, in output order
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg exits non-zero or its output
+            does not split into JPEG frames
+        subprocess.TimeoutExpired: If FFmpeg is still running after timeout
+    """
+    # stderr goes to a file: an undrained pipe (one line per corrupt packet,
+    # even at -loglevel error) would block FFmpeg while we block on stdout
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            bufsize=_PIPE_CHUNK_SIZE
+        )
+        timed_out = threading.Event()
+
+        def kill_on_deadline():
+            timed_out.set()
+            proc.kill()
+
+        deadline = threading.Timer(timeout, kill_on_deadline)
+        deadline.daemon = True
+        deadline.start()
+        try:
+            buffer = bytearray()
+            while chunk := proc.stdout.read(_PIPE_CHUNK_SIZE):
+                buffer += chunk
+                pos = 0
+                while (start := buffer.find(_JPEG_SOI, pos)) != -1:
+                    end = _jpeg_end(buffer, start)
+                    if end == -1:
+                        break
+                    yield bytes(buffer[start:end])
+                    pos = end
+                del buffer[:pos]
+                if len(buffer) > _MJPEG_MAX_FRAME_BYTES:
+                    raise subprocess.CalledProcessError(
+                        -1, cmd, stderr=f"No complete JPEG frame in {len(buffer)} bytes of output"
+                    )
+
+            returncode = proc.wait()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='replace')
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+            if stderr:
+                logger.debug("FFmpeg output: %s", stderr)
+        finally:
+            deadline.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+
+def _ffmpeg_threads_per_invocation(pool_workers: int) -> str:
+    """FFmpeg -threads value for one of pool_workers concurrent invocations"""
+    return str(max(1, _CPU_COUNT // pool_workers))
+
+
+def _timestamp_select_expr(timestamps: List[float]) -> str:
+    """
+    Build a select filter expression keeping one frame per timestamp
+
+    Each term matches the first frame whose time crosses the timestamp
+    (prev_pts is NAN on frame 0, so that frame never matches).
+    """
+    return '+'.join(
+        f'gte(t\\,{ts:.3f})*lt(prev_pts*TB\\,{ts:.3f})' for ts in timestamps
+    )
+
+
+def _run_ffmpeg(cmd: List[str]) -> subprocess.CompletedProcess:
+    """
+    Run FFmpeg that writes its own output files
+
+    stdout is discarded and stderr captured through a large pipe buffer.
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg exits non-zero
+    """
+    with _FFMPEG_SLOTS:
+        return subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            bufsize=_PIPE_CHUNK_SIZE,
+            check=True
+        )
+
+
+def _with_scale(video_filter: str, target_height: Optional[int]) -> str:
+    """
+    Chain downscaling onto a video filter so frames come out analysis-sized
+
+    Never upscales; width keeps aspect ratio (rounded to even).
+    Pass 'null' when there is no other filter to chain onto.
+    """
+    if not target_height:
+        return video_filter
+    scale = (
+        f'scale=-2:min(ih\\,{target_height}):flags=fast_bilinear,'
+        'format=yuvj420p'
+    )
+    return f'{video_filter},{scale}'
+
+
+def _strip_hwaccel(cmd: List[str]) -> List[str]:
+    """Return cmd without its '-hwaccel <method>' input option"""
+    i = cmd.index('-hwaccel')
+    return cmd[:i] + cmd[i + 2:]
+
+
+def _escape_filter_path(path: str) -> str:
+    """Escape a file path for use as a filter option value inside a filtergraph"""
+    for ch in "':":
+        path = path.replace(ch, '\\\\' + ch)  # option-level, escaped again for the graph
+    for ch in ',;[]':
+        path = path.replace(ch, '\\' + ch)
+    return path
+
+
+def _read_scene_metadata(path: str) -> Tuple[List[float], List[float]]:
+    """
+    Read frame times and scene scores written by metadata=print, then remove the file
+
+    Returns:
+        (timestamps, scene scores) in output order (empty if the file was not written)
+    """
+    try:
+        with open(path) as f:
+            matches = _SCENE_METADATA_RE.findall(f.read())
+    except OSError:
+        return [], []
+    with suppress(OSError):
+        os.unlink(path)
+    return [float(t) for t, _ in matches], [float(score) for _, score in matches]
+
+
+def _read_frame_times(path: str) -> List[float]:
+    """Read frame times written by metadata=print, then remove the file (empty if not written)"""
+    try:
+        with open(path) as f:
+            times = [float(t) for t in _FRAME_TIME_RE.findall(f.read())]
+    except OSError:
+        return []
+    with suppress(OSError):
+        os.unlink(path)
+    return times
+
+
+def _video_fingerprint(video_path: str) -> str:
+    """Hash of the first VIDEO_FINGERPRINT_HEAD_BYTES plus file size (cheap content key)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(video_path, 'rb') as f:
+        digest.update(f.read(VIDEO_FINGERPRINT_HEAD_BYTES))
+    digest.update(str(os.path.getsize(video_path)).encode())
+    return digest.hexdigest()
+
+
+def _accumulate_picks(scores: List[float], threshold: float) -> List[int]:
+    """Indices where the running scene-score sum reaches threshold (sum resets after each pick)"""
+    picks = []
+    total = 0.0
+    for i, score in enumerate(scores):
+        total += score
+        if total >= threshold:
+            picks.append(i)
+            total = 0.0
+    return picks
+
+
+def _dynamic_scene_picks(scores: List[float], count: int) -> List[int]:
+    """
+    Pick count frames by accumulated scene change
+
+    Binary-searches the largest accumulator threshold that still yields count
+    picks, so frames follow the amount of visual change: busy stretches get
+    more frames, static ones fewer.
+
+    Args:
+        scores: Scene score per candidate frame, in temporal order
+        count: Number of frames to pick (at most len(scores))
+
+    Returns:
+        Ascending indices into scores
+    """
+    low, high = 0.0, sum(scores)
+    for _ in range(32):
+        mid = (low + high) / 2
+        if len(_accumulate_picks(scores, mid)) >= count:
+            low = mid
+        else:
+            high = mid
+
+    # Thresholds are discrete steps, so low may yield a few extra picks: thin evenly
+    picks = _accumulate_picks(scores, low)
+    step = len(picks) / count
+    return [picks[int(i * step)] for i in range(count)]
+
+
+def _write_frame(path: str, data: bytes) -> str:
+    """Write encoded frame bytes to path and return the path"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
 
 class FrameExtractor:
     """Extracts and selects key frames from video files"""
 
-    def __init__(self, max_frames: int = 180, quality: int = 2):
+    def __init__(
+        self,
+        max_frames: int = 180,
+        quality: int = 2,
+        target_height: Optional[int] = ANALYSIS_FRAME_HEIGHT,
+        hwaccel: Optional[str] = 'auto'
+    ):
         """
         Initialize frame extractor
 
         Args:
             max_frames: Maximum frames to extract (default 180 for 3-min video @ 1fps)
             quality: JPEG quality (1-31, lower is better, default 2)
+            target_height: Max output frame height for vision analysis (None keeps source size)
+            hwaccel: FFmpeg -hwaccel method for decoding (None for software only)
         """
         self.max_frames = max_frames
         self.quality = quality
+        self.target_height = target_height
+        self.hwaccel = hwaccel
+
+        # Command fragments reused by every FFmpeg invocation
+        self._quality_args = ('-q:v', str(quality))
+        self._max_frames_args = ('-frames:v', str(max_frames))
+
+    def _input_args(self, video_path: str) -> List[str]:
+        """
+        FFmpeg input options for video_path, with hardware decoding if enabled
+
+        Decoded frames are downloaded to system memory (no
+        -hwaccel_output_format), so the CPU filters below work unchanged.
+        """
+        if self.hwaccel and self.hwaccel not in _FAILED_HWACCELS:
+            return ['-hwaccel', self.hwaccel, '-i', str(video_path)]
+        return ['-i', str(video_path)]
+
+    def _run_with_hwaccel_fallback(self, run: Callable[[List[str]], T], cmd: List[str]) -> T:
+        """
+        Run an FFmpeg command, retrying with software decoding if it fails
+
+        Args:
+            run: Callable executing the command and returning its result
+            cmd: FFmpeg command, possibly containing '-hwaccel <method>'
+
+        Returns:
+            Result of run
+
+        Raises:
+            subprocess.CalledProcessError: If FFmpeg fails without hwaccel too
+        """
+        try:
+            return run(cmd)
+        except subprocess.CalledProcessError as e:
+            if '-hwaccel' not in cmd:
+                raise
+            logger.warning("⚠️  FFmpeg failed with -hwaccel %s, retrying with software decoding: %s", self.hwaccel, e.stderr)
+            result = run(_strip_hwaccel(cmd))
+            _FAILED_HWACCELS.add(self.hwaccel)
+            return result
+
+    def _with_scale(self, video_filter: str) -> str:
+        """Chain downscaling to target_height onto a video filter (see _with_scale)"""
+        return _with_scale(video_filter, self.target_height)
+
+    def _scene_filter(self, threshold: float, times_path: str) -> str:
+        """Scene-change select filter that also logs each kept frame's time and score to times_path"""
+        return self._with_scale(
+            f'select=gt(scene\\,{threshold}),'
+            f'metadata=print:key=lavfi.scene_score:file={_escape_filter_path(times_path)}'
+        )
 
     def extract_frames(self, video_path: str, output_dir: str) -> List[str]:
         """
@@ -54,49 +472,158 @@ class FrameExtractor:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        output_pattern = str(output_path / "frame_%04d.jpg")
-
+        # MJPEG over stdout: frames are split in-process, no directory re-scan
         cmd = [
             'ffmpeg',
-            '-i', str(video_path),
-            '-vf', 'fps=1',  # 1 frame per second
-            '-q:v', str(self.quality),  # High quality
-            '-frames:v', str(self.max_frames),  # Max frames limit
-            output_pattern
+            '-loglevel', 'error',
+            *self._input_args(video_path),
+            '-vf', self._with_scale('fps=1'),  # 1 frame per second
+            *self._quality_args,  # High quality
+            *self._max_frames_args,  # Max frames limit
+            *_MJPEG_PIPE_OUTPUT
         ]
-        # Memory optimization: single thread, ultrafast preset
-        cmd.extend(['-threads', '1', '-preset', 'ultrafast'])
 
         try:
             logger.info(f"Extracting frames from {video_path} at 1fps")
-            result = subprocess.run(
-                cmd,
-                check=True,
-                capture_output=True,
-                text=True
+            frame_paths = self._run_with_hwaccel_fallback(
+                lambda c: [
+                    _write_frame(os.path.join(output_dir, f"frame_{i:04d}.jpg"), data)
+                    for i, data in enumerate(_stream_mjpeg_frames(c), start=1)
+                ],
+                cmd
             )
-            logger.debug(f"FFmpeg output: {result.stderr}")
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg failed: {e.stderr}")
             raise
 
-        # Get all extracted frames
-        frames = sorted(output_path.glob('frame_*.jpg'))
-        frame_paths = [str(f) for f in frames]
-
         logger.info(f"Extracted {len(frame_paths)} frames")
         return frame_paths
 
+    def extract_n_frames(self, video_path: str, output_dir: str, count: int) -> List[str]:
+        """
+        Extract count evenly spaced frames in a single FFmpeg pass
+
+        Asks FFmpeg for fps=count/duration, so only the frames that are kept
+        get encoded (instead of 1fps extraction followed by selection).
+
+        Args:
+            video_path: Path to input video file
+            output_dir: Directory to save extracted frames
+            count: Number of frames to extract (capped at max_frames)
+
+        Returns:
+            List of paths to extracted frame images
+
+        Raises:
+            subprocess.CalledProcessError: If FFmpeg fails
+            FileNotFoundError: If video file not found
+        """
+        video_file = Path(video_path)
+        if not video_file.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        try:
+            duration = _get_video_duration(video_path)
+        except ValueError:
+            duration = 0.0
+        if duration <= 0:
+            # Unknown duration: fall back to 1fps extraction + selection
+            logger.warning("Could not determine duration of %s, extracting at 1fps", video_path)
+            return self.select_key_frames(self.extract_frames(video_path, output_dir), count)
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        count = min(count, self.max_frames)
+        cmd = self._n_frames_cmd(video_path, count, duration)
+
+        try:
+            logger.info("Extracting %s frames from %s (%.1fs)", count, video_path, duration)
+            frame_paths = self._run_with_hwaccel_fallback(
+                lambda c: [
+                    _write_frame(os.path.join(output_dir, f"frame_{i:04d}.jpg"), data)
+                    for i, data in enumerate(_stream_mjpeg_frames(c), start=1)
+                ],
+                cmd
+            )
+        except subprocess.CalledProcessError as e:
+            logger.error("FFmpeg failed: %s", e.stderr)
+            raise
+
+        logger.info("Extracted %s frames", len(frame_paths))
+        return frame_paths
+
+    def extract_n_frame_bytes(self, video_path: str, count: int) -> List[bytes]:
+        """
+        Extract count evenly spaced frames as encoded JPEG bytes (nothing written to disk)
+
+        Args:
+            video_path: Path to input video file
+            count: Number of frames to extract (capped at max_frames)
+
+        Returns:
+            JPEG bytes per frame, in temporal order
+
+        Raises:
+            subprocess.CalledProcessError: If FFmpeg fails
+            FileNotFoundError: If video file not found
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        try:
+            duration = _get_video_duration(video_path)
+        except ValueError:
+            duration = 0.0
+
+        if duration > 0:
+            count = min(count, self.max_frames)
+            cmd = self._n_frames_cmd(video_path, count, duration)
+        else:
+            # Unknown duration: 1fps, then select
+            logger.warning("Could not determine duration of %s, extracting at 1fps", video_path)
+            cmd = [
+                'ffmpeg',
+                '-loglevel', 'error',
+                *self._input_args(video_path),
+                '-vf', self._with_scale('fps=1'),
+                *self._quality_args,
+                *self._max_frames_args,
+                *_MJPEG_PIPE_OUTPUT
+            ]
+
+        try:
+            logger.info("Extracting %s frames to memory from %s", count, video_path)
+            frames = self._run_with_hwaccel_fallback(lambda c: list(_stream_mjpeg_frames(c)), cmd)
+        except subprocess.CalledProcessError as e:
+            logger.error("FFmpeg failed: %s", e.stderr)
+            raise
+
+        logger.info("Extracted %s frames", len(frames))
+        return self.select_key_frames(frames, count)
+
+    def _n_frames_cmd(self, video_path: str, count: int, duration: float) -> List[str]:
+        """FFmpeg command piping count evenly spaced MJPEG frames to stdout"""
+        return [
+            'ffmpeg',
+            '-loglevel', 'error',
+            *self._input_args(video_path),
+            '-vf', self._with_scale(f'fps={count}/{duration:.3f}'),
+            *self._quality_args,
+            '-frames:v', str(count),
+            *_MJPEG_PIPE_OUTPUT
+        ]
+
     def select_key_frames(
         self,
-        frame_paths: List[str],
+        frame_paths: List[T],
         count: int = 12
-    ) -> List[str]:
+    ) -> List[T]:
         """
         Select evenly distributed key frames for analysis
 
         Args:
-            frame_paths: List of all extracted frame paths
+            frame_paths: List of all extracted frame paths (or encoded frames)
             count: Target number of frames to select (default 12)
 
         Returns:
@@ -106,9 +633,13 @@ class FrameExtractor:
             logger.info(f"Using all {len(frame_paths)} frames (less than target {count})")
             return frame_paths
 
-        # Select evenly distributed frames
-        step = len(frame_paths) / count
-        selected = [frame_paths[int(i * step)] for i in range(count)]
+        # Select evenly distributed frames, always including first and last
+        # (integer math: index i * (n - 1) // (count - 1), like an endpoint-inclusive linspace)
+        if count <= 1:
+            selected = frame_paths[:count]
+        else:
+            last = len(frame_paths) - 1
+            selected = [frame_paths[i * last // (count - 1)] for i in range(count)]
 
         logger.info(f"Selected {len(selected)} key frames from {len(frame_paths)} total")
         return selected
@@ -118,16 +649,19 @@ class FrameExtractor:
         video_path: str,
         output_dir: str,
         target_count: int = 12,
-        threshold: float = 0.4
+        threshold: float = SCENE_CANDIDATE_THRESHOLD
     ) -> List[str]:
         """
         Extract frames using FFmpeg scene detection (detects visual changes)
 
+        Every frame scoring above threshold is a candidate; the target count
+        is then picked by accumulated scene score in the same pass.
+
         Args:
             video_path: Path to input video file
             output_dir: Directory to save extracted frames
             target_count: Target number of frames (default 12)
-            threshold: Scene change threshold 0-1 (default 0.4 = 40% change)
+            threshold: Candidate scene change threshold 0-1 (default 0.1 = 10% change)
 
         Returns:
             List of paths to scene-detected frame images
@@ -140,120 +674,154 @@ class FrameExtractor:
         if not video_file.exists():
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
+        # Short video fast path: skip the scene-detection decode pass
+        # (unknown duration: run scene detection, which doesn't need it)
+        try:
+            duration = _get_video_duration(video_path)
+        except ValueError:
+            duration = 0.0
+        if 0 < duration < target_count * SCENE_DETECTION_MIN_SECONDS_PER_FRAME:
+            logger.info("Video too short for scene detection (%.1fs), using uniform sampling", duration)
+            return self.extract_n_frames(video_path, output_dir, target_count)
+
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        output_pattern = str(output_path / "scene_%04d.jpg")
-
-        # FFmpeg scene detection filter
+        # FFmpeg scene detection filter, MJPEG over stdout (frame times to a side file)
+        times_path = os.path.join(output_dir, _SCENE_TIMES_FILENAME)
         cmd = [
             'ffmpeg',
-            '-i', str(video_path),
-            '-vf', f'select=gt(scene\\,{threshold})',  # Scene change > threshold
+            '-loglevel', 'error',
+            *self._input_args(video_path),
+            '-vf', self._scene_filter(threshold, times_path),  # Scene change > threshold
             '-vsync', 'vfr',  # Variable frame rate output
-            '-q:v', str(self.quality),
-            '-frames:v', str(self.max_frames),  # Safety limit
-            output_pattern
+            *self._quality_args,
+            *self._max_frames_args,  # Safety limit
+            *_MJPEG_PIPE_OUTPUT
         ]
-        cmd.extend(['-threads', '1', '-preset', 'ultrafast'])
 
         try:
             logger.info(f"Extracting frames using scene detection (threshold={threshold})")
-            result = subprocess.run(
-                cmd,
-                check=True,
-                capture_output=True,
-                text=True
+            scene_frames = self._run_with_hwaccel_fallback(
+                lambda c: list(_stream_mjpeg_frames(c)), cmd
             )
-            logger.debug(f"FFmpeg output: {result.stderr}")
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg scene detection failed: {e.stderr}")
             raise
 
-        # Get all scene-detected frames
-        frames = sorted(output_path.glob('scene_*.jpg'))
-        frame_paths = [str(f) for f in frames]
-
-        logger.info(f"Scene detection found {len(frame_paths)} key frames")
-
-        # If too many frames, sample evenly
-        if len(frame_paths) > target_count:
-            step = len(frame_paths) / target_count
-            selected = [frame_paths[int(i * step)] for i in range(target_count)]
-            logger.info(f"Downsampled to {len(selected)} frames")
-            return selected
-
-        # If too few frames, supplement with uniform sampling
-        if len(frame_paths) < target_count:
-            logger.warning(f"Only found {len(frame_paths)} scene changes (target: {target_count})")
-            logger.info("Supplementing with uniform sampling...")
-            return self._supplement_with_uniform(
-                video_path, output_dir, frame_paths, target_count
+        logger.info("Scene detection found %s key frames", len(scene_frames))
+        scene_times, scene_scores = _read_scene_metadata(times_path)
+        timed_frames = self._finalize_scene_frames(
+            video_path, output_dir, scene_frames, scene_times, scene_scores, target_count
+        )
+        return [path for _, path in timed_frames]
+
+    def _finalize_scene_frames(
+        self,
+        video_path: str,
+        output_dir: str,
+        scene_frames: List[bytes],
+        scene_times: List[float],
+        scene_scores: List[float],
+        target_count: int
+    ) -> List[TimedFrame]:
+        """
+        Downsample or supplement in-memory scene frames and write them to disk
+
+        Args:
+            video_path: Path to video file (for uniform supplementation)
+            output_dir: Output directory
+            scene_frames: Encoded scene-change frames in temporal order
+            scene_times: Timestamp of each scene frame (may be empty if unknown)
+            scene_scores: Scene score of each scene frame (may be empty if unknown)
+            target_count: Target number of frames
+
+        Returns:
+            (timestamp, path) of scene frames (plus uniform frames if too few
+            scenes), in temporal order
+        """
+        if len(scene_times) < len(scene_frames):
+            # No timing info from FFmpeg: assume the changes are evenly spread
+            duration = _get_video_duration(video_path)
+            step = duration / (len(scene_frames) + 1)
+            scene_times = [step * (i + 1) for i in range(len(scene_frames))]
+        if len(scene_scores) < len(scene_frames):
+            # Equal scores make the accumulator pick evenly by index
+            scene_scores = [1.0] * len(scene_frames)
+
+        # If too many frames, pick by accumulated change (only the picks hit disk)
+        indices = range(len(scene_frames))
+        if len(scene_frames) > target_count:
+            indices = _dynamic_scene_picks(scene_scores[:len(scene_frames)], target_count)
+
+        if len(scene_frames) >= target_count:
+            frame_paths = self._write_scene_frames(output_dir, scene_frames, scene_times, indices)
+            if len(scene_frames) > target_count:
+                logger.info("Downsampled to %s frames", len(frame_paths))
+            return frame_paths
+
+        # If too few frames, supplement with uniform sampling; the FFmpeg run
+        # overlaps writing the scene frames
+        logger.warning("Only found %s scene changes (target: %s)", len(scene_frames), target_count)
+        logger.info("Supplementing with uniform sampling...")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            uniform_future = executor.submit(
+                self._supplement_with_uniform,
+                video_path, output_dir, target_count - len(scene_frames)
             )
+            frame_paths = self._write_scene_frames(output_dir, scene_frames, scene_times, indices)
+            uniform_frames = uniform_future.result()
 
-        return frame_paths
+        # Combine and sort by timestamp (filenames would put all scene_* first)
+        return sorted(frame_paths + uniform_frames)
+
+    @staticmethod
+    def _write_scene_frames(
+        output_dir: str,
+        scene_frames: List[bytes],
+        scene_times: List[float],
+        indices: Iterable[int]
+    ) -> List[TimedFrame]:
+        """Write the scene frames at indices to disk as scene_NNNN.jpg"""
+        return [
+            (
+                scene_times[i],
+                _write_frame(os.path.join(output_dir, f"scene_{i + 1:04d}.jpg"), scene_frames[i])
+            )
+            for i in indices
+        ]
 
     def _supplement_with_uniform(
         self,
         video_path: str,
         output_dir: str,
-        existing_frames: List[str],
-        target_count: int
-    ) -> List[str]:
+        needed: int
+    ) -> List[TimedFrame]:
         """
-        Supplement scene-detected frames with uniform sampling
+        Extract uniform frames to supplement too few scene-detected frames
 
         Args:
             video_path: Path to video file
             output_dir: Output directory
-            existing_frames: Already extracted scene frames
-            target_count: Target total frame count
+            needed: Number of uniform frames to add
 
         Returns:
-            Combined list of scene + uniform frames, sorted by timestamp
+            (timestamp, path) of the uniform frames, in temporal order
         """
-        needed = target_count - len(existing_frames)
-        if needed <= 0:
-            return existing_frames
-
-        # Extract uniform frames
         logger.info(f"Extracting {needed} additional uniform frames")
-        uniform_pattern = str(Path(output_dir) / "uniform_%04d.jpg")
-
-        # Get video duration
-        duration_cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        result = subprocess.run(duration_cmd, capture_output=True, text=True)
-        duration = float(result.stdout.strip())
+
+        # Get video duration (cached per file version)
+        duration = _get_video_duration(video_path)
 
         # Calculate timestamps for uniform sampling
         step = duration / (needed + 1)
         timestamps = [step * (i + 1) for i in range(needed)]
 
-        # Extract frames at these timestamps
-        uniform_frames = []
-        for i, ts in enumerate(timestamps):
-            output_file = str(Path(output_dir) / f"uniform_{i:04d}.jpg")
-            cmd = [
-                'ffmpeg',
-                '-ss', str(ts),
-                '-i', video_path,
-                '-vframes', '1',
-                '-q:v', str(self.quality),
-                '-y',
-                output_file
-            ]
-            subprocess.run(cmd, capture_output=True, check=True)
-            uniform_frames.append(output_file)
-
-        # Combine and sort by filename (which reflects temporal order)
-        all_frames = existing_frames + uniform_frames
-        return sorted(all_frames)
+        # Extract frames at these timestamps (single FFmpeg pass or parallel seeks)
+        uniform_frames = self._extract_frames_at_timestamps(
+            video_path, output_dir, timestamps, prefix='uniform'
+        )
+        return list(zip(timestamps, uniform_frames))
 
     def extract_frames_hybrid(
         self,
@@ -265,6 +833,8 @@ class FrameExtractor:
         """
         Hybrid strategy: scene detection + uniform sampling
 
+        Both strategies share one decode pass (split filter graph).
+
         Args:
             video_path: Path to input video
             output_dir: Output directory
@@ -273,30 +843,86 @@ class FrameExtractor:
 
         Returns:
             List of frame paths combining both strategies
+
+        Raises:
+            subprocess.CalledProcessError: If FFmpeg fails
+            FileNotFoundError: If video file not found
         """
         scene_count = int(target_count * scene_ratio)
         uniform_count = target_count - scene_count
 
         logger.info(f"Hybrid extraction: {scene_count} scene frames + {uniform_count} uniform frames")
 
-        # Extract scene frames
-        scene_frames = self.extract_frames_by_scene_detection(
-            video_path,
-            output_dir,
-            target_count=scene_count,
-            threshold=0.4
+        video_file = Path(video_path)
+        if not video_file.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        if uniform_count == 0:
+            return self.extract_frames_by_scene_detection(video_path, output_dir, scene_count)
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        # Uniform timestamps (same spacing as _extract_uniform_frames_at_intervals)
+        duration = _get_video_duration(video_path)
+        step = duration / (uniform_count + 1)
+        timestamps = [step * (i + 1) for i in range(uniform_count)]
+
+        # Single decode: split feeds scene detection (piped) and uniform picks (files).
+        # Uniform frames log their actual times too: a missed timestamp must not
+        # shift every later frame onto the wrong time
+        times_path = os.path.join(output_dir, _SCENE_TIMES_FILENAME)
+        uniform_times_path = os.path.join(output_dir, _UNIFORM_TIMES_FILENAME)
+        scene_filter = self._scene_filter(SCENE_CANDIDATE_THRESHOLD, times_path)
+        uniform_filter = self._with_scale(
+            f'select={_timestamp_select_expr(timestamps)},'
+            'metadata=add:key=hybrid_uniform:value=1,'
+            f'metadata=print:key=hybrid_uniform:file={_escape_filter_path(uniform_times_path)}'
         )
+        filter_graph = (
+            '[0:v]split=2[a][b];'
+            f'[a]{scene_filter}[scene_out];'
+            f'[b]{uniform_filter}[uniform_out]'
+        )
+        cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',
+            *self._input_args(video_path),
+            '-filter_complex', filter_graph,
+            '-vsync', 'vfr',  # Only write selected frames
+            '-map', '[uniform_out]',
+            *self._quality_args,
+            '-frames:v', str(uniform_count),
+            '-start_number', '0',
+            '-y', str(output_path / "hybrid_uniform_%04d.jpg"),
+            '-map', '[scene_out]',
+            *self._quality_args,
+            *self._max_frames_args,  # Safety limit
+            *_MJPEG_PIPE_OUTPUT
+        ]
 
-        # Extract uniform frames at different timestamps
-        uniform_frames = self._extract_uniform_frames_at_intervals(
-            video_path,
-            output_dir,
-            count=uniform_count
+        try:
+            scene_frames = self._run_with_hwaccel_fallback(
+                lambda c: list(_stream_mjpeg_frames(c)), cmd
+            )
+        except subprocess.CalledProcessError as e:
+            logger.error("FFmpeg hybrid extraction failed: %s", e.stderr)
+            raise
+
+        logger.info("Scene detection found %s key frames", len(scene_frames))
+        scene_times, scene_scores = _read_scene_metadata(times_path)
+        scene_frames = self._finalize_scene_frames(
+            video_path, output_dir, scene_frames, scene_times, scene_scores, scene_count
         )
 
-        # Combine and sort
-        all_frames = scene_frames + uniform_frames
-        return sorted(all_frames)
+        uniform_frames = [
+            (ts, os.path.join(output_dir, f"hybrid_uniform_{i:04d}.jpg"))
+            for i, ts in enumerate(_read_frame_times(uniform_times_path))
+        ]
+        uniform_frames = [(ts, f) for ts, f in uniform_frames if os.path.exists(f)]
+
+        # Combine and sort by timestamp (filenames would put all hybrid_uniform_* first)
+        return [path for _, path in sorted(scene_frames + uniform_frames)]
 
     def _extract_uniform_frames_at_intervals(
         self,
@@ -305,38 +931,106 @@ class FrameExtractor:
         count: int
     ) -> List[str]:
         """Extract frames at uniform time intervals"""
-        # Get video duration
-        duration_cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        result = subprocess.run(duration_cmd, capture_output=True, text=True)
-        duration = float(result.stdout.strip())
+        # Get video duration (cached per file version)
+        duration = _get_video_duration(video_path)
 
         # Calculate timestamps
         step = duration / (count + 1)
         timestamps = [step * (i + 1) for i in range(count)]
 
-        # Extract frames
-        frames = []
-        for i, ts in enumerate(timestamps):
-            output_file = str(Path(output_dir) / f"hybrid_uniform_{i:04d}.jpg")
-            cmd = [
+        # Extract frames (single FFmpeg pass)
+        return self._extract_frames_at_timestamps(
+            video_path, output_dir, timestamps, prefix='hybrid_uniform'
+        )
+
+    def _extract_frames_at_timestamps(
+        self,
+        video_path: str,
+        output_dir: str,
+        timestamps: List[float],
+        prefix: str
+    ) -> List[str]:
+        """
+        Extract one frame per timestamp
+
+        Closely spaced timestamps use a single FFmpeg pass with a select filter
+        that keeps the first frame at or after each timestamp. Widely spaced
+        ones (long videos) seek to each timestamp in parallel instead, so the
+        footage in between is never decoded.
+
+        Args:
+            video_path: Path to video file
+            output_dir: Output directory
+            timestamps: Timestamps in seconds (ascending)
+            prefix: Output filename prefix ({prefix}_0000.jpg, ...)
+
+        Returns:
+            List of extracted frame paths in timestamp order
+        """
+        if not timestamps:
+            return []
+
+        spacing = timestamps[0] if len(timestamps) == 1 else timestamps[1] - timestamps[0]
+        if spacing >= SEEK_EXTRACTION_MIN_SPACING_S:
+            return self._extract_frames_by_seeking(video_path, output_dir, timestamps, prefix)
+
+        select_expr = _timestamp_select_expr(timestamps)
+        output_pattern = str(Path(output_dir) / f"{prefix}_%04d.jpg")
+
+        cmd = [
+            'ffmpeg',
+            *self._input_args(video_path),
+            '-vf', self._with_scale(f'select={select_expr}'),
+            '-vsync', 'vfr',  # Only write selected frames
+            *self._quality_args,
+            '-frames:v', str(len(timestamps)),
+            '-start_number', '0',
+            '-y',
+            output_pattern
+        ]
+        result = self._run_with_hwaccel_fallback(_run_ffmpeg, cmd)
+
+        # Timestamps closer than one frame apart collapse into a single frame,
+        # so take the written count from FFmpeg's final progress line
+        matches = _FFMPEG_FRAME_RE.findall(result.stderr or b'')
+        frames = [
+            os.path.join(output_dir, f"{prefix}_{i:04d}.jpg")
+            for i in range(int(matches[-1]) if matches else len(timestamps))
+        ]
+        if matches:
+            return frames
+        return [f for f in frames if os.path.exists(f)]
+
+    def _extract_frames_by_seeking(
+        self,
+        video_path: str,
+        output_dir: str,
+        timestamps: List[float],
+        prefix: str
+    ) -> List[str]:
+        """Extract one frame per timestamp with parallel fast-seek FFmpeg calls"""
+        workers = min(_CPU_COUNT, len(timestamps))
+        threads = _ffmpeg_threads_per_invocation(workers)
+        video_filter = self._with_scale('null')
+
+        def extract_one(task):
+            i, ts = task
+            output_file = os.path.join(output_dir, f"{prefix}_{i:04d}.jpg")
+            self._run_with_hwaccel_fallback(_run_ffmpeg, [
                 'ffmpeg',
                 '-ss', str(ts),
-                '-i', video_path,
+                *self._input_args(video_path),
                 '-vframes', '1',
-                '-q:v', str(self.quality),
+                '-vf', video_filter,
+                *self._quality_args,
+                '-threads', threads,
                 '-y',
                 output_file
-            ]
-            subprocess.run(cmd, capture_output=True, check=True)
-            frames.append(output_file)
+            ])
+            return output_file
 
-        return frames
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(extract_one, enumerate(timestamps)))
 
     def extract_and_select(
         self,
@@ -366,9 +1060,7 @@ class FrameExtractor:
                 video_path, output_dir, key_frame_count
             )
         else:  # uniform
-            all_frames = self.extract_frames(video_path, output_dir)
-            key_frames = self.select_key_frames(all_frames, key_frame_count)
-            return key_frames
+            return self.extract_n_frames(video_path, output_dir, key_frame_count)
 
 
 # Convenience function for single-use extraction
@@ -394,3 +1086,76 @@ def extract_key_frames(
     """
     extractor = FrameExtractor(max_frames=max_frames)
     return extractor.extract_and_select(video_path, output_dir, count, strategy)
+
+
+def _dhash(frame: Union[str, bytes], hash_size: int = DHASH_SIZE) -> int:
+    """Difference hash of a frame (path or JPEG bytes): one bit per horizontal brightness step"""
+    with Image.open(BytesIO(frame) if isinstance(frame, bytes) else frame) as img:
+        img.draft('L', (hash_size * 8, hash_size * 8))  # JPEG: decode at reduced scale
+        pixels = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).tobytes()
+
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(offset, offset + hash_size):
+            bits = (bits << 1) | (pixels[col] < pixels[col + 1])
+    return bits
+
+
+def dedupe_frames(
+    frames: List[Union[str, bytes]],
+    max_distance: int = DEDUPE_MAX_DISTANCE
+) -> List[Union[str, bytes]]:
+    """
+    Drop frames that look the same as the previously kept frame
+
+    Each frame is compared with the last kept one (not all kept frames), so a
+    static shot collapses to one frame while a return to an earlier shot,
+    usually showing later progress, is kept.
+
+    Args:
+        frames: Frame paths or JPEG bytes in time order
+        max_distance: Max differing dHash bits for a frame to count as a duplicate
+
+    Returns:
+        Kept frames in original order (unreadable frames are always kept)
+    """
+    kept = []
+    last_hash = None
+    for frame in frames:
+        try:
+            frame_hash = _dhash(frame)
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️  Could not hash frame for dedupe, keeping it: %s", e)
+            kept.append(frame)
+            last_hash = None
+            continue
+
+        if last_hash is not None and (frame_hash ^ last_hash).bit_count() <= max_distance:
+            continue
+        kept.append(frame)
+        last_hash = frame_hash
+
+    if len(kept) < len(frames):
+        logger.info("Deduplicated frames: %s -> %s", len(frames), len(kept))
+    return kept
+
+
+def extract_key_frames_to_memory(
+    video_path: str,
+    count: int = 12,
+    max_frames: int = 180
+) -> List[bytes]:
+    """
+    Extract evenly spaced key frames from video as JPEG bytes
+
+    Args:
+        video_path: Path to video file
+        count: Number of key frames to extract
+        max_frames: Maximum total frames to extract
+
+    Returns:
+        List of JPEG-encoded key frames
+    """
+    extractor = FrameExtractor(max_frames=max_frames)
+    return extractor.extract_n_frame_bytes(video_path, count)
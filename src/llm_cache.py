@@ -0,0 +1,211 @@
+"""
+LLM Analysis Cache
+Disk-backed cache of frame analysis results, keyed by the content of the LLM input
+
+Identical frames (+ thumbnail, prompt and model configuration) reuse the
+earlier recipe instead of calling the LLM again.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    from .analyzer import RecipeAnalyzer
+    from .extractor import _video_fingerprint
+    from .config import (
+        LLM_CACHE_DIR,
+        LLM_CACHE_TTL_SECONDS,
+        LLM_PROVIDER_PRIORITY,
+        GEMINI_MODEL
+    )
+except ImportError:
+    from analyzer import RecipeAnalyzer
+    from extractor import _video_fingerprint
+    from config import (
+        LLM_CACHE_DIR,
+        LLM_CACHE_TTL_SECONDS,
+        LLM_PROVIDER_PRIORITY,
+        GEMINI_MODEL
+    )
+
+logger = logging.getLogger(__name__)
+
+# Changes to prompts or model routing invalidate every cached analysis
+ANALYSIS_FINGERPRINT = hashlib.blake2b(
+    '\0'.join((
+        RecipeAnalyzer.SYSTEM_PROMPT,
+        RecipeAnalyzer.SINGLE_IMAGE_ADDITIONAL_PROMPT,
+        LLM_PROVIDER_PRIORITY,
+        GEMINI_MODEL
+    )).encode(),
+    digest_size=8
+).hexdigest()
+
+
+def _update_with_image(digest, image: Union[str, bytes]) -> None:
+    """Feed one length-prefixed image (bytes or file contents) into digest"""
+    if isinstance(image, str):
+        with open(image, 'rb') as f:
+            image = f.read()
+    digest.update(len(image).to_bytes(8, 'little'))
+    digest.update(image)
+
+
+def analysis_cache_key(
+    frames: List[Union[str, bytes]],
+    thumbnail: Optional[str] = None
+) -> str:
+    """
+    Cache key for an LLM analysis input
+
+    Frames are hashed in order (the LLM sees them in order); a local thumbnail
+    is hashed by content, a remote one by URL.
+
+    Args:
+        frames: Frame paths or encoded image bytes
+        thumbnail: Thumbnail path or URL passed to the analyzer
+
+    Returns:
+        Hex key (prompt/model fingerprint + content hash)
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    if thumbnail and os.path.exists(thumbnail):
+        _update_with_image(digest, thumbnail)
+    else:
+        digest.update((thumbnail or '').encode())
+    for frame in frames:
+        _update_with_image(digest, frame)
+    return f"{ANALYSIS_FINGERPRINT}{digest.hexdigest()}"
+
+
+def video_analysis_cache_key(video_path: str, frame_count: int, strategy: str) -> str:
+    """
+    Cache key for analyzing a downloaded video with given extraction settings
+
+    Available before frames are extracted (the video is keyed by its head
+    bytes + size), so a hit skips both extraction and the LLM call.
+
+    Args:
+        video_path: Downloaded video file
+        frame_count: Number of frames that would be extracted
+        strategy: Frame selection strategy
+
+    Returns:
+        Hex key (prompt/model fingerprint + video/settings hash)
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(f"video:{_video_fingerprint(video_path)}:{strategy}:{frame_count}".encode())
+    return f"{ANALYSIS_FINGERPRINT}{digest.hexdigest()}"
+
+
+class AnalysisCache:
+    """Stores analysis results as JSON files under a sharded directory"""
+
+    def __init__(
+        self,
+        cache_dir: str = LLM_CACHE_DIR,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS
+    ):
+        """
+        Initialize analysis cache
+
+        Args:
+            cache_dir: Root directory for cached results
+            ttl_seconds: How long cached results stay valid
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str) -> str:
+        """File path for a key ({cache_dir}/{key[:2]}/{key}.json)"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached analysis result
+
+        Expired or malformed entries are deleted and treated as misses.
+
+        Args:
+            key: Key from analysis_cache_key()
+
+        Returns:
+            Analysis result ({'recipe': ..., 'usage_metadata': ...}), or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Dropping unreadable analysis cache entry %s: %s", path, e)
+            self._remove(path)
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or not isinstance(entry.get('recipe'), dict)
+            or not isinstance(entry.get('usage_metadata'), dict)
+            or not isinstance(entry.get('ts'), (int, float))
+        ):
+            logger.warning("Dropping malformed analysis cache entry %s", path)
+            self._remove(path)
+            return None
+
+        if time.time() - entry['ts'] > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        return {'recipe': entry['recipe'], 'usage_metadata': entry['usage_metadata']}
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Cache analysis result (write failures are logged, not raised)
+
+        Args:
+            key: Key from analysis_cache_key()
+            result: Analysis result with 'recipe' and 'usage_metadata'
+        """
+        path = self._path(key)
+        entry = {
+            'recipe': result['recipe'],
+            'usage_metadata': result['usage_metadata'],
+            'ts': time.time()
+        }
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Failed to write analysis cache entry %s: %s", path, e)
+            if tmp_path:
+                self._remove(tmp_path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Delete a cache file, ignoring races with other workers"""
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# Global instance
+_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get or create global analysis cache"""
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache()
+    return _cache
@@ -2,11 +2,10 @@
 LLM Configuration and Provider Management
 Manages multiple LLM providers (Gemini, Grok, OpenAI) with automatic fallback and API key rotation
 """
-import os
+import itertools
 import logging
-from typing import List, Optional, Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+import threading
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from langchain_core.language_models import BaseChatModel
 
 try:
@@ -30,37 +29,50 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _parse_keys(keys_str: Optional[str]) -> Tuple[str, ...]:
+    """Split a comma-separated key string into stripped, non-empty keys"""
+    if not keys_str:
+        return ()
+    return tuple(k.strip() for k in keys_str.split(',') if k.strip())
+
+
+# Configured keys, parsed once at import
+GEMINI_KEYS = _parse_keys(GEMINI_API_KEYS)
+GROK_KEYS = _parse_keys(GROK_API_KEYS)
+OPENAI_KEYS = _parse_keys(OPENAI_API_KEYS)
+
+
 class APIKeyRotator:
     """Simple round-robin API key rotation"""
 
-    def __init__(self, keys: List[str]):
+    def __init__(self, keys: Sequence[str]):
         """
         Initialize key rotator
 
         Args:
-            keys: List of API keys to rotate
+            keys: API keys to rotate (e.g. a tuple from _parse_keys)
         """
-        # Filter out empty keys
-        self.keys = [k.strip() for k in keys if k and k.strip()]
-        self.index = 0
+        # Filter out empty keys (no-op for already parsed tuples)
+        self.keys = tuple(k.strip() for k in keys if k and k.strip())
 
         if not self.keys:
             raise ValueError("No valid API keys provided")
 
+        # C-level round-robin; next() on a cycle is atomic under the GIL, so the
+        # shared manager's rotators need no extra lock
+        self._cycle = itertools.cycle(enumerate(self.keys))
+        self._last_index = len(self.keys) - 1
+
         logger.info(f"APIKeyRotator initialized with {len(self.keys)} key(s)")
 
     def get_next(self) -> str:
         """Get next key in rotation"""
-        if not self.keys:
-            raise ValueError("No API keys available")
-
-        key = self.keys[self.index]
-        self.index = (self.index + 1) % len(self.keys)
+        self._last_index, key = next(self._cycle)
         return key
 
     def get_current_index(self) -> int:
         """Get current key index (for logging)"""
-        return (self.index - 1) % len(self.keys)
+        return self._last_index
 
 
 class LLMProviderManager:
@@ -82,11 +94,18 @@ class LLMProviderManager:
             openai_keys: Comma-separated OpenAI API keys
             provider_priority: Comma-separated provider priority (e.g., "gemini,grok,openai")
         """
-        self.gemini_keys_str = gemini_keys or GEMINI_API_KEYS
-        self.grok_keys_str = grok_keys or GROK_API_KEYS
-        self.openai_keys_str = openai_keys or OPENAI_API_KEYS
+        # Explicit arguments are parsed here; defaults were parsed at import
+        self.provider_keys: Dict[str, Tuple[str, ...]] = {
+            'gemini': _parse_keys(gemini_keys) if gemini_keys else GEMINI_KEYS,
+            'grok': _parse_keys(grok_keys) if grok_keys else GROK_KEYS,
+            'openai': _parse_keys(openai_keys) if openai_keys else OPENAI_KEYS,
+        }
         self.provider_priority = (provider_priority or LLM_PROVIDER_PRIORITY).split(',')
 
+        # Model instances reused per (provider, key): construction sets up HTTP clients
+        self._model_cache: Dict[Tuple[str, str], BaseChatModel] = {}
+        self._model_cache_lock = threading.Lock()  # Shared singleton: threadpool + active-mode jobs
+
         # Initialize key rotators
         self.key_rotators: Dict[str, Optional[APIKeyRotator]] = {}
         self._init_key_rotators()
@@ -99,41 +118,8 @@ class LLMProviderManager:
 
     def _init_key_rotators(self) -> None:
         """Initialize API key rotators for each provider"""
-        # Gemini
-        if self.gemini_keys_str:
-            try:
-                self.key_rotators['gemini'] = APIKeyRotator(
-                    self.gemini_keys_str.split(',')
-                )
-            except ValueError as e:
-                logger.warning(f"Failed to initialize Gemini key rotator: {e}")
-                self.key_rotators['gemini'] = None
-        else:
-            self.key_rotators['gemini'] = None
-
-        # Grok
-        if self.grok_keys_str:
-            try:
-                self.key_rotators['grok'] = APIKeyRotator(
-                    self.grok_keys_str.split(',')
-                )
-            except ValueError as e:
-                logger.warning(f"Failed to initialize Grok key rotator: {e}")
-                self.key_rotators['grok'] = None
-        else:
-            self.key_rotators['grok'] = None
-
-        # OpenAI
-        if self.openai_keys_str:
-            try:
-                self.key_rotators['openai'] = APIKeyRotator(
-                    self.openai_keys_str.split(',')
-                )
-            except ValueError as e:
-                logger.warning(f"Failed to initialize OpenAI key rotator: {e}")
-                self.key_rotators['openai'] = None
-        else:
-            self.key_rotators['openai'] = None
+        for provider_name, keys in self.provider_keys.items():
+            self.key_rotators[provider_name] = APIKeyRotator(keys) if keys else None
 
     def _build_provider_chain(self) -> None:
         """Build provider chain based on priority and available keys"""
@@ -167,6 +153,8 @@ class LLMProviderManager:
 
     def _create_gemini_model(self, api_key: str) -> BaseChatModel:
         """Create Gemini model instance"""
+        # Provider SDKs are imported on first use, so only configured ones load
+        from langchain_google_genai import ChatGoogleGenerativeAI
         return ChatGoogleGenerativeAI(
             model=GEMINI_MODEL,
             google_api_key=api_key,
@@ -175,6 +163,7 @@ class LLMProviderManager:
 
     def _create_grok_model(self, api_key: str) -> BaseChatModel:
         """Create Grok model instance (via OpenAI-compatible API)"""
+        from langchain_openai import ChatOpenAI
         return ChatOpenAI(
             model="grok-2-vision-1212",
             openai_api_key=api_key,
@@ -184,12 +173,26 @@ class LLMProviderManager:
 
     def _create_openai_model(self, api_key: str) -> BaseChatModel:
         """Create OpenAI GPT-4o model instance"""
+        from langchain_openai import ChatOpenAI
         return ChatOpenAI(
             model="gpt-4o",
             openai_api_key=api_key,
             temperature=0.7
         )
 
+    def _get_model(self, provider: Dict[str, Any], api_key: str) -> BaseChatModel:
+        """Get cached model for provider/key, creating it on first use"""
+        cache_key = (provider['name'], api_key)
+        model = self._model_cache.get(cache_key)
+        if model is None:
+            with self._model_cache_lock:
+                # Double-checked so concurrent callers build one model per key
+                model = self._model_cache.get(cache_key)
+                if model is None:
+                    model = provider['factory'](api_key)
+                    self._model_cache[cache_key] = model
+        return model
+
     def get_primary_model(self) -> BaseChatModel:
         """
         Get primary LLM model with automatic fallback
@@ -203,7 +206,7 @@ class LLMProviderManager:
         # Create primary model (first in priority)
         primary_provider = self.providers[0]
         primary_key = primary_provider['rotator'].get_next()
-        primary_model = primary_provider['factory'](primary_key)
+        primary_model = self._get_model(primary_provider, primary_key)
 
         logger.info(
             f"Primary model: {primary_provider['name']} "
@@ -215,7 +218,7 @@ class LLMProviderManager:
         for provider in self.providers[1:]:
             try:
                 key = provider['rotator'].get_next()
-                model = provider['factory'](key)
+                model = self._get_model(provider, key)
                 fallback_models.append(model)
                 logger.info(
                     f"Fallback model: {provider['name']} "
@@ -251,11 +254,15 @@ class LLMProviderManager:
 
 # Global instance (lazy initialization)
 _manager: Optional[LLMProviderManager] = None
+_manager_lock = threading.Lock()
 
 
 def get_llm_manager() -> LLMProviderManager:
     """Get or create global LLM provider manager"""
     global _manager
+    # Double-checked so concurrent first requests build only one manager
     if _manager is None:
-        _manager = LLMProviderManager()
+        with _manager_lock:
+            if _manager is None:
+                _manager = LLMProviderManager()
     return _manager
@@ -2,35 +2,92 @@
 Video Processor Service - FastAPI Application
 Handles video frame extraction and Gemini Vision analysis for recipe extraction
 """
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import anyio.to_thread
 import os
 import tempfile
 import shutil
 import logging
 import asyncio
 import gc
-from pathlib import Path
-from typing import Dict, Any
-
-from .extractor import extract_key_frames
+import random
+import time
+import httpx
+import json
+from io import BytesIO
+from typing import Any, Awaitable, Callable, Dict
+from PIL import Image
+
+from .extractor import extract_key_frames_to_memory
 from .analyzer import analyze_recipe_from_frames
 from .pipeline import analyze_recipe_from_url
 from .video_utils import get_video_metadata
 from .thumbnail_generator import ThumbnailProxy
+from .cache import get_recipe_cache
+from .downloader import canonicalize_url
+from .llm_cache import ANALYSIS_FINGERPRINT
 from .config import (
     ALLOWED_ORIGINS,
     GEMINI_API_KEY,
     PROCESSOR_MODE,
     BACKEND_API_URL,
-    POLL_INTERVAL_MS
+    POLL_INTERVAL_MS,
+    MAX_CONCURRENT_JOBS,
+    THREADPOOL_SIZE
 )
 
+try:
+    import orjson  # optional: faster recipe JSON serialization
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    DefaultResponse = JSONResponse
+
+    def _json_dumps(payload: Any) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode()
+
+    _json_loads = json.loads
+
+# Headers for pre-encoded JSON request bodies sent to the backend
+_JSON_HEADERS = {'content-type': 'application/json'}
+
+try:
+    import h2  # noqa: F401  (optional: enables HTTP/2 to the backend)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# CORS origins from the comma-separated env var ("https://a.com, https://b.com" is common)
+_CORS_ORIGINS = [origin.strip() for origin in ALLOWED_ORIGINS.split(',') if origin.strip()]
+
+# File extensions treated as images when the MIME type doesn't say so
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp'})
+
+# Bounding box for thumbnails uploaded to R2 (aspect ratio kept)
+THUMBNAIL_MAX_SIZE = (480, 480)
+
+# Failed active-mode jobs are skipped for this long, tracking at most this many
+FAILED_JOB_TTL_SECONDS = 24 * 3600
+FAILED_JOB_MAX_TRACKED = 10_000
+
+# Wall-clock budget for reporting one job failure, across all retries
+FAILURE_REPORT_DEADLINE_SECONDS = 30.0
+
+# Upload copy chunk size (1 MiB keeps per-chunk overhead low for multi-MB videos)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 # Memory optimization: More aggressive garbage collection for e2-micro (1GB RAM)
 gc.set_threshold(400, 5, 5)  # More aggressive than default (700, 10, 10)
 
@@ -39,19 +96,33 @@ gc.set_threshold(400, 5, 5)  # More aggressive than default (700, 10, 10)
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager
-    Start active mode worker if configured
+    Create the shared backend client and start active mode worker if configured
     """
     # Startup
+    # Analyses run in the threadpool; size it so concurrent ones don't queue
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # One keep-alive client for all backend calls (no handshake per poll)
+    app.state.client = httpx.AsyncClient(
+        timeout=300.0,  # 5 minute timeout
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
+    )
+
     if PROCESSOR_MODE == "active":
         logger.info(f"[Active Mode] Starting in ACTIVE mode")
         logger.info(f"[Active Mode] Will poll {BACKEND_API_URL} every {POLL_INTERVAL_MS}ms")
         # Start active mode worker as background task
-        task = asyncio.create_task(active_mode_worker())
+        task = asyncio.create_task(active_mode_worker(app.state.client))
     else:
         logger.info(f"[Passive Mode] Starting in PASSIVE mode (default)")
         logger.info(f"[Passive Mode] Waiting for requests on /analyze and /analyze-from-url endpoints")
         task = None
 
+    # Everything alive now (modules, clients, config) lives for the whole process:
+    # move it out of the tracked generations so later collections skip it
+    gc.freeze()
+
     yield
 
     # Shutdown
@@ -61,19 +132,22 @@ async def lifespan(app: FastAPI):
             await task
         except asyncio.CancelledError:
             pass
+    await app.state.client.aclose()
+    await get_recipe_cache().close()
 
 
 app = FastAPI(
     title="愛煮小幫手 Video Processor",
     description="Video frame extraction and Gemini Vision analysis service",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS.split(","),
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -109,20 +183,40 @@ async def readiness_check():
     return {"status": status, "checks": checks}
 
 
-def _upload_thumbnail(file_path: str) -> str | None:
+def _make_thumbnail(image: str | bytes) -> bytes:
     """
-    Upload thumbnail to R2, return URL or None
+    Downscale an image to a small progressive JPEG for R2
 
     Args:
-        file_path: Path to image file to upload
+        image: Path to image file, or encoded image bytes
+
+    Returns:
+        JPEG bytes no larger than THUMBNAIL_MAX_SIZE
+    """
+    with Image.open(BytesIO(image) if isinstance(image, bytes) else image) as img:
+        img.draft('RGB', THUMBNAIL_MAX_SIZE)  # JPEG: decode at reduced scale
+        thumb = img.convert('RGB')
+        thumb.thumbnail(THUMBNAIL_MAX_SIZE)
+        buffered = BytesIO()
+        thumb.save(buffered, format='JPEG', quality=80, optimize=True, progressive=True)
+        return buffered.getvalue()
+
+
+def _upload_thumbnail(image: str | bytes) -> str | None:
+    """
+    Downscale and upload thumbnail to R2, return URL or None
+
+    Args:
+        image: Path to image file, or encoded JPEG bytes, to upload
 
     Returns:
         Thumbnail URL or None if upload fails
     """
     try:
-        logger.info(f"Uploading thumbnail to R2: {file_path}")
         proxy = ThumbnailProxy()
-        thumbnail_url = proxy.upload_to_r2(file_path)
+        thumbnail = _make_thumbnail(image)
+        logger.info(f"Uploading thumbnail to R2 ({len(thumbnail)} bytes)")
+        thumbnail_url = proxy.upload_bytes_to_r2(thumbnail)
         logger.info(f"Thumbnail uploaded: {thumbnail_url}")
         return thumbnail_url
     except Exception as e:
@@ -130,6 +224,12 @@ def _upload_thumbnail(file_path: str) -> str | None:
         return None
 
 
+def _has_recipe(recipe_data: Dict[str, Any]) -> bool:
+    """True if analysis recognized a recipe (worth uploading a thumbnail for)"""
+    name = recipe_data.get('name')
+    return bool(name) and name != 'Unknown'
+
+
 def _build_response(
     recipe_data: Dict[str, Any],
     usage_metadata: Dict[str, Any],
@@ -146,16 +246,14 @@ def _build_response(
         video_info: Video/image file information
 
     Returns:
-        Complete response dictionary
-    """
-    return {
-        **recipe_data,
-        'thumbnail_url': thumbnail_url,
-        'metadata': {
-            'llm_usage': usage_metadata,  # Renamed from 'gemini_tokens' to be provider-agnostic
-            'video_info': video_info
-        }
+        Complete response dictionary (recipe_data, extended in place)
+    """
+    recipe_data['thumbnail_url'] = thumbnail_url
+    recipe_data['metadata'] = {
+        'llm_usage': usage_metadata,  # Renamed from 'gemini_tokens' to be provider-agnostic
+        'video_info': video_info
     }
+    return recipe_data
 
 
 def _process_image(file_path: str, file_size: int) -> Dict[str, Any]:
@@ -183,8 +281,8 @@ def _process_image(file_path: str, file_size: int) -> Dict[str, Any]:
     elif 'total_tokens' in usage_metadata:
         logger.info(f"Token usage: {usage_metadata['total_tokens']} tokens")
 
-    # Upload thumbnail
-    thumbnail_url = _upload_thumbnail(file_path)
+    # Upload thumbnail (skipped when no recipe was recognized)
+    thumbnail_url = _upload_thumbnail(file_path) if _has_recipe(recipe_data) else None
 
     # Build and return response
     return _build_response(
@@ -200,14 +298,15 @@ def _process_image(file_path: str, file_size: int) -> Dict[str, Any]:
     )
 
 
-def _process_video(file_path: str, file_size: int, temp_dir: str) -> Dict[str, Any]:
+def _process_video(file_path: str, file_size: int) -> Dict[str, Any]:
     """
     Process video file
 
+    Key frames stay in memory (FFmpeg pipe -> LLM / R2), never written to disk.
+
     Args:
         file_path: Path to video file
         file_size: File size in bytes
-        temp_dir: Temporary directory for frame extraction
 
     Returns:
         Response dictionary with recipe and metadata
@@ -220,9 +319,8 @@ def _process_video(file_path: str, file_size: int, temp_dir: str) -> Dict[str, A
     logger.info(f"Video file size: {file_size} bytes")
     logger.info(f"Video duration: {video_duration}s")
 
-    # Extract key frames
-    frames_dir = os.path.join(temp_dir, 'frames')
-    all_frames = extract_key_frames(file_path, frames_dir, count=12)
+    # Extract key frames (JPEG bytes)
+    all_frames = extract_key_frames_to_memory(file_path, count=12)
     logger.info(f"Extracted {len(all_frames)} frames")
 
     if not all_frames:
@@ -243,8 +341,8 @@ def _process_video(file_path: str, file_size: int, temp_dir: str) -> Dict[str, A
     elif 'total_tokens' in usage_metadata:
         logger.info(f"Token usage: {usage_metadata['total_tokens']} tokens")
 
-    # Upload thumbnail (use first frame)
-    thumbnail_url = _upload_thumbnail(all_frames[0])
+    # Upload thumbnail (use first frame; skipped when no recipe was recognized)
+    thumbnail_url = _upload_thumbnail(all_frames[0]) if _has_recipe(recipe_data) else None
 
     # Build and return response
     return _build_response(
@@ -273,14 +371,25 @@ def _is_image_file(content_type: str, filename: str) -> bool:
     """
     return (
         content_type.startswith('image/') or
-        filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp'))
+        os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
     )
 
 
-def _save_uploaded_file(upload: UploadFile, temp_dir: str, is_image: bool) -> str:
+def _upload_file_path(temp_dir: str, is_image: bool, filename: str) -> str:
+    """Destination for an upload (temp_dir is a fresh mkdtemp, so fixed names are unique)"""
+    if is_image:
+        ext = '.png' if filename.lower().endswith('.png') else '.jpg'  # Default to jpg
+        return os.path.join(temp_dir, f"image{ext}")
+    return os.path.join(temp_dir, "video.mp4")
+
+
+async def _save_uploaded_file(upload: UploadFile, temp_dir: str, is_image: bool) -> str:
     """
     Save uploaded file to temporary directory
 
+    Copies in chunks; reads and writes run in the threadpool so concurrent
+    uploads do not block the event loop.
+
     Args:
         upload: FastAPI UploadFile object
         temp_dir: Temporary directory path
@@ -289,23 +398,62 @@ def _save_uploaded_file(upload: UploadFile, temp_dir: str, is_image: bool) -> st
     Returns:
         Path to saved file
     """
-    if is_image:
-        ext = '.jpg'  # Default to jpg for images
-        if upload.filename and upload.filename.lower().endswith('.png'):
-            ext = '.png'
-        file_path = os.path.join(temp_dir, f"image_{os.urandom(4).hex()}{ext}")
-    else:
-        file_path = os.path.join(temp_dir, f"video_{os.urandom(4).hex()}.mp4")
-
+    file_path = _upload_file_path(temp_dir, is_image, upload.filename or '')
     with open(file_path, 'wb') as f:
-        shutil.copyfileobj(upload.file, f)
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(f.write, chunk)
 
     logger.info(f"Saved {'image' if is_image else 'video'}: {file_path}")
     return file_path
 
 
-@app.post("/analyze")
-async def analyze_video(video: UploadFile = File(...)):
+async def _save_request_body(request: Request, temp_dir: str, is_image: bool, filename: str) -> str:
+    """
+    Stream a raw request body to the temporary directory
+
+    Chunks are written as they arrive, without going through the multipart
+    parser or Starlette's spool file.
+
+    Args:
+        request: Incoming request whose body is the file itself
+        temp_dir: Temporary directory path
+        is_image: Whether file is an image
+        filename: Original file name (for the extension)
+
+    Returns:
+        Path to saved file
+    """
+    file_path = _upload_file_path(temp_dir, is_image, filename)
+    with open(file_path, 'wb') as f:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(f.write, chunk)
+
+    logger.info(f"Saved {'image' if is_image else 'video'} (raw body): {file_path}")
+    return file_path
+
+
+def _cleanup_temp_dir(temp_dir: str) -> None:
+    """
+    Remove a per-request temp directory (blocking; run in threadpool)
+
+    Args:
+        temp_dir: Temporary directory path
+    """
+    if not os.path.exists(temp_dir):
+        return
+    try:
+        shutil.rmtree(temp_dir)
+        logger.info(f"Cleaned up temp dir: {temp_dir}")
+    except Exception as e:
+        logger.warning(f"Failed to cleanup {temp_dir}: {e}")
+
+
+async def _analyze_media(
+    content_type: str,
+    filename: str,
+    save: Callable[[str, bool], Awaitable[str]]
+):
     """
     Analyze cooking video or image using Gemini Vision API
 
@@ -314,35 +462,43 @@ async def analyze_video(video: UploadFile = File(...)):
     2. Detect if image or video
     3. Route to appropriate processor (image or video)
     4. Return structured recipe JSON with metadata
-    5. Cleanup temp files
+    5. Cleanup temp files (in the background, after the response is sent)
 
     Args:
-        video: Uploaded video or image file
+        content_type: Declared MIME type of the upload
+        filename: Original file name
+        save: Coroutine function (temp_dir, is_image) -> saved file path
 
     Returns:
-        Recipe JSON with name, ingredients, steps, tags, and metadata
+        Response with recipe JSON (name, ingredients, steps, tags, and metadata)
     """
     temp_dir = None
 
     try:
         # Create temporary directory
-        temp_dir = tempfile.mkdtemp(prefix='recipeai_')
+        temp_dir = await run_in_threadpool(tempfile.mkdtemp, prefix='recipeai_')
         logger.info(f"Created temp dir: {temp_dir}")
 
         # Detect file type
-        content_type = video.content_type or ''
-        filename = video.filename or ''
         is_image = _is_image_file(content_type, filename)
 
         # Save uploaded file
-        file_path = _save_uploaded_file(video, temp_dir, is_image)
+        file_path = await save(temp_dir, is_image)
         file_size = os.path.getsize(file_path)
 
-        # Route to appropriate processor
+        # Route to appropriate processor (blocking FFmpeg/LLM work off the event loop)
         if is_image:
-            return _process_image(file_path, file_size)
+            result = await run_in_threadpool(_process_image, file_path, file_size)
         else:
-            return _process_video(file_path, file_size, temp_dir)
+            result = await run_in_threadpool(_process_video, file_path, file_size)
+
+        # Remove temp files after the response is sent instead of before
+        response = DefaultResponse(
+            content=result,
+            background=BackgroundTask(_cleanup_temp_dir, temp_dir)
+        )
+        temp_dir = None  # cleanup handed off to the response
+        return response
 
     except HTTPException:
         raise
@@ -354,17 +510,89 @@ async def analyze_video(video: UploadFile = File(...)):
         )
 
     finally:
-        # Cleanup temp files
-        if temp_dir and os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-                logger.info(f"Cleaned up temp dir: {temp_dir}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup {temp_dir}: {e}")
+        # Error path (background tasks don't run): hand cleanup to an executor
+        # thread without waiting, so the error response isn't held up; once
+        # submitted it runs to completion even if the client disconnects
+        if temp_dir:
+            asyncio.get_running_loop().run_in_executor(None, _cleanup_temp_dir, temp_dir)
+
+
+@app.post("/analyze")
+async def analyze_video(video: UploadFile = File(...)):
+    """
+    Analyze uploaded cooking video or image (multipart/form-data)
+
+    Args:
+        video: Uploaded video or image file
+
+    Returns:
+        Recipe JSON with name, ingredients, steps, tags, and metadata
+    """
+    return await _analyze_media(
+        video.content_type or '',
+        video.filename or '',
+        lambda temp_dir, is_image: _save_uploaded_file(video, temp_dir, is_image)
+    )
+
+
+@app.post("/analyze-raw")
+async def analyze_video_raw(request: Request):
+    """
+    Analyze cooking video or image sent as the raw request body
+
+    Skips multipart parsing for large videos: the body is streamed straight
+    to disk. Send the media type as Content-Type and the original file name
+    in the X-Filename header.
+
+    Args:
+        request: Request whose body is the video or image file
+
+    Returns:
+        Recipe JSON with name, ingredients, steps, tags, and metadata
+    """
+    content_type = request.headers.get('content-type', '')
+    filename = request.headers.get('x-filename', '')
+    return await _analyze_media(
+        content_type,
+        filename,
+        lambda temp_dir, is_image: _save_request_body(request, temp_dir, is_image, filename)
+    )
+
+
+async def _analyze_url_cached(video_url: str, no_cache: bool = False) -> Dict[str, Any]:
+    """
+    Analyze a video URL, reusing the cached result for videos seen before
+
+    Results are cached per canonical video id (any share link for the same
+    video hits) and per prompt/model configuration.
+
+    Args:
+        video_url: Video URL
+        no_cache: Skip the lookup and re-analyze (the fresh result is still cached)
+
+    Only results with a recognized recipe are cached, so a failed or partial
+    analysis is retried on the next request instead of pinned for the TTL.
+
+    Returns:
+        Recipe data from analyze_recipe_from_url
+    """
+    cache = get_recipe_cache()
+    cache_id = f"{canonicalize_url(video_url)}:{ANALYSIS_FINGERPRINT}"
+    if not no_cache:
+        cached = await cache.get(cache_id)
+        if cached is not None:
+            logger.info(f"Using cached analysis for URL: {video_url}")
+            return cached
+
+    # Use pipeline to handle download -> extract -> analyze (blocking, so off the event loop)
+    recipe_data = await run_in_threadpool(analyze_recipe_from_url, video_url, cleanup=True)
+    if _has_recipe(recipe_data):
+        await cache.set(cache_id, recipe_data)
+    return recipe_data
 
 
 @app.post("/analyze-from-url")
-async def analyze_video_from_url(video_url: str = Form(...)):
+async def analyze_video_from_url(video_url: str = Form(...), no_cache: bool = Form(False)):
     """
     Analyze cooking video from URL using Gemini Vision API
 
@@ -378,6 +606,7 @@ async def analyze_video_from_url(video_url: str = Form(...)):
 
     Args:
         video_url: Video URL (supports YouTube, Instagram, Facebook, etc.)
+        no_cache: Force a fresh analysis instead of returning a cached result
 
     Returns:
         Recipe JSON with name, ingredients, steps, tags, completeness status
@@ -385,8 +614,7 @@ async def analyze_video_from_url(video_url: str = Form(...)):
     try:
         logger.info(f"Analyzing video from URL: {video_url}")
 
-        # Use pipeline to handle download -> extract -> analyze
-        recipe_data = analyze_recipe_from_url(video_url, cleanup=True)
+        recipe_data = await _analyze_url_cached(video_url, no_cache=no_cache)
 
         logger.info(f"Analysis complete: {recipe_data.get('name', 'Unknown')}")
         return recipe_data
@@ -433,8 +661,8 @@ async def process_job(job: Dict[str, Any]) -> Dict[str, Any]:
     # Choose processing method based on input type
     if video_url:
         logger.info(f"[Active Mode] Analyzing from URL: {video_url}")
-        # Use existing analyze_recipe_from_url function
-        recipe_data = analyze_recipe_from_url(video_url, cleanup=True)
+        # Analysis runs in a worker thread so concurrent jobs and the event loop keep running
+        recipe_data = await _analyze_url_cached(video_url)
 
         return {
             'recipe': recipe_data,
@@ -448,7 +676,7 @@ async def process_job(job: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def _report_job_failure(
-    client,
+    client: httpx.AsyncClient,
     job_id: str,
     error_message: str,
     error_type: str = "unknown",
@@ -462,19 +690,22 @@ async def _report_job_failure(
         job_id: Job ID
         error_message: Error description
         error_type: Type of error (validation, processing, network, etc.)
-        retries: Number of retry attempts
+        retries: Maximum number of attempts (all within FAILURE_REPORT_DEADLINE_SECONDS)
 
     Returns:
         True if failure was reported successfully, False if all retries failed
     """
+    # Encoded once: every attempt carries the same timestamp so the backend can dedupe
+    failure_body = _json_dumps({
+        'error_type': error_type,
+        'error_message': error_message,
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    })
+
+    deadline = time.monotonic() + FAILURE_REPORT_DEADLINE_SECONDS
+
     for attempt in range(retries):
         try:
-            failure_payload = {
-                'error_type': error_type,
-                'error_message': error_message,
-                'timestamp': str(__import__('datetime').datetime.utcnow().isoformat())
-            }
-
             logger.info(
                 f"[Active Mode] Reporting failure for job {job_id} "
                 f"(attempt {attempt + 1}/{retries}): {error_type}"
@@ -482,45 +713,48 @@ async def _report_job_failure(
 
             resp = await client.put(
                 f"{BACKEND_API_URL}/v1/analysis/{job_id}/failure",
-                json=failure_payload,
-                timeout=30.0
+                content=failure_body,
+                headers=_JSON_HEADERS,
+                timeout=max(1.0, deadline - time.monotonic())
             )
+            resp.raise_for_status()
 
-            if resp.status_code == 200:
-                logger.info(f"[Active Mode] ✅ Failure reported for job {job_id}")
-                return True
-            else:
-                logger.warning(
-                    f"[Active Mode] Failed to report failure for job {job_id}: "
-                    f"{resp.status_code} - {resp.text[:200]}"
-                )
-
-                # Exponential backoff before retry
-                if attempt < retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.info(f"[Active Mode] Retrying in {wait_time}s...")
-                    await asyncio.sleep(wait_time)
+            logger.info(f"[Active Mode] ✅ Failure reported for job {job_id}")
+            return True
 
+        except httpx.HTTPStatusError as e:
+            logger.warning(
+                f"[Active Mode] Failed to report failure for job {job_id}: "
+                f"{e.response.status_code} - {e.response.text[:200]}"
+            )
         except Exception as e:
             logger.warning(
                 f"[Active Mode] Error reporting failure for job {job_id}: {str(e)}"
             )
-            if attempt < retries - 1:
-                wait_time = 2 ** attempt
-                await asyncio.sleep(wait_time)
+
+        # Exponential backoff with jitter so jobs failing together don't retry in lockstep
+        if attempt < retries - 1:
+            wait_time = (2 ** attempt) * (0.5 + random.random())
+            if time.monotonic() + wait_time > deadline:
+                break
+            logger.info(f"[Active Mode] Retrying in {wait_time:.1f}s...")
+            await asyncio.sleep(wait_time)
 
     logger.error(
         f"[Active Mode] ❌ Failed to report failure for job {job_id} "
-        f"after {retries} attempts"
+        f"after {attempt + 1} attempts"
     )
     return False
 
 
-async def active_mode_worker():
+async def active_mode_worker(client: httpx.AsyncClient):
     """
     Active mode worker that polls backend API for failed jobs
     Runs indefinitely until application shutdown
 
+    Args:
+        client: Shared httpx AsyncClient (connections kept alive across polls)
+
     Flow:
     1. Poll backend for failed jobs
     2. Process each job (analyze video/images)
@@ -528,118 +762,126 @@ async def active_mode_worker():
     4. On failure (first attempt): Do not report, just skip on next poll
     5. Silent failure handling - no user notification after retry fails
     """
-    import httpx
-    import time
-
     poll_interval_seconds = POLL_INTERVAL_MS / 1000
     logger.info(f"[Active Mode] Starting active worker (poll interval: {poll_interval_seconds}s)")
     logger.info(f"[Active Mode] Backend API: {BACKEND_API_URL}")
 
-    # Local tracking of already-failed jobs to prevent infinite retry
-    processed_failures = set()
-    last_reset_time = time.time()
-    RESET_INTERVAL_HOURS = 24
-    RESET_INTERVAL_SECONDS = RESET_INTERVAL_HOURS * 3600
+    # Local tracking of already-failed jobs to prevent infinite retry: job_id ->
+    # expiry. Fixed TTL, so insertion order is expiry order (oldest first)
+    processed_failures: OrderedDict[str, float] = OrderedDict()
+
+    def mark_failed(job_id: str) -> None:
+        """Skip job_id until its FAILED_JOB_TTL_SECONDS pass (bounded in size)"""
+        processed_failures[job_id] = time.monotonic() + FAILED_JOB_TTL_SECONDS
+        processed_failures.move_to_end(job_id)
+        while len(processed_failures) > FAILED_JOB_MAX_TRACKED:
+            processed_failures.popitem(last=False)
+
+    job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
+    async def run_job(job: Dict[str, Any]) -> None:
+        """Process one job and submit its result; failures are tracked, never raised"""
+        job_id = job['job_id']
+        async with job_slots:
+            try:
+                # Process the job
+                result = await process_job(job)
+
+                # 3. Submit result back to backend (success path)
+                logger.info(f"[Active Mode] Submitting result for job {job_id}")
+                submit_resp = await client.put(
+                    f"{BACKEND_API_URL}/v1/analysis/{job_id}/result",
+                    content=_json_dumps(result),
+                    headers=_JSON_HEADERS,
+                    timeout=30.0
+                )
+
+                if submit_resp.status_code == 200:
+                    logger.info(f"[Active Mode] ✅ Job {job_id} completed successfully")
+                else:
+                    # Failed to submit result - mark as processed failure but don't report
+                    error_msg = (
+                        f"Failed to submit result: "
+                        f"{submit_resp.status_code} - {submit_resp.text[:200]}"
+                    )
+                    logger.error(f"[Active Mode] Job {job_id} submission failed (silent): {error_msg}")
+                    mark_failed(job_id)
+
+            except ValueError as e:
+                # Input validation error - silent failure
+                error_msg = f"Invalid job input: {str(e)}"
+                logger.error(f"[Active Mode] Job {job_id} validation error (silent): {error_msg}")
+                mark_failed(job_id)
+
+            except NotImplementedError as e:
+                # Feature not implemented - silent failure
+                error_msg = f"Feature not implemented: {str(e)}"
+                logger.error(f"[Active Mode] Job {job_id} not implemented (silent): {error_msg}")
+                mark_failed(job_id)
+
+            except Exception as e:
+                # Generic processing error - silent failure
+                error_msg = str(e)
+                logger.error(
+                    f"[Active Mode] Job {job_id} processing failed (silent): {error_msg}",
+                    exc_info=True
+                )
+                mark_failed(job_id)
 
     while True:
         try:
-            # Reset processed failures every 24 hours
-            current_time = time.time()
-            if current_time - last_reset_time > RESET_INTERVAL_SECONDS:
-                logger.info(f"[Active Mode] Resetting processed failures (tracked {len(processed_failures)} jobs)")
-                processed_failures.clear()
-                last_reset_time = current_time
-
-            async with httpx.AsyncClient(timeout=300.0) as client:  # 5 minute timeout
-                # 1. Poll for failed jobs
-                logger.info(f"[Active Mode] Polling for failed jobs... (currently tracking {len(processed_failures)} failed retries)")
-                resp = await client.get(
-                    f"{BACKEND_API_URL}/v1/analysis/failed",
-                    params={"limit": 3}
-                )
+            # Expire failures past their TTL so those jobs get retried
+            now = time.monotonic()
+            while processed_failures and next(iter(processed_failures.values())) <= now:
+                processed_failures.popitem(last=False)
+
+            # 1. Poll for failed jobs
+            logger.info(f"[Active Mode] Polling for failed jobs... (currently tracking {len(processed_failures)} failed retries)")
+            resp = await client.get(
+                f"{BACKEND_API_URL}/v1/analysis/failed",
+                params={"limit": MAX_CONCURRENT_JOBS}
+            )
 
-                if resp.status_code != 200:
-                    logger.error(f"[Active Mode] Failed to fetch jobs: {resp.status_code} - {resp.text}")
-                    await asyncio.sleep(poll_interval_seconds)
-                    continue
+            if resp.status_code != 200:
+                logger.error(f"[Active Mode] Failed to fetch jobs: {resp.status_code} - {resp.text}")
+                await asyncio.sleep(poll_interval_seconds)
+                continue
 
-                # Parse JSON response with error handling
-                try:
-                    response_text = resp.text
-                    if not response_text or response_text.strip() == '':
-                        logger.warning("[Active Mode] Backend returned empty response, waiting for next poll...")
-                        await asyncio.sleep(poll_interval_seconds)
-                        continue
-
-                    data = resp.json()
-                except Exception as e:
-                    logger.error(f"[Active Mode] Failed to parse JSON response: {e}")
-                    logger.error(f"[Active Mode] Response status: {resp.status_code}")
-                    logger.error(f"[Active Mode] Response text (first 500 chars): {response_text[:500] if response_text else 'None'}")
+            # Parse JSON response with error handling
+            try:
+                response_text = resp.text
+                if not response_text or response_text.strip() == '':
+                    logger.warning("[Active Mode] Backend returned empty response, waiting for next poll...")
                     await asyncio.sleep(poll_interval_seconds)
                     continue
 
-                jobs = data.get('jobs', [])
-
-                if not jobs:
-                    logger.info("[Active Mode] No failed jobs found")
-                    await asyncio.sleep(poll_interval_seconds)
+                data = _json_loads(resp.content)
+            except Exception as e:
+                logger.error(f"[Active Mode] Failed to parse JSON response: {e}")
+                logger.error(f"[Active Mode] Response status: {resp.status_code}")
+                logger.error(f"[Active Mode] Response text (first 500 chars): {response_text[:500] if response_text else 'None'}")
+                await asyncio.sleep(poll_interval_seconds)
+                continue
+
+            jobs = data.get('jobs', [])
+
+            if not jobs:
+                logger.info("[Active Mode] No failed jobs found")
+                await asyncio.sleep(poll_interval_seconds)
+                continue
+
+            logger.info(f"[Active Mode] Found {len(jobs)} failed jobs")
+
+            # 2. Process jobs concurrently (bounded by MAX_CONCURRENT_JOBS)
+            pending = []
+            for job in jobs:
+                # Skip if this job has already failed retry once
+                if job['job_id'] in processed_failures:
+                    logger.info(f"[Active Mode] ⏭️  Skipping job {job['job_id']} (already failed retry, silently ignoring)")
                     continue
+                pending.append(run_job(job))
 
-                logger.info(f"[Active Mode] Found {len(jobs)} failed jobs")
-
-                # 2. Process each job
-                for job in jobs:
-                    job_id = job['job_id']
-
-                    # Skip if this job has already failed retry once
-                    if job_id in processed_failures:
-                        logger.info(f"[Active Mode] ⏭️  Skipping job {job_id} (already failed retry, silently ignoring)")
-                        continue
-
-                    try:
-                        # Process the job
-                        result = await process_job(job)
-
-                        # 3. Submit result back to backend (success path)
-                        logger.info(f"[Active Mode] Submitting result for job {job_id}")
-                        submit_resp = await client.put(
-                            f"{BACKEND_API_URL}/v1/analysis/{job_id}/result",
-                            json=result,
-                            timeout=30.0
-                        )
-
-                        if submit_resp.status_code == 200:
-                            logger.info(f"[Active Mode] ✅ Job {job_id} completed successfully")
-                        else:
-                            # Failed to submit result - mark as processed failure but don't report
-                            error_msg = (
-                                f"Failed to submit result: "
-                                f"{submit_resp.status_code} - {submit_resp.text[:200]}"
-                            )
-                            logger.error(f"[Active Mode] Job {job_id} submission failed (silent): {error_msg}")
-                            processed_failures.add(job_id)
-
-                    except ValueError as e:
-                        # Input validation error - silent failure
-                        error_msg = f"Invalid job input: {str(e)}"
-                        logger.error(f"[Active Mode] Job {job_id} validation error (silent): {error_msg}")
-                        processed_failures.add(job_id)
-
-                    except NotImplementedError as e:
-                        # Feature not implemented - silent failure
-                        error_msg = f"Feature not implemented: {str(e)}"
-                        logger.error(f"[Active Mode] Job {job_id} not implemented (silent): {error_msg}")
-                        processed_failures.add(job_id)
-
-                    except Exception as e:
-                        # Generic processing error - silent failure
-                        error_msg = str(e)
-                        logger.error(
-                            f"[Active Mode] Job {job_id} processing failed (silent): {error_msg}",
-                            exc_info=True
-                        )
-                        processed_failures.add(job_id)
+            await asyncio.gather(*pending, return_exceptions=True)
 
         except Exception as e:
             logger.error(f"[Active Mode] Polling error: {str(e)}", exc_info=True)
@@ -648,14 +890,53 @@ async def active_mode_worker():
         await asyncio.sleep(poll_interval_seconds)
 
 
+def _available_memory_bytes() -> int | None:
+    """
+    Memory available for new processes (MemAvailable), or total RAM as fallback
+
+    Returns:
+        Bytes, or None if it cannot be determined on this platform
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _worker_count(requested: int, cpu_count: int, worker_memory_mb: int) -> int:
+    """
+    Number of uvicorn workers, clamped so they fit in available memory
+
+    Args:
+        requested: Configured worker count (0 = one per CPU core)
+        cpu_count: Detected CPU cores
+        worker_memory_mb: Budgeted memory per worker
+
+    Returns:
+        Worker count (at least 1)
+    """
+    workers = requested if requested > 0 else cpu_count
+    available = _available_memory_bytes()
+    if available is not None:
+        workers = min(workers, max(1, available // (worker_memory_mb * 1024 * 1024)))
+    return workers
+
+
 if __name__ == "__main__":
     import uvicorn
     import multiprocessing
-    from .config import HOST, PORT, UVICORN_WORKERS
+    from .config import HOST, PORT, UVICORN_WORKERS, WORKER_MEMORY_MB
 
-    # Calculate workers based on CPU cores if not specified
+    # One worker per CPU core if not specified, capped by available memory (e2-micro: 1GB)
     cpu_count = multiprocessing.cpu_count()
-    workers = UVICORN_WORKERS if UVICORN_WORKERS > 0 else cpu_count * 2
+    workers = _worker_count(UVICORN_WORKERS, cpu_count, WORKER_MEMORY_MB)
 
     logger.info(f"Starting 愛煮小幫手 Video Processor on {HOST}:{PORT}")
     logger.info(f"Gemini API key configured: {bool(GEMINI_API_KEY)}")
@@ -666,5 +947,8 @@ if __name__ == "__main__":
         "src.main:app",
         host=HOST,
         port=PORT,
-        workers=workers
+        workers=workers,
+        loop="uvloop",       # via uvicorn[standard]
+        http="httptools",
+        access_log=False     # health checks would otherwise log every probe
     )
@@ -5,26 +5,283 @@ Version 2.0: Streaming frame extraction (no download required for most cases)
 """
 import os
 import gc
+import asyncio
+import bisect
+import copy
+import hashlib
+import threading
+import time
 import tempfile
 import shutil
 import logging
-from typing import Dict, Any, Optional
-from pathlib import Path
-
-from .downloader import download_video
-from .extractor import extract_key_frames
+from contextlib import suppress
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Union
+
+from .downloader import canonicalize_url, download_video, DownloadResult
+from .thumbnail_generator import _SESSION as _THUMBNAIL_SESSION
+from .extractor import dedupe_frames, extract_key_frames
 from .analyzer import analyze_recipe_from_frames
+from .llm_cache import analysis_cache_key, get_analysis_cache, video_analysis_cache_key
 from .video_utils import get_video_metadata
 from .streaming_extractor import (
-    extract_frames_from_stream,
+    extract_frame_bytes_from_pipe,
     get_video_metadata_only,
     StreamingError
 )
-from .config import EXTRACTION_MODE
+from .config import EXTRACTION_MODE, MIN_RECIPE_VIDEO_SECONDS, VIDEO_CACHE_DIR, VIDEO_CACHE_MAX_BYTES
 
 logger = logging.getLogger(__name__)
 
+# Thumbnail prefetch runs alongside ffprobe/FFmpeg frame extraction
+_THUMBNAIL_PREFETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='thumb-prefetch')
+
+# Temp dir removal + GC after each run; worker threads are joined at interpreter
+# exit, so queued cleanups still finish on shutdown
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-cleanup')
+
+# Pipeline temp dirs live under a per-worker root ({tmp}/recipeai_w<pid>/); any
+# left behind by killed or crashed runs are swept once older than the max age
+_TEMP_ROOT_PREFIX = 'recipeai_w'
+TEMP_DIR_MAX_AGE_SECONDS = 3600
+TEMP_SWEEP_INTERVAL_SECONDS = 600
+_last_temp_sweep = 0.0
+
+# Extracted frames are written by FFmpeg and read straight back for the LLM
+# upload, so they go to RAM-backed tmpfs when available. Downloads stay on
+# disk: container /dev/shm is often only 64MB.
+_FRAMES_TMPFS = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+def _worker_temp_root(base_dir: Optional[str] = None) -> str:
+    """
+    Per-process parent directory for pipeline temp dirs (created on demand)
+
+    Args:
+        base_dir: Directory to create the root in (default: system temp dir)
+    """
+    root = os.path.join(base_dir or tempfile.gettempdir(), f"{_TEMP_ROOT_PREFIX}{os.getpid()}")
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def _sweep_stale_temp_dirs() -> None:
+    """
+    Remove pipeline temp dirs older than TEMP_DIR_MAX_AGE_SECONDS
+
+    Covers the roots of all workers (including ones that died), at most once
+    per TEMP_SWEEP_INTERVAL_SECONDS.
+    """
+    global _last_temp_sweep
+    now = time.time()
+    if now - _last_temp_sweep < TEMP_SWEEP_INTERVAL_SECONDS:
+        return
+    _last_temp_sweep = now
+
+    for base_dir in filter(None, (tempfile.gettempdir(), _FRAMES_TMPFS)):
+        with os.scandir(base_dir) as roots:
+            for root in roots:
+                if not root.name.startswith(_TEMP_ROOT_PREFIX) or not root.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(root.path) as entries:
+                    for entry in entries:
+                        with suppress(OSError):
+                            if now - entry.stat(follow_symlinks=False).st_mtime > TEMP_DIR_MAX_AGE_SECONDS:
+                                logger.info("Removing stale temp directory: %s", entry.path)
+                                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _cleanup_after_run(*temp_dirs: Optional[str]) -> None:
+    """
+    Remove pipeline temp directories and collect garbage
+
+    Args:
+        temp_dirs: Directories to remove (None entries are skipped)
+    """
+    for temp_dir in temp_dirs:
+        if temp_dir and os.path.exists(temp_dir):
+            try:
+                shutil.rmtree(temp_dir)
+                logger.info("Cleaned up temp directory: %s", temp_dir)
+            except Exception as e:
+                logger.warning("Failed to cleanup %s: %s", temp_dir, e)
+
+    try:
+        _sweep_stale_temp_dirs()
+    except OSError as e:
+        logger.warning("Stale temp directory sweep failed: %s", e)
+
+    # Frames/results are freed by refcount once dropped; this only reclaims
+    # short-lived cycles (a full gen-2 sweep also walks every long-lived object)
+    gc.collect(1)
+
+
+def _retain_video(url: str, video_path: str) -> str:
+    """
+    Move a downloaded video into the retained-video cache for later re-analysis
+
+    One file per canonical URL; least recently used files beyond
+    VIDEO_CACHE_MAX_BYTES are evicted (reuse refreshes a file's mtime).
+
+    Args:
+        url: Video URL the file was downloaded from
+        video_path: Downloaded video (usually inside the run's temp dir)
+
+    Returns:
+        Path of the retained video
+    """
+    if os.path.dirname(os.path.abspath(video_path)) == os.path.abspath(VIDEO_CACHE_DIR):
+        return video_path  # Already retained (re-analysis of a retained video)
+
+    os.makedirs(VIDEO_CACHE_DIR, exist_ok=True)
+    name = hashlib.blake2b(canonicalize_url(url).encode(), digest_size=16).hexdigest()
+    retained_path = os.path.join(VIDEO_CACHE_DIR, name + os.path.splitext(video_path)[1])
+    shutil.move(video_path, retained_path)
+
+    entries = []
+    with os.scandir(VIDEO_CACHE_DIR) as it:
+        for entry in it:
+            with suppress(OSError):
+                if entry.is_file(follow_symlinks=False) and entry.path != retained_path:
+                    stat = entry.stat(follow_symlinks=False)
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = os.path.getsize(retained_path) + sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= VIDEO_CACHE_MAX_BYTES:
+            break
+        with suppress(OSError):
+            os.unlink(path)
+            total -= size
+            logger.info("Evicted retained video: %s", path)
+
+    logger.info("Retained video for re-analysis: %s", retained_path)
+    return retained_path
+
+
+def _prefetch_thumbnail(download_result: DownloadResult, output_path: str) -> Optional[str]:
+    """
+    Wait for the thumbnail upload and download the image for analysis
+
+    Runs in the background while frames are extracted, so the analyzer gets a
+    local file instead of fetching the URL after extraction.
+
+    Args:
+        download_result: Download result whose thumbnail may still be processing
+        output_path: Where to save the thumbnail image
+
+    Returns:
+        Local thumbnail path, the thumbnail URL if prefetching failed, or None
+    """
+    thumbnail_url = download_result.thumbnail_url
+    if not thumbnail_url or not thumbnail_url.startswith(('http://', 'https://')):
+        return thumbnail_url
+
+    try:
+        # Shared keep-alive client; longer timeout than proxying since analysis needs the image
+        response = _THUMBNAIL_SESSION.get(thumbnail_url, timeout=30)
+        response.raise_for_status()
+        with open(output_path, 'wb') as f:
+            f.write(response.content)
+        logger.info("Prefetched thumbnail for analysis: %s", output_path)
+        return output_path
+    except Exception as e:
+        # The analyzer will try the URL itself
+        logger.warning("Thumbnail prefetch failed, analyzer will fetch it: %s", e)
+        return thumbnail_url
+
+# LLM analyses currently running, by analysis cache key (see _analyze_frames_cached)
+_inflight_analyses: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _analyze_frames_cached(
+    frames: list,
+    api_key: Optional[str],
+    thumbnail: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Analyze frames, reusing the cached result for identical LLM input
+
+    Concurrent calls with identical input share one LLM call: the first
+    runs it, the rest wait for its result.
+
+    Args:
+        frames: Frame paths or encoded image bytes
+        api_key: Passed through to analyze_recipe_from_frames
+        thumbnail: Thumbnail path or URL for the analyzer
+
+    Returns:
+        Analysis result from analyze_recipe_from_frames (usage_metadata
+        carries cache_hit=True when served from cache or a shared call)
+    """
+    cache = get_analysis_cache()
+    key = analysis_cache_key(frames, thumbnail)
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("✅ LLM analysis cache hit (%s...), skipping LLM call", key[:16])
+        cached['usage_metadata']['cache_hit'] = True
+        return cached
+
+    with _inflight_lock:
+        inflight = _inflight_analyses.get(key)
+        if inflight is None:
+            _inflight_analyses[key] = Future()
+    if inflight is not None:
+        logger.info("Waiting for in-flight LLM analysis of identical frames (%s...)", key[:16])
+        shared = copy.deepcopy(inflight.result())  # Each caller gets its own copy
+        shared['usage_metadata']['cache_hit'] = True
+        return shared
+
+    future = _inflight_analyses[key]
+    try:
+        analysis_result = analyze_recipe_from_frames(frames, api_key=api_key, thumbnail_url=thumbnail)
+        cache.put(key, analysis_result)
+        future.set_result(copy.deepcopy(analysis_result))
+        return analysis_result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight_analyses[key]
+
+
+def _check_recipe_video(duration: float, is_live: bool = False) -> None:
+    """
+    Reject videos that cannot hold a recipe before any frames reach the LLM
+
+    An unknown duration (0) is let through, and MIN_RECIPE_VIDEO_SECONDS = 0
+    disables the length floor; photo carousels never get here.
+
+    Args:
+        duration: Video duration in seconds
+        is_live: True for live streams (from yt-dlp metadata)
+
+    Raises:
+        ValueError: If the video is a live stream or too short for a recipe
+    """
+    if is_live:
+        raise ValueError("Live streams are not supported")
+    if 0 < duration < MIN_RECIPE_VIDEO_SECONDS:
+        raise ValueError(
+            f"Video too short for a recipe ({duration:.1f}s < {MIN_RECIPE_VIDEO_SECONDS:g}s)"
+        )
+
 
+# Frame counts by duration band: videos under each threshold (5/10/15 min) get
+# the matching count; longer ones get duration // seconds_per_frame, clamped
+# to [floor, cap]. mode -> (band counts, (floor, cap, seconds_per_frame))
+_FRAME_COUNT_BANDS = (300, 600, 900)
+_FRAME_COUNT_TABLES = {
+    'fast': ((8, 10, 12), (16, 16, 60)),
+    'balanced': ((12, 18, 24), (24, 36, 30)),
+    'accurate': ((15, 24, 36), (36, 48, 20)),
+}
+
+
+@lru_cache(maxsize=256)
 def calculate_optimal_frame_count(duration_seconds: int, mode: str = 'balanced') -> int:
     """
     Calculate optimal frame count based on video duration
@@ -58,48 +315,26 @@ def calculate_optimal_frame_count(duration_seconds: int, mode: str = 'balanced')
         - 10-15 min: 36 frames
         - >15 min: 48 frames (capped)
     """
-    if mode == 'fast':
-        # Fast mode: Optimized for speed
-        if duration_seconds < 300:  # <5 minutes
-            return 8
-        elif duration_seconds < 600:  # <10 minutes
-            return 10
-        elif duration_seconds < 900:  # <15 minutes
-            return 12
-        else:  # >=15 minutes
-            return 16
-    elif mode == 'accurate':
-        # Accurate mode: Maximum frames
-        if duration_seconds < 300:
-            return 15
-        elif duration_seconds < 600:
-            return 24
-        elif duration_seconds < 900:
-            return 36
-        else:
-            return min(48, max(36, duration_seconds // 20))
-    else:
-        # Balanced mode (default)
-        if duration_seconds < 300:  # <5 minutes
-            return 12
-        elif duration_seconds < 600:  # <10 minutes
-            return 18
-        elif duration_seconds < 900:  # <15 minutes
-            return 24
-        else:  # >=15 minutes
-            # For very long videos, cap at 36 frames to control cost
-            # This gives approximately 1 frame per 30-60 seconds
-            return min(36, max(24, duration_seconds // 30))
+    counts, (floor, cap, seconds_per_frame) = _FRAME_COUNT_TABLES.get(
+        mode, _FRAME_COUNT_TABLES['balanced']
+    )
+    band = bisect.bisect_right(_FRAME_COUNT_BANDS, duration_seconds)
+    if band < len(counts):
+        return counts[band]
+    # Long videos: one frame per seconds_per_frame, clamped to control cost
+    return min(cap, max(floor, duration_seconds // seconds_per_frame))
 
 
 def analyze_recipe_from_url(
     url: str,
-    cleanup: bool = True,
+    cleanup: Union[bool, str] = True,
     api_key: Optional[str] = None,
     frame_count: Optional[int] = None,
     extraction_mode: str = EXTRACTION_MODE,
     use_streaming: bool = False,  # Disabled by default: YouTube doesn't support FFmpeg streaming
-    frame_selection_strategy: str = 'scene'  # 'uniform', 'scene', or 'hybrid' - Default: scene (captures key moments)
+    frame_selection_strategy: str = 'scene',  # 'uniform', 'scene', or 'hybrid' - Default: scene (captures key moments)
+    video_path: Optional[str] = None,
+    retain_video: bool = False
 ) -> Dict[str, Any]:
     """
     Extract recipe from video URL (end-to-end pipeline)
@@ -122,7 +357,8 @@ def analyze_recipe_from_url(
 
     Args:
         url: Video URL (YouTube, Instagram, TikTok, etc.)
-        cleanup: Remove temporary files after processing (default: True)
+        cleanup: Remove temporary files after processing (default: True, in a
+                 background thread after returning; 'sync' to remove before returning)
         api_key: Gemini API key (optional, uses env var if not provided)
         frame_count: Number of frames to extract and analyze
                     If None (default), automatically calculated based on video duration and mode
@@ -130,12 +366,18 @@ def analyze_recipe_from_url(
                         - 'fast': 8-16 frames (optimized for reply token deadline)
                         - 'balanced': 12-36 frames (original behavior)
                         - 'accurate': 15-48 frames (maximum quality)
-        use_streaming: Try streaming extraction first (default: True)
+        use_streaming: Try streaming extraction first (default: False; frames decoded
+                      while the video is piped through FFmpeg, nothing written to disk).
                       If False or streaming fails, fallback to traditional download
         frame_selection_strategy: Frame selection strategy (default: 'uniform')
                                  - 'uniform': Evenly distributed frames (original method)
                                  - 'scene': FFmpeg scene detection (detects visual changes)
                                  - 'hybrid': 70% scene detection + 30% uniform
+        video_path: Previously downloaded video of url (e.g. metadata video_info.video_path
+                    of an earlier retain_video run); skips the download if it exists.
+                    No thumbnail is analyzed in that case
+        retain_video: Keep the downloaded video in VIDEO_CACHE_DIR and return its path as
+                      metadata video_info.video_path (also returned with cleanup=False)
 
     Returns:
         Recipe data dictionary with ingredients, steps, and metadata (tokens, video info)
@@ -150,15 +392,22 @@ def analyze_recipe_from_url(
         - Speedup: 3-10x faster
     """
     temp_dir = None
-    video_path = None
+    frames_dir = None
     all_frames = []
+    frames_extracted = 0
+    analysis_thumbnail_future = None
+    analysis_result = None
+    video_cache_key = None
+
+    if video_path:
+        use_streaming = False  # Reuse the already downloaded video
 
     try:
         # Stage 1: Create temp directory
-        temp_dir = tempfile.mkdtemp(prefix='recipeai_pipeline_')
-        logger.info(f"Pipeline started for URL: {url}")
-        logger.info(f"Temp directory: {temp_dir}")
-        logger.info(f"Extraction mode: {extraction_mode}, Streaming: {use_streaming}")
+        temp_dir = tempfile.mkdtemp(prefix='pipeline_', dir=_worker_temp_root())
+        logger.info("Pipeline started for URL: %s", url)
+        logger.info("Temp directory: %s", temp_dir)
+        logger.info("Extraction mode: %s, Streaming: %s", extraction_mode, use_streaming)
 
         # ========================================
         # STREAMING MODE (NEW - Fast Path)
@@ -172,26 +421,27 @@ def analyze_recipe_from_url(
                 # Get metadata without downloading
                 logger.info("Stage 1/3: Getting video metadata...")
                 metadata = get_video_metadata_only(url)
-                video_duration = metadata.get('duration', 0)
+                video_duration = metadata.get('duration') or 0
                 thumbnail_url = metadata.get('thumbnail')
-                logger.info(f"Video duration: {video_duration}s")
+                logger.info("Video duration: %ss", video_duration)
+                _check_recipe_video(video_duration, is_live=bool(metadata.get('is_live')))
 
                 # Calculate frame count
                 if frame_count is None:
                     frame_count = calculate_optimal_frame_count(int(video_duration), mode=extraction_mode)
-                    logger.info(f"Auto-calculated frame count: {frame_count} frames ({extraction_mode} mode)")
+                    logger.info("Auto-calculated frame count: %s frames (%s mode)", frame_count, extraction_mode)
 
-                # Extract frames from stream
-                logger.info(f"Stage 2/3: Extracting {frame_count} frames from stream...")
-                all_frames = extract_frames_from_stream(
+                # Decode frames while the video streams through FFmpeg (in memory)
+                logger.info("Stage 2/3: Extracting %s frames from stream...", frame_count)
+                all_frames = extract_frame_bytes_from_pipe(
                     url,
-                    target_count=frame_count,
-                    output_dir=temp_dir
+                    video_duration,
+                    target_count=frame_count
                 )
-                logger.info(f"✅ Streaming extraction successful: {len(all_frames)} frames")
+                logger.info("✅ Streaming extraction successful: %s frames", len(all_frames))
 
                 # Calculate file size from frames
-                video_file_size = sum(os.path.getsize(f) for f in all_frames)
+                video_file_size = sum(len(f) for f in all_frames)
 
                 # Success! Skip traditional download
                 video_path = None
@@ -199,7 +449,7 @@ def analyze_recipe_from_url(
 
             except StreamingError as e:
                 logger.warning("=" * 60)
-                logger.warning(f"STREAMING EXTRACTION FAILED: {e}")
+                logger.warning("STREAMING EXTRACTION FAILED: %s", e)
                 logger.warning("Falling back to traditional download method...")
                 logger.warning("=" * 60)
                 use_streaming = False  # Force fallback
@@ -212,76 +462,115 @@ def analyze_recipe_from_url(
             logger.info("USING TRADITIONAL DOWNLOAD METHOD")
             logger.info("=" * 60)
 
-            # Stage 2: Download video or photos
-            logger.info("Stage 1/3: Downloading content...")
-            video_path, thumbnail_url, photo_paths = download_video(url, output_dir=temp_dir)
+            # Stage 2: Download video or photos (unless an earlier download was passed in)
+            if video_path and os.path.exists(video_path):
+                logger.info("Stage 1/3: Reusing downloaded video: %s", video_path)
+                os.utime(video_path)  # Recently used: evicted last from the retained-video cache
+                download_result = DownloadResult(video_path=video_path)
+            else:
+                logger.info("Stage 1/3: Downloading content...")
+                download_result = download_video(url, output_dir=temp_dir)
+            video_path = download_result.video_path
+            photo_paths = download_result.photo_paths
+
+            thumbnail_path = os.path.join(temp_dir, 'thumbnail.jpg')
 
             # Check if this is a photo carousel or video
             if photo_paths:
                 # Photo carousel - use photos directly
-                logger.info(f"Downloaded {len(photo_paths)} photos from carousel")
-                logger.info(f"Thumbnail: {thumbnail_url or 'N/A'}")
+                logger.info("Downloaded %s photos from carousel", len(photo_paths))
+                analysis_thumbnail_future = _THUMBNAIL_PREFETCH_POOL.submit(
+                    _prefetch_thumbnail, download_result, thumbnail_path
+                )
                 all_frames = photo_paths
-                video_file_size = sum(os.path.getsize(p) for p in photo_paths)
+                video_file_size = download_result.photo_bytes
+                if video_file_size is None:
+                    video_file_size = sum(os.path.getsize(p) for p in photo_paths)
                 video_duration = 0  # No duration for static images
-                logger.info(f"Total photo size: {video_file_size} bytes")
+                logger.info("Total photo size: %s bytes", video_file_size)
             else:
                 # Video - extract frames
-                logger.info(f"Video downloaded: {video_path}")
-                logger.info(f"Thumbnail URL: {thumbnail_url or 'N/A'}")
+                logger.info("Video downloaded: %s", video_path)
 
                 # Get video metadata using FFmpeg
                 metadata = get_video_metadata(video_path)
                 video_file_size = metadata['size']
                 video_duration = metadata['duration']
-                logger.info(f"Video file size: {video_file_size} bytes")
-                logger.info(f"Video duration: {video_duration}s")
+                logger.info("Video file size: %s bytes", video_file_size)
+                logger.info("Video duration: %ss", video_duration)
+                _check_recipe_video(video_duration)
 
                 # Auto-calculate optimal frame count if not specified
                 if frame_count is None:
                     frame_count = calculate_optimal_frame_count(int(video_duration), mode=extraction_mode)
-                    logger.info(f"Auto-calculated frame count: {frame_count} frames ({extraction_mode} mode, {video_duration}s duration)")
+                    logger.info("Auto-calculated frame count: %s frames (%s mode, %ss duration)", frame_count, extraction_mode, video_duration)
                 else:
-                    logger.info(f"Using specified frame count: {frame_count} frames")
-
-                # Stage 3: Extract key frames
-                logger.info(f"Stage 2/3: Extracting frames (strategy: {frame_selection_strategy})...")
-                frames_dir = os.path.join(temp_dir, 'frames')
-                # Set max_frames based on video duration to cover entire video
-                # Use 1fps sampling, so max_frames should match duration
-                max_frames_needed = max(int(video_duration) + 10, 200)  # +10 buffer, min 200
-                all_frames = extract_key_frames(
-                    video_path,
-                    frames_dir,
-                    count=frame_count,
-                    max_frames=max_frames_needed,
-                    strategy=frame_selection_strategy
-                )
-                logger.info(f"Extracted {len(all_frames)} frames")
-
-                if not all_frames:
-                    raise ValueError("No frames extracted from video")
+                    logger.info("Using specified frame count: %s frames", frame_count)
+
+                # Same video + settings analyzed before: skip extraction and LLM
+                video_cache_key = video_analysis_cache_key(video_path, frame_count, frame_selection_strategy)
+                analysis_result = get_analysis_cache().get(video_cache_key)
+                if analysis_result is not None:
+                    logger.info("✅ Video analysis cache hit (%s...), skipping extraction and LLM call", video_cache_key[:16])
+                    analysis_result['usage_metadata']['cache_hit'] = True
+                else:
+                    # Fetch the thumbnail image while frames are extracted (only needed on a miss)
+                    analysis_thumbnail_future = _THUMBNAIL_PREFETCH_POOL.submit(
+                        _prefetch_thumbnail, download_result, thumbnail_path
+                    )
+
+                    # Stage 3: Extract key frames
+                    logger.info("Stage 2/3: Extracting frames (strategy: %s)...", frame_selection_strategy)
+                    if _FRAMES_TMPFS:
+                        frames_dir = tempfile.mkdtemp(prefix='frames_', dir=_worker_temp_root(_FRAMES_TMPFS))
+                    else:
+                        frames_dir = os.path.join(temp_dir, 'frames')
+                    # Cap on scene-detection candidates: must cover the whole video,
+                    # since FFmpeg stops decoding once the cap is reached
+                    max_frames_needed = max(int(video_duration) + 10, 200)  # +10 buffer, min 200
+                    all_frames = extract_key_frames(
+                        video_path,
+                        frames_dir,
+                        count=frame_count,
+                        max_frames=max_frames_needed,
+                        strategy=frame_selection_strategy
+                    )
+                    logger.info("Extracted %s frames", len(all_frames))
+
+                    if not all_frames:
+                        raise ValueError("No frames extracted from video")
+
+            # Thumbnail was processed in the background during frame extraction
+            thumbnail_url = download_result.thumbnail_url
+            logger.info("Thumbnail URL: %s", thumbnail_url or 'N/A')
 
         # Stage 4: Analyze with Gemini Vision (including thumbnail)
-        logger.info("Stage 3/3: Analyzing with Gemini Vision...")
-        analysis_result = analyze_recipe_from_frames(
-            all_frames,
-            api_key=api_key,
-            thumbnail_url=thumbnail_url
-        )
+        frames_extracted = len(all_frames)
+        video_cache_hit = analysis_result is not None
+        if not video_cache_hit:
+            # Near-identical video frames only add input tokens (carousel photos are all kept)
+            if not photo_paths:
+                all_frames = dedupe_frames(all_frames)
+            logger.info("Stage 3/3: Analyzing with Gemini Vision...")
+            analysis_thumbnail = (
+                analysis_thumbnail_future.result() if analysis_thumbnail_future else thumbnail_url
+            )
+            analysis_result = _analyze_frames_cached(all_frames, api_key, analysis_thumbnail)
+            if video_cache_key:
+                get_analysis_cache().put(video_cache_key, analysis_result)
         recipe_data = analysis_result['recipe']
         usage_metadata = analysis_result['usage_metadata']
 
-        logger.info(f"Recipe extracted: {recipe_data.get('name', 'Unknown')}")
+        logger.info("Recipe extracted: %s", recipe_data.get('name', 'Unknown'))
 
         # Log provider info (new LangChain format)
         if 'provider' in usage_metadata:
-            logger.info(f"LLM Provider: {usage_metadata['provider']}")
+            logger.info("LLM Provider: %s", usage_metadata['provider'])
             provider_info = usage_metadata.get('provider_metadata', {})
-            logger.info(f"Provider chain: {provider_info.get('provider_chain', [])}")
+            logger.info("Provider chain: %s", provider_info.get('provider_chain', []))
         # Legacy format compatibility
         elif 'total_tokens' in usage_metadata:
-            logger.info(f"Token usage: {usage_metadata['total_tokens']} tokens")
+            logger.info("Token usage: %s tokens", usage_metadata['total_tokens'])
 
         # Add thumbnail URL and metadata to recipe data
         recipe_data['thumbnail_url'] = thumbnail_url
@@ -294,33 +583,76 @@ def analyze_recipe_from_url(
         else:
             content_type = 'video'
 
-        return {
-            **recipe_data,
-            'metadata': {
-                'llm_usage': usage_metadata,  # Renamed from 'gemini_tokens' to be provider-agnostic
-                'content_type': content_type,
-                'extraction_method': 'streaming' if (use_streaming and all_frames) else 'download',
-                'video_info': {
-                    'duration_seconds': video_duration,
-                    'file_size_bytes': video_file_size,
-                    'frames_extracted': len(all_frames),
-                    'frames_analyzed': len(all_frames)
-                }
-            }
+        video_info = {
+            'duration_seconds': video_duration,
+            'file_size_bytes': video_file_size
+        }
+        if not video_cache_hit:  # A cached analysis extracted no frames in this run
+            video_info['frames_extracted'] = frames_extracted
+            video_info['frames_analyzed'] = len(all_frames)
+        if video_path and (retain_video or not cleanup):
+            video_info['video_path'] = _retain_video(url, video_path) if retain_video else video_path
+
+        # recipe_data is this run's own dict (fresh from the analyzer/cache), so extend it in place
+        recipe_data['metadata'] = {
+            'llm_usage': usage_metadata,  # Renamed from 'gemini_tokens' to be provider-agnostic
+            'content_type': content_type,
+            'extraction_method': 'streaming' if (use_streaming and all_frames) else 'download',
+            'video_info': video_info
         }
+        return recipe_data
 
     except Exception as e:
-        logger.error(f"Pipeline failed: {e}", exc_info=True)
+        logger.error("Pipeline failed: %s", e, exc_info=True)
         raise
 
     finally:
-        # Cleanup temporary files
-        if cleanup and temp_dir and os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-                logger.info(f"Cleaned up temp directory: {temp_dir}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup {temp_dir}: {e}")
+        # Don't remove temp_dir under a still-running prefetch (error paths)
+        if analysis_thumbnail_future is not None:
+            analysis_thumbnail_future.cancel()
+            with suppress(Exception):
+                analysis_thumbnail_future.result()
+
+        # Drop frame bytes/paths and LLM results now (the return value is already built)
+        if isinstance(all_frames, list):
+            all_frames.clear()
+        all_frames = analysis_result = recipe_data = usage_metadata = None
+
+        # Cleanup temporary files + garbage collection (off the caller's path unless 'sync')
+        cleanup_dirs = (temp_dir, frames_dir) if cleanup else ()
+        if cleanup == 'sync':
+            _cleanup_after_run(*cleanup_dirs)
+        else:
+            _CLEANUP_POOL.submit(_cleanup_after_run, *cleanup_dirs)
+
+
+async def analyze_recipe_batch(
+    urls: List[str],
+    concurrency: int = 4,
+    **kwargs: Any
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Extract recipes from several video URLs concurrently
+
+    Up to concurrency pipelines run at once in worker threads, so one video's
+    download/extraction overlaps another's LLM call instead of waiting for it.
+
+    Args:
+        urls: Video URLs
+        concurrency: Maximum pipelines running at the same time (default 4)
+        **kwargs: Passed to analyze_recipe_from_url for every URL
+
+    Returns:
+        One entry per URL, in order: the recipe data, or the exception that
+        URL failed with (one failure doesn't cancel the rest)
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze_one(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await asyncio.to_thread(analyze_recipe_from_url, url, **kwargs)
 
-        # Force garbage collection after video processing to free memory
-        gc.collect()
+    return await asyncio.gather(*(analyze_one(url) for url in urls), return_exceptions=True)
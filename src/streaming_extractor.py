@@ -7,17 +7,134 @@ import subprocess
 import tempfile
 import logging
 import os
-from typing import List, Optional
+import json
+import time
+import hashlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from io import BytesIO
+from typing import BinaryIO, List, Literal, Optional, Tuple, Union
 from pathlib import Path
 
+import httpx
+
+try:
+    import av  # PyAV: optional in-process stream decode (no ffmpeg process per frame)
+except ImportError:
+    av = None
+
+from .extractor import (
+    ANALYSIS_FRAME_HEIGHT,
+    SCENE_CANDIDATE_THRESHOLD,
+    SEEK_EXTRACTION_MIN_SPACING_S,
+    _MJPEG_PIPE_OUTPUT,
+    _dynamic_scene_picks,
+    _escape_filter_path,
+    _read_scene_metadata,
+    _stream_mjpeg_frames,
+    _timestamp_select_expr,
+    _with_scale,
+    _write_frame
+)
+
 logger = logging.getLogger(__name__)
 
+# Single-file MP4 for piping (FFmpeg can't merge separate DASH audio/video from a pipe)
+PIPE_DOWNLOAD_FORMAT = 'best[ext=mp4]/best'
+
+# Time allowed for yt-dlp -> FFmpeg pipe extraction before both are killed
+PIPE_EXTRACTION_TIMEOUT_S = 180
+
+# Concurrent per-timestamp seeks against the stream URL (each is an
+# independent ranged fetch; capped to stay polite to the CDN)
+STREAM_SEEK_MAX_WORKERS = 8
+
+# Timeout for the HTTP range-support probe before per-frame seeks
+RANGE_PROBE_TIMEOUT_S = 5
+
+# JPEG quality for frames decoded in-process (about FFmpeg -q:v 2)
+PYAV_JPEG_QUALITY = 95
+
+# Time allowed for one FFmpeg pass over the whole stream
+STREAM_SINGLE_PASS_TIMEOUT_S = 120
+
+# yt-dlp lookups (metadata, stream URL) cached on disk by video URL, shared
+# across workers; signed stream URLs typically stay valid for hours
+METADATA_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'recipeai_metacache')
+METADATA_CACHE_TTL_SECONDS = 3600
+
+# yt-dlp --print templates for get_video_metadata_only, one value per line
+# (title JSON-quoted since titles/captions may contain newlines; urls last
+# since merged formats print one URL per line). Missing values print 'NA'
+_METADATA_PRINT_FIELDS = ('duration', 'is_live', 'thumbnail', 'webpage_url')
+_METADATA_PRINT_TEMPLATES = (','.join(_METADATA_PRINT_FIELDS), '%(title)j', 'urls')
+
+# Bulky --dump-json fields nothing here reads; not worth caching
+_METADATA_CACHE_DROP_KEYS = (
+    'formats', 'requested_formats', 'thumbnails', 'automatic_captions', 'subtitles', 'heatmap'
+)
+
+
+StreamStrategy = Literal['uniform', 'scene']
+
 
 class StreamingError(Exception):
     """Raised when streaming extraction fails"""
     pass
 
 
+def _metadata_cache_path(kind: str, video_url: str) -> str:
+    """Cache file for a yt-dlp lookup ('metadata', 'full_metadata' or 'stream_url') of video_url"""
+    digest = hashlib.blake2b(f"{kind}:{video_url}".encode(), digest_size=16).hexdigest()
+    return os.path.join(METADATA_CACHE_DIR, f"{digest}.json")
+
+
+def _read_metadata_cache(kind: str, video_url: str):
+    """Cached lookup value, or None if missing, expired or unreadable"""
+    try:
+        with open(_metadata_cache_path(kind, video_url), 'rb') as f:
+            entry = json.load(f)
+        if entry['expires_at'] > time.time():
+            return entry['value']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_metadata_cache(kind: str, video_url: str, value) -> None:
+    """Cache a lookup value (write failures are logged, not raised)"""
+    path = _metadata_cache_path(kind, video_url)
+    tmp_path = None
+    try:
+        os.makedirs(METADATA_CACHE_DIR, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=METADATA_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'expires_at': time.time() + METADATA_CACHE_TTL_SECONDS, 'value': value}, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Failed to write metadata cache entry %s: %s", path, e)
+        if tmp_path:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+
+
+def invalidate_stream_url_cache(video_url: str) -> None:
+    """Drop cached lookups holding video_url's stream URL (e.g. after it stopped working)"""
+    for kind in ('stream_url', 'metadata', 'full_metadata'):
+        with suppress(OSError):
+            os.unlink(_metadata_cache_path(kind, video_url))
+
+
+def _stream_url_from_metadata(metadata: dict) -> Optional[str]:
+    """Direct media URL of the format yt-dlp selected (video part of merged formats)"""
+    if metadata.get('url'):
+        return metadata['url']
+    requested = metadata.get('requested_formats') or []
+    return requested[0].get('url') if requested else None
+
+
 def get_direct_stream_url(video_url: str, use_cookies: bool = False, cookie_file: Optional[str] = None) -> str:
     """
     Get direct stream URL using yt-dlp without downloading
@@ -33,6 +150,11 @@ def get_direct_stream_url(video_url: str, use_cookies: bool = False, cookie_file
     Raises:
         StreamingError: If yt-dlp fails to get stream URL
     """
+    cached = _read_metadata_cache('stream_url', video_url)
+    if cached:
+        logger.info("✓ Using cached stream URL for: %s", video_url[:60])
+        return cached
+
     cmd = ['yt-dlp', '-g', video_url]
 
     if use_cookies and cookie_file:
@@ -55,6 +177,7 @@ def get_direct_stream_url(video_url: str, use_cookies: bool = False, cookie_file
             raise StreamingError("yt-dlp returned empty stream URL")
 
         logger.info(f"✓ Got stream URL: {stream_url[:80]}...")
+        _write_metadata_cache('stream_url', video_url, stream_url)
         return stream_url
 
     except subprocess.TimeoutExpired:
@@ -63,22 +186,64 @@ def get_direct_stream_url(video_url: str, use_cookies: bool = False, cookie_file
         raise StreamingError(f"Failed to get stream URL: {e}")
 
 
-def get_video_metadata_only(video_url: str, use_cookies: bool = False, cookie_file: Optional[str] = None) -> dict:
+def _parse_printed_metadata(stdout: str) -> dict:
+    """Metadata dict from yt-dlp output of _METADATA_PRINT_TEMPLATES"""
+    lines = stdout.splitlines()
+    if len(lines) < len(_METADATA_PRINT_FIELDS) + 2:
+        raise StreamingError(f"Unexpected yt-dlp metadata output: {stdout[:200]!r}")
+
+    values = [None if line == 'NA' else line for line in lines]
+    duration, is_live, thumbnail, webpage_url = values[:len(_METADATA_PRINT_FIELDS)]
+    title, stream_url = values[len(_METADATA_PRINT_FIELDS):len(_METADATA_PRINT_FIELDS) + 2]
+    return {
+        'duration': float(duration) if duration else None,
+        'is_live': is_live == 'True',
+        'thumbnail': thumbnail,
+        'webpage_url': webpage_url,
+        'title': json.loads(title) if title else None,
+        'stream_url': stream_url,
+    }
+
+
+def get_video_metadata_only(
+    video_url: str,
+    use_cookies: bool = False,
+    cookie_file: Optional[str] = None,
+    full_metadata: bool = False
+) -> dict:
     """
-    Get video metadata without downloading using yt-dlp --dump-json
+    Get video metadata without downloading
+
+    By default yt-dlp prints only the fields the pipeline uses (no multi-
+    hundred-KB --dump-json document to parse).
 
     Args:
         video_url: Video URL
         use_cookies: Whether to use cookies
         cookie_file: Path to cookies file
+        full_metadata: Return the full yt-dlp info dict (--dump-json) instead of
+                       duration, is_live, thumbnail, webpage_url and title
 
     Returns:
-        Dict with metadata including duration, title, thumbnail, etc.
+        Dict with metadata including duration, title, thumbnail, etc., plus
+        'stream_url' (direct media URL, or None) from the same yt-dlp run
 
     Raises:
         StreamingError: If metadata extraction fails
     """
-    cmd = ['yt-dlp', '--dump-json', '--no-download', video_url]
+    cache_kind = 'full_metadata' if full_metadata else 'metadata'
+    cached = _read_metadata_cache(cache_kind, video_url)
+    if isinstance(cached, dict):
+        logger.info("✓ Using cached metadata for: %s", video_url[:60])
+        return cached
+
+    if full_metadata:
+        cmd = ['yt-dlp', '--dump-json', '--no-download', video_url]
+    else:
+        cmd = ['yt-dlp', '--no-download']
+        for template in _METADATA_PRINT_TEMPLATES:
+            cmd.extend(['--print', template])
+        cmd.append(video_url)
 
     if use_cookies and cookie_file:
         cmd.extend(['--cookies', cookie_file])
@@ -95,10 +260,16 @@ def get_video_metadata_only(video_url: str, use_cookies: bool = False, cookie_fi
         if result.returncode != 0:
             raise StreamingError(f"yt-dlp metadata extraction failed: {result.stderr}")
 
-        import json
-        metadata = json.loads(result.stdout)
+        if full_metadata:
+            metadata = json.loads(result.stdout)
+            metadata['stream_url'] = _stream_url_from_metadata(metadata)
+            for key in _METADATA_CACHE_DROP_KEYS:
+                metadata.pop(key, None)
+        else:
+            metadata = _parse_printed_metadata(result.stdout)
 
-        logger.info(f"✓ Got metadata: duration={metadata.get('duration', 0)}s, title={metadata.get('title', 'Unknown')[:40]}")
+        logger.info("✓ Got metadata: duration=%ss, title=%s", metadata.get('duration') or 0, (metadata.get('title') or 'Unknown')[:40])
+        _write_metadata_cache(cache_kind, video_url, metadata)
         return metadata
 
     except subprocess.TimeoutExpired:
@@ -107,48 +278,90 @@ def get_video_metadata_only(video_url: str, use_cookies: bool = False, cookie_fi
         raise StreamingError(f"Failed to get metadata: {e}")
 
 
+def _extract_frame_with_pyav(stream_url: str, timestamp: float, output: Union[str, BinaryIO]) -> bool:
+    """
+    Decode the first frame at or after timestamp in-process with PyAV
+
+    Args:
+        stream_url: Direct video stream URL
+        timestamp: Time in seconds to extract frame
+        output: Output JPEG path or binary file object
+
+    Returns:
+        True if a frame was written, False if the stream yielded no frames
+    """
+    with av.open(stream_url, timeout=30) as container:
+        stream = container.streams.video[0]
+        # Seek to the keyframe before timestamp, then decode up to it
+        container.seek(int(timestamp * av.time_base), backward=True)
+        for frame in container.decode(stream):
+            if frame.time is not None and frame.time < timestamp:
+                continue
+            frame.to_image().save(output, 'JPEG', quality=PYAV_JPEG_QUALITY)
+            return True
+    return False
+
+
 def extract_frame_from_stream(
     stream_url: str,
     timestamp: float,
-    output_path: str,
+    output_path: Optional[str] = None,
     quality: int = 2
-) -> str:
+) -> Union[str, bytes]:
     """
     Extract a single frame from video stream at specific timestamp
 
+    Decodes in-process with PyAV when available (no process spawn), falling
+    back to the FFmpeg CLI.
+
     Args:
         stream_url: Direct video stream URL (from yt-dlp -g)
         timestamp: Time in seconds to extract frame
-        output_path: Path to save extracted frame
-        quality: JPEG quality (1-31, lower is better, default 2)
+        output_path: Path to save extracted frame (None to return JPEG bytes)
+        quality: JPEG quality for the FFmpeg path (1-31, lower is better, default 2)
 
     Returns:
-        Path to extracted frame
+        Path to extracted frame, or its JPEG bytes if output_path is None
 
     Raises:
         StreamingError: If frame extraction fails
     """
+    if av is not None:
+        try:
+            output = output_path or BytesIO()
+            if _extract_frame_with_pyav(stream_url, timestamp, output):
+                logger.debug("✓ Extracted frame at %ss in-process with PyAV", timestamp)
+                return output_path or output.getvalue()
+            logger.warning("PyAV decoded no frame at %ss, falling back to FFmpeg", timestamp)
+        except Exception as e:
+            logger.warning("PyAV frame extraction failed at %ss, falling back to FFmpeg: %s", timestamp, e)
+
     cmd = [
         'ffmpeg',
         '-ss', str(timestamp),    # Seek to timestamp (input seeking - faster)
         '-i', stream_url,          # Input stream URL
         '-vframes', '1',           # Extract 1 frame
         '-q:v', str(quality),      # Quality
-        '-y',                      # Overwrite output
-        output_path
+        *(('-y', output_path) if output_path else _MJPEG_PIPE_OUTPUT)  # File, or JPEG on stdout
     ]
 
     try:
-        logger.debug(f"Extracting frame at {timestamp}s to {output_path}")
+        logger.debug("Extracting frame at %ss to %s", timestamp, output_path or 'memory')
         result = subprocess.run(
             cmd,
             capture_output=True,
-            text=True,
             timeout=30  # Should be fast, but allow time for seeking
         )
 
         if result.returncode != 0:
-            raise StreamingError(f"FFmpeg frame extraction failed at {timestamp}s: {result.stderr[:200]}")
+            stderr = result.stderr.decode(errors='replace')
+            raise StreamingError(f"FFmpeg frame extraction failed at {timestamp}s: {stderr[:200]}")
+
+        if output_path is None:
+            if not result.stdout:
+                raise StreamingError(f"FFmpeg returned no frame data at {timestamp}s")
+            logger.debug("✓ Extracted frame at %ss", timestamp)
+            return result.stdout
 
         if not os.path.exists(output_path):
             raise StreamingError(f"Frame extraction succeeded but file not found: {output_path}")
@@ -196,17 +409,236 @@ def calculate_sample_timestamps(duration_seconds: float, target_count: int) -> L
     return timestamps
 
 
+def _extract_frames_single_pass(
+    stream_url: str,
+    timestamps: List[float],
+    output_dir: Optional[str]
+) -> List[Union[str, bytes]]:
+    """
+    Extract one frame per timestamp with a single FFmpeg pass over the stream
+
+    Opens and probes the stream once instead of once per timestamp.
+
+    Args:
+        stream_url: Direct video stream URL
+        timestamps: Frame times in seconds (ascending)
+        output_dir: Directory to save frames (None to return JPEG bytes)
+
+    Returns:
+        Written frame paths (or JPEG bytes) in time order (may be fewer than timestamps)
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails
+        subprocess.TimeoutExpired: If the pass takes longer than STREAM_SINGLE_PASS_TIMEOUT_S
+    """
+    cmd = [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-i', stream_url,
+        '-vf', f'select={_timestamp_select_expr(timestamps)}',
+        '-vsync', 'vfr',  # Only write selected frames
+        '-q:v', '2',
+        '-frames:v', str(len(timestamps))
+    ]
+    if output_dir is None:
+        return list(_stream_mjpeg_frames(
+            [*cmd, *_MJPEG_PIPE_OUTPUT], timeout=STREAM_SINGLE_PASS_TIMEOUT_S
+        ))
+
+    cmd += ['-y', os.path.join(output_dir, 'stream_frame_%04d.jpg')]
+    subprocess.run(cmd, capture_output=True, check=True, timeout=STREAM_SINGLE_PASS_TIMEOUT_S)
+
+    frame_paths = [
+        os.path.join(output_dir, f"stream_frame_{i+1:04d}.jpg")
+        for i in range(len(timestamps))
+    ]
+    return [path for path in frame_paths if os.path.exists(path)]
+
+
+def _extract_frames_by_seeking(
+    stream_url: str,
+    timestamps: List[float],
+    output_dir: Optional[str],
+    prefix: str = 'stream_frame'
+) -> List[Tuple[float, Union[str, bytes]]]:
+    """
+    Extract one frame per timestamp with concurrent input seeks on the stream
+
+    Args:
+        stream_url: Direct video stream URL
+        timestamps: Frame times in seconds
+        output_dir: Directory to save frames (None to return JPEG bytes)
+        prefix: Frame filename prefix ({prefix}_NNNN.jpg)
+
+    Returns:
+        (timestamp, frame path or JPEG bytes) in time order (failed seeks are skipped)
+    """
+    def _extract(i: int, timestamp: float) -> Union[str, bytes, None]:
+        frame_path = os.path.join(output_dir, f"{prefix}_{i+1:04d}.jpg") if output_dir else None
+        try:
+            return extract_frame_from_stream(stream_url, timestamp, frame_path)
+        except StreamingError as e:
+            # Continue with other frames even if one fails
+            logger.warning("Failed to extract frame at %ss: %s", timestamp, e)
+            return None
+
+    workers = max(1, min(len(timestamps), STREAM_SEEK_MAX_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_extract, range(len(timestamps)), timestamps))
+    return [(ts, frame) for ts, frame in zip(timestamps, results) if frame is not None]
+
+
+def _supports_range_requests(stream_url: str) -> bool:
+    """
+    Check that an HTTP(S) stream serves byte ranges (so input seeks skip ahead)
+
+    Asks for one byte and looks for 206 Partial Content; the body of a full
+    200 response is never read. Non-HTTP inputs and failed probes count as
+    seekable (seeking is then no worse than before).
+    """
+    if not stream_url.startswith(('http://', 'https://')):
+        return True
+    try:
+        with httpx.stream(
+            'GET', stream_url,
+            headers={'Range': 'bytes=0-0'},
+            timeout=RANGE_PROBE_TIMEOUT_S,
+            follow_redirects=True
+        ) as response:
+            return response.status_code == 206
+    except httpx.HTTPError as e:
+        logger.debug("Range probe failed, assuming seekable stream: %s", e)
+        return True
+
+
+def _extract_uniform_frames(
+    stream_url: str,
+    timestamps: List[float],
+    output_dir: Optional[str]
+) -> List[Union[str, bytes]]:
+    """
+    Extract one frame per timestamp from the stream
+
+    Dense timestamps come out of one pass over the stream; sparse ones (or a
+    short single pass) use concurrent seeks, which skip the gaps. Servers
+    without range support would restart the download for every seek, so
+    they always get the single pass.
+
+    Args:
+        stream_url: Direct video stream URL
+        timestamps: Frame times in seconds (ascending)
+        output_dir: Directory to save frames (None to return JPEG bytes)
+
+    Returns:
+        Frame paths (or JPEG bytes) in time order
+    """
+    dense = len(timestamps) > 1 and timestamps[1] - timestamps[0] < SEEK_EXTRACTION_MIN_SPACING_S
+    if dense or not _supports_range_requests(stream_url):
+        frames = []
+        try:
+            frames = _extract_frames_single_pass(stream_url, timestamps, output_dir)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.warning("⚠️  Single-pass stream extraction failed, seeking per frame: %s", e)
+        if len(frames) == len(timestamps):
+            return frames
+    return [frame for _, frame in _extract_frames_by_seeking(stream_url, timestamps, output_dir)]
+
+
+def _extract_scene_frames(
+    stream_url: str,
+    duration: float,
+    target_count: int,
+    output_dir: Optional[str]
+) -> List[Union[str, bytes]]:
+    """
+    Pick frames at visual changes with one FFmpeg scene-detection pass over the stream
+
+    Candidates above SCENE_CANDIDATE_THRESHOLD are thinned by accumulated
+    scene change (as in FrameExtractor); too few candidates are topped up
+    with uniformly spaced seeks. Candidates (up to one per second of video)
+    are spilled to disk as they arrive, so only the picked frames are held
+    in memory.
+
+    Args:
+        stream_url: Direct video stream URL
+        duration: Video duration in seconds
+        target_count: Number of frames to return
+        output_dir: Directory to save frames (None to return JPEG bytes)
+
+    Returns:
+        Frame paths (or JPEG bytes) in time order
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails
+    """
+    spill_dir = tempfile.mkdtemp(prefix='recipeai_scene_', dir=output_dir)
+    times_path = os.path.join(spill_dir, 'scene_times.txt')
+    try:
+        cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',
+            '-i', stream_url,
+            '-vf', _with_scale(
+                f'select=gt(scene\\,{SCENE_CANDIDATE_THRESHOLD}),'
+                f'metadata=print:key=lavfi.scene_score:file={_escape_filter_path(times_path)}',
+                ANALYSIS_FRAME_HEIGHT
+            ),
+            '-vsync', 'vfr',
+            '-q:v', '2',
+            '-frames:v', str(max(int(duration) + 10, 200)),  # Must cover the whole video
+            *_MJPEG_PIPE_OUTPUT
+        ]
+        candidates = [
+            _write_frame(os.path.join(spill_dir, f"candidate_{i + 1:04d}.jpg"), data)
+            for i, data in enumerate(_stream_mjpeg_frames(cmd))
+        ]
+        times, scores = _read_scene_metadata(times_path)
+
+        logger.info("[Streaming Extraction] Scene detection found %s candidates", len(candidates))
+        if len(times) < len(candidates):
+            # No timing info from FFmpeg: assume the changes are evenly spread
+            step = duration / (len(candidates) + 1)
+            times = [step * (i + 1) for i in range(len(candidates))]
+        if len(scores) < len(candidates):
+            scores = [1.0] * len(candidates)
+
+        indices = range(len(candidates))
+        if len(candidates) > target_count:
+            indices = _dynamic_scene_picks(scores[:len(candidates)], target_count)
+        timed_frames = []
+        for i in indices:
+            if output_dir:
+                frame = os.path.join(output_dir, f"scene_{i + 1:04d}.jpg")
+                os.replace(candidates[i], frame)
+            else:
+                frame = Path(candidates[i]).read_bytes()
+            timed_frames.append((times[i], frame))
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    needed = target_count - len(timed_frames)
+    if needed > 0:
+        logger.info("[Streaming Extraction] Supplementing with %s uniform frames", needed)
+        step = duration / (needed + 1)
+        uniform_times = [step * (i + 1) for i in range(needed)]
+        timed_frames += _extract_frames_by_seeking(stream_url, uniform_times, output_dir, prefix='uniform')
+
+    return [frame for _, frame in sorted(timed_frames, key=lambda timed: timed[0])]
+
+
 def extract_frames_from_stream(
     video_url: str,
     target_count: int = 8,
     output_dir: Optional[str] = None,
     use_cookies: bool = False,
-    cookie_file: Optional[str] = None
+    cookie_file: Optional[str] = None,
+    strategy: StreamStrategy = 'uniform'
 ) -> List[str]:
     """
     Extract frames from video stream without downloading full video
 
-    This is the main entry point for streaming frame extraction.
+    This is the main entry point for streaming frame extraction. It is library
+    API: analyze_recipe_from_url streams only 'uniform' (extract_frame_bytes_from_pipe).
 
     Args:
         video_url: Video URL (YouTube, Instagram, etc.)
@@ -214,6 +646,7 @@ def extract_frames_from_stream(
         output_dir: Directory to save frames (default: temp dir)
         use_cookies: Whether to use cookies for authentication
         cookie_file: Path to cookies file
+        strategy: 'uniform' (evenly spaced) or 'scene' (at visual changes)
 
     Returns:
         List of paths to extracted frame images
@@ -226,16 +659,51 @@ def extract_frames_from_stream(
         - Streaming method: 5-20s (direct extraction)
         - Speedup: 3-10x faster
     """
-    temp_dir_created = False
+    # Create output directory
+    if output_dir is None:
+        output_dir = tempfile.mkdtemp(prefix='recipeai_stream_')
+    else:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    return _extract_stream_frames(video_url, target_count, output_dir, use_cookies, cookie_file, strategy)
 
-    try:
-        # Create output directory
-        if output_dir is None:
-            output_dir = tempfile.mkdtemp(prefix='recipeai_stream_')
-            temp_dir_created = True
-        else:
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
 
+def extract_frame_bytes_from_stream(
+    video_url: str,
+    target_count: int = 8,
+    use_cookies: bool = False,
+    cookie_file: Optional[str] = None,
+    strategy: StreamStrategy = 'uniform'
+) -> List[bytes]:
+    """
+    Extract frames from video stream as in-memory JPEG bytes (nothing written to disk)
+
+    Args:
+        video_url: Video URL (YouTube, Instagram, etc.)
+        target_count: Number of frames to extract (default 8)
+        use_cookies: Whether to use cookies for authentication
+        cookie_file: Path to cookies file
+        strategy: 'uniform' (evenly spaced) or 'scene' (at visual changes)
+
+    Returns:
+        List of JPEG-encoded frames in time order
+
+    Raises:
+        StreamingError: If extraction fails
+    """
+    return _extract_stream_frames(video_url, target_count, None, use_cookies, cookie_file, strategy)
+
+
+def _extract_stream_frames(
+    video_url: str,
+    target_count: int,
+    output_dir: Optional[str],
+    use_cookies: bool,
+    cookie_file: Optional[str],
+    strategy: StreamStrategy
+) -> List[Union[str, bytes]]:
+    """Shared body of extract_frames_from_stream (output_dir) and extract_frame_bytes_from_stream (None)"""
+    try:
         logger.info(f"[Streaming Extraction] Starting for {video_url[:60]}...")
         logger.info(f"[Streaming Extraction] Target: {target_count} frames")
 
@@ -251,31 +719,101 @@ def extract_frames_from_stream(
         # Step 2: Calculate sample timestamps
         timestamps = calculate_sample_timestamps(duration, target_count)
 
-        # Step 3: Get stream URL (fast, ~2s)
-        stream_url = get_direct_stream_url(video_url, use_cookies, cookie_file)
+        # Step 3: Stream URL comes with the metadata (separate yt-dlp -g only if missing)
+        stream_url = metadata.get('stream_url') or get_direct_stream_url(video_url, use_cookies, cookie_file)
 
-        # Step 4: Extract frames at calculated timestamps
-        frame_paths = []
-        for i, timestamp in enumerate(timestamps):
-            frame_path = os.path.join(output_dir, f"stream_frame_{i+1:04d}.jpg")
+        # Step 4: Extract frames (at visual changes, or at the calculated timestamps)
+        frames = []
+        if strategy == 'scene':
             try:
-                extract_frame_from_stream(stream_url, timestamp, frame_path)
-                frame_paths.append(frame_path)
-            except StreamingError as e:
-                logger.warning(f"Failed to extract frame at {timestamp}s: {e}")
-                # Continue with other frames even if one fails
-                continue
+                frames = _extract_scene_frames(stream_url, duration, target_count, output_dir)
+            except subprocess.CalledProcessError as e:
+                logger.warning("⚠️  Stream scene detection failed, using uniform sampling: %s", e)
+        if not frames:
+            frames = _extract_uniform_frames(stream_url, timestamps, output_dir)
 
-        if not frame_paths:
+        if not frames:
             raise StreamingError("No frames could be extracted from stream")
 
-        logger.info(f"[Streaming Extraction] ✅ Successfully extracted {len(frame_paths)}/{target_count} frames")
-        return frame_paths
+        logger.info("[Streaming Extraction] ✅ Successfully extracted %s/%s frames", len(frames), target_count)
+        return frames
 
     except Exception as e:
         logger.error(f"[Streaming Extraction] ❌ Failed: {e}")
+        # A stale signed stream URL must not fail later requests too
+        invalidate_stream_url_cache(video_url)
         raise StreamingError(f"Streaming extraction failed: {e}")
 
 
+def extract_frame_bytes_from_pipe(
+    video_url: str,
+    duration: float,
+    target_count: int = 8,
+    cookie_file: Optional[str] = None
+) -> List[bytes]:
+    """
+    Decode evenly spaced frames while yt-dlp streams the video into FFmpeg
+
+    The video is never written to disk: yt-dlp writes it to stdout, FFmpeg
+    decodes from its stdin and emits MJPEG frames that are split in memory.
+    yt-dlp handles platform auth/bot checks, so this works where a bare
+    stream URL (yt-dlp -g) is refused.
+
+    Args:
+        video_url: Video URL (YouTube, Instagram, etc.)
+        duration: Video duration in seconds (from get_video_metadata_only)
+        target_count: Number of frames to extract (default 8)
+        cookie_file: Optional cookies file for yt-dlp
+
+    Returns:
+        List of JPEG-encoded frames in time order
+
+    Raises:
+        StreamingError: If the video cannot be piped/decoded (e.g. MP4 without
+                        faststart, whose index is at the end of the file) or
+                        takes longer than PIPE_EXTRACTION_TIMEOUT_S
+    """
+    if not duration or duration <= 0:
+        raise StreamingError(f"Invalid video duration: {duration}")
+
+    download_cmd = ['yt-dlp', '-f', PIPE_DOWNLOAD_FORMAT, '-o', '-', '--quiet', '--no-warnings', video_url]
+    if cookie_file:
+        download_cmd.extend(['--cookies', cookie_file])
+
+    ffmpeg_cmd = [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-vf', _with_scale(f'fps={target_count}/{duration:.3f}', ANALYSIS_FRAME_HEIGHT),
+        '-q:v', '2',
+        '-frames:v', str(target_count),
+        *_MJPEG_PIPE_OUTPUT
+    ]
+
+    logger.info("[Pipe Extraction] Streaming %s into FFmpeg for %s frames", video_url[:60], target_count)
+    downloader = subprocess.Popen(download_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        frames = list(_stream_mjpeg_frames(
+            ffmpeg_cmd, stdin=downloader.stdout, timeout=PIPE_EXTRACTION_TIMEOUT_S
+        ))
+    except subprocess.CalledProcessError as e:
+        raise StreamingError(f"FFmpeg could not decode piped video: {(e.stderr or '')[:200]}")
+    except subprocess.TimeoutExpired:
+        raise StreamingError(f"Pipe extraction timed out after {PIPE_EXTRACTION_TIMEOUT_S}s")
+    finally:
+        # FFmpeg may stop before the download ends (-frames:v reached), or was
+        # killed at the deadline while yt-dlp stalled
+        downloader.stdout.close()
+        if downloader.poll() is None:
+            downloader.kill()
+        downloader.wait()
+
+    if not frames:
+        raise StreamingError("No frames could be decoded from piped video")
+
+    logger.info("[Pipe Extraction] ✅ Extracted %s/%s frames", len(frames), target_count)
+    return frames
+
+
 # Backward compatibility alias
 extract_key_frames_from_stream = extract_frames_from_stream
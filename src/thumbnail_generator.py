@@ -3,18 +3,40 @@ Thumbnail Proxy for Cloudflare R2
 Downloads thumbnails from CORS-blocked sources and re-uploads to R2
 """
 import os
+import atexit
 import logging
 import uuid
-import requests
+import httpx
+from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 import boto3
 from botocore.config import Config
 from dotenv import load_dotenv
 
+try:
+    import h2  # noqa: F401  (optional: enables HTTP/2 on the shared client)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive client so repeated thumbnail fetches skip DNS + TLS handshake
+_SESSION = httpx.Client(
+    http2=_HTTP2_AVAILABLE,
+    timeout=10,
+    follow_redirects=True,
+    headers={'User-Agent': 'AizhuHelper/1.0'},
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+atexit.register(_SESSION.close)
+
+# Pool size for the R2 client (carousel uploads run concurrently)
+R2_MAX_POOL_CONNECTIONS = 32
+
 
 class ThumbnailProxy:
     """Proxies CORS-blocked thumbnails through R2"""
@@ -51,7 +73,10 @@ class ThumbnailProxy:
                     endpoint_url=f'https://{self.r2_account_id}.r2.cloudflarestorage.com',
                     aws_access_key_id=self.r2_access_key,
                     aws_secret_access_key=self.r2_secret_key,
-                    config=Config(signature_version='s3v4'),
+                    config=Config(
+                        signature_version='s3v4',
+                        max_pool_connections=R2_MAX_POOL_CONNECTIONS,
+                    ),
                 )
                 logger.info("✓ R2 S3 client initialized successfully")
             except Exception as e:
@@ -62,6 +87,20 @@ class ThumbnailProxy:
             logger.warning("✗ R2 client not initialized (missing account ID)")
             self.s3_client = None
 
+    def is_r2_url(self, url: str) -> bool:
+        """
+        Check if URL already points at this R2 bucket (no re-upload needed)
+
+        Args:
+            url: Thumbnail URL
+
+        Returns:
+            True if URL is served from R2
+        """
+        if self.r2_public_url and url.startswith(self.r2_public_url):
+            return True
+        return '.r2.dev/' in url or '.r2.cloudflarestorage.com/' in url
+
     def download_thumbnail(self, thumbnail_url: str, output_path: Optional[str] = None) -> str:
         """
         Download thumbnail from URL
@@ -87,15 +126,11 @@ class ThumbnailProxy:
         try:
             logger.info(f"Downloading thumbnail from: {thumbnail_url[:100]}...")
 
-            # Download with timeout and headers
-            response = requests.get(
-                thumbnail_url,
-                timeout=10,
-                headers={'User-Agent': 'AizhuHelper/1.0'}
-            )
+            # Download over the shared keep-alive client (timeout/headers set on _SESSION)
+            response = _SESSION.get(thumbnail_url)
 
             # Log detailed response info
-            logger.info(f"HTTP Response: {response.status_code} {response.reason}")
+            logger.info(f"HTTP Response: {response.status_code} {response.reason_phrase}")
             logger.info(f"Content-Type: {response.headers.get('Content-Type', 'unknown')}")
             logger.info(f"Content-Length: {len(response.content)} bytes")
 
@@ -111,17 +146,17 @@ class ThumbnailProxy:
             logger.info(f"✓ Thumbnail downloaded successfully: {output_path}")
             return output_path
 
-        except requests.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             logger.error(f"✗ HTTP error during thumbnail download: {e}")
-            logger.error(f"   Status code: {e.response.status_code if e.response else 'N/A'}")
-            logger.error(f"   Response: {e.response.text[:200] if e.response else 'N/A'}")
+            logger.error(f"   Status code: {e.response.status_code}")
+            logger.error(f"   Response: {e.response.text[:200]}")
             logger.exception("Full traceback:")
-            raise Exception(f"Failed to download thumbnail (HTTP {e.response.status_code if e.response else 'error'}): {e}")
-        except requests.Timeout as e:
+            raise Exception(f"Failed to download thumbnail (HTTP {e.response.status_code}): {e}")
+        except httpx.TimeoutException as e:
             logger.error(f"✗ Timeout downloading thumbnail after 10 seconds: {e}")
             logger.exception("Full traceback:")
             raise Exception(f"Timeout downloading thumbnail: {e}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"✗ Network error downloading thumbnail: {e}")
             logger.exception("Full traceback:")
             raise Exception(f"Failed to download thumbnail: {e}")
@@ -171,11 +206,7 @@ class ThumbnailProxy:
                 )
 
             # Generate public URL
-            if self.r2_public_url:
-                public_url = f"{self.r2_public_url}/{object_key}"
-            else:
-                # Fallback: use R2.dev subdomain (if public)
-                public_url = f"https://{self.r2_bucket}.r2.dev/{object_key}"
+            public_url = self._public_url(object_key)
 
             logger.info(f"✓ Thumbnail uploaded successfully to R2!")
             logger.info(f"✓ Public URL: {public_url}")
@@ -189,6 +220,54 @@ class ThumbnailProxy:
             logger.exception("Full traceback:")
             raise
 
+    def upload_bytes_to_r2(self, image_data: bytes, object_key: Optional[str] = None) -> str:
+        """
+        Upload in-memory JPEG bytes to Cloudflare R2
+
+        Args:
+            image_data: Encoded JPEG image
+            object_key: Optional S3 object key (default: generated UUID)
+
+        Returns:
+            Public URL of uploaded thumbnail
+
+        Raises:
+            Exception: If upload fails or R2 not configured
+        """
+        if not self.s3_client:
+            raise Exception("R2 not configured. Check R2_* environment variables.")
+
+        if not object_key:
+            object_key = f"thumbnails/{uuid.uuid4().hex}.jpg"
+
+        try:
+            logger.info(f"Uploading thumbnail to R2 ({len(image_data)} bytes, key: {object_key})...")
+            self.s3_client.put_object(
+                Bucket=self.r2_bucket,
+                Key=object_key,
+                Body=image_data,
+                ContentType='image/jpeg',
+                CacheControl='public, max-age=31536000',  # 1 year
+            )
+
+            public_url = self._public_url(object_key)
+            logger.info(f"✓ Thumbnail uploaded successfully to R2: {public_url}")
+            return public_url
+
+        except Exception as e:
+            logger.error(f"✗ R2 upload failed: {e}")
+            logger.error(f"   Bucket: {self.r2_bucket}")
+            logger.error(f"   Key: {object_key}")
+            logger.exception("Full traceback:")
+            raise
+
+    def _public_url(self, object_key: str) -> str:
+        """Public URL for an uploaded object"""
+        if self.r2_public_url:
+            return f"{self.r2_public_url}/{object_key}"
+        # Fallback: use R2.dev subdomain (if public)
+        return f"https://{self.r2_bucket}.r2.dev/{object_key}"
+
     def download_and_upload(self, thumbnail_url: str) -> str:
         """
         Download thumbnail and upload to R2 (all-in-one)
@@ -214,24 +293,36 @@ class ThumbnailProxy:
 
         finally:
             # Cleanup: delete local thumbnail file
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                try:
-                    os.remove(thumbnail_path)
+            if thumbnail_path:
+                with suppress(OSError):
+                    os.unlink(thumbnail_path)
                     logger.debug(f"Cleaned up thumbnail: {thumbnail_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup thumbnail: {e}")
+
+
+# Global instance (reuses the R2 client and its connection pool)
+_proxy: Optional[ThumbnailProxy] = None
+
+
+def get_thumbnail_proxy() -> ThumbnailProxy:
+    """Get or create global thumbnail proxy"""
+    global _proxy
+    if _proxy is None:
+        _proxy = ThumbnailProxy()
+    return _proxy
 
 
 # Convenience function
+@lru_cache(maxsize=2048)
 def proxy_thumbnail_to_r2(thumbnail_url: str) -> str:
     """
     Proxy thumbnail URL to R2 (for CORS-blocked sources)
 
+    Memoized by source URL so retries of the same post skip the GET+PUT.
+
     Args:
         thumbnail_url: Original thumbnail URL
 
     Returns:
         Public URL of R2-hosted thumbnail
     """
-    proxy = ThumbnailProxy()
-    return proxy.download_and_upload(thumbnail_url)
+    return get_thumbnail_proxy().download_and_upload(thumbnail_url)
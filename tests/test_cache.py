@@ -0,0 +1,67 @@
+"""
+Unit tests for RecipeCache
+"""
+import asyncio
+from unittest.mock import patch
+from src.cache import RecipeCache, _cache_key
+
+
+def test_cache_key_is_stable_hash():
+    """Test keys are fixed-length hashes, distinct per URL"""
+    key = _cache_key("https://youtu.be/abc")
+    assert key == _cache_key("https://youtu.be/abc")
+    assert key != _cache_key("https://youtu.be/abd")
+    assert key.startswith("recipe:") and len(key) == len("recipe:") + 32
+
+
+def test_memory_cache_roundtrip():
+    """Test in-process cache returns stored results"""
+    cache = RecipeCache(redis_url=None)
+    recipe = {'name': 'Fried Rice', 'ingredients': []}
+
+    async def run():
+        assert await cache.get("https://youtu.be/abc") is None
+        await cache.set("https://youtu.be/abc", recipe)
+        return await cache.get("https://youtu.be/abc")
+
+    assert asyncio.run(run()) == recipe
+
+
+def test_memory_cache_returns_copies():
+    """Test callers mutating results never change the cached entry"""
+    cache = RecipeCache(redis_url=None)
+    recipe = {'name': 'Fried Rice', 'ingredients': []}
+
+    async def run():
+        await cache.set("https://youtu.be/abc", recipe)
+        recipe['ingredients'].append('rice')
+        (await cache.get("https://youtu.be/abc"))['name'] = 'Changed'
+        return await cache.get("https://youtu.be/abc")
+
+    assert asyncio.run(run()) == {'name': 'Fried Rice', 'ingredients': []}
+
+
+def test_memory_cache_expires():
+    """Test entries past their TTL are treated as misses"""
+    cache = RecipeCache(redis_url=None, ttl_seconds=10)
+
+    async def run():
+        with patch('src.cache.time.monotonic', return_value=100.0):
+            await cache.set("https://youtu.be/abc", {'name': 'Soup'})
+        with patch('src.cache.time.monotonic', return_value=111.0):
+            return await cache.get("https://youtu.be/abc")
+
+    assert asyncio.run(run()) is None
+
+
+def test_memory_cache_evicts_oldest():
+    """Test the in-process cache stays bounded"""
+    cache = RecipeCache(redis_url=None)
+
+    async def run():
+        with patch('src.cache.MEMORY_CACHE_MAX_ENTRIES', 2):
+            for i in range(3):
+                await cache.set(f"https://youtu.be/{i}", {'name': str(i)})
+        return [await cache.get(f"https://youtu.be/{i}") for i in range(3)]
+
+    assert asyncio.run(run()) == [None, {'name': '1'}, {'name': '2'}]
@@ -1,12 +1,13 @@
 """
 Unit tests for VideoDownloader
 """
+import os
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock
-from src.downloader import VideoDownloader, download_video
+from src.downloader import VideoDownloader, download_video, canonicalize_url
 
 
 @pytest.fixture
@@ -17,6 +18,13 @@ def temp_dir():
     shutil.rmtree(temp_path)
 
 
+@pytest.fixture(autouse=True)
+def no_cookie_fetch():
+    """Keep the background cookie prefetch off the network"""
+    with patch('src.downloader.CookiesManager.fetch_cookies_file', return_value=None):
+        yield
+
+
 class TestVideoDownloader:
     """Test VideoDownloader class"""
 
@@ -46,6 +54,13 @@ class TestVideoDownloader:
         with pytest.raises(ValueError, match="Invalid URL"):
             downloader.download("youtube.com/watch?v=test")
 
+    def test_download_invalid_url_no_host(self):
+        """Test download rejects URLs without a hostname"""
+        downloader = VideoDownloader()
+
+        with pytest.raises(ValueError, match="Invalid URL"):
+            downloader.download("https:///watch?v=abc")
+
     @patch('yt_dlp.YoutubeDL')
     def test_download_success(self, mock_ydl_class, temp_dir):
         """Test successful video download"""
@@ -204,6 +219,23 @@ class TestVideoDownloader:
         with pytest.raises(Exception, match="Download succeeded but file not found"):
             downloader.download("https://youtube.com/watch?v=test999")
 
+    @patch('yt_dlp.YoutubeDL')
+    def test_download_uses_requested_filepath(self, mock_ydl_class, temp_dir):
+        """Test yt-dlp's reported filepath wins over the reconstructed path"""
+        merged_path = str(Path(temp_dir) / "video_merged1.mkv")
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = {
+            'id': 'merged1',
+            'ext': 'mp4',
+            'requested_downloads': [{'filepath': merged_path}]
+        }
+        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
+
+        downloader = VideoDownloader(output_dir=temp_dir)
+        video_path, _, _ = downloader.download("https://youtube.com/watch?v=merged1")
+
+        assert video_path == merged_path
+
     @patch('yt_dlp.YoutubeDL')
     def test_download_ydl_error(self, mock_ydl_class, temp_dir):
         """Test download handles yt-dlp permanent errors"""
@@ -236,29 +268,134 @@ class TestVideoDownloader:
         )
         mock_ydl_class.return_value.__enter__.return_value = mock_ydl
 
-        # Create mock photo files
-        photo1 = Path(temp_dir) / "photo1.jpg"
-        photo2 = Path(temp_dir) / "photo2.jpg"
-        photo1.touch()
-        photo2.touch()
+        # Unrelated image from another job in the shared output dir must be ignored
+        (Path(temp_dir) / "other_job.jpg").touch()
 
-        # Mock subprocess (gallery-dl)
-        mock_result = MagicMock()
-        mock_result.returncode = 4  # Partial success (images ok, audio failed)
-        mock_subprocess.return_value = mock_result
+        # Mock subprocess (gallery-dl) writing photos into the directory it was given
+        def run_gallery_dl(cmd, **kwargs):
+            job_dir = Path(cmd[cmd.index('--directory') + 1])
+            (job_dir / "photo1.jpg").write_bytes(b'x' * 10)
+            (job_dir / "photo2.jpg").write_bytes(b'x' * 5)
+            mock_result = MagicMock()
+            mock_result.returncode = 4  # Partial success (images ok, audio failed)
+            return mock_result
+
+        mock_subprocess.side_effect = run_gallery_dl
 
         # Mock thumbnail upload
         mock_upload_thumb.return_value = "https://r2.dev/thumbnails/test.jpg"
 
         # Execute
         downloader = VideoDownloader(output_dir=temp_dir)
-        video_path, thumbnail_url, photo_paths = downloader.download("https://vt.tiktok.com/shorturl/")
+        result = downloader.download("https://vt.tiktok.com/shorturl/")
+        video_path, thumbnail_url, photo_paths = result
 
         # Verify
         assert video_path is None
         assert thumbnail_url is not None  # First photo as thumbnail
         assert photo_paths is not None
         assert len(photo_paths) == 2
+        assert result.photo_bytes == 15  # Sizes collected with the photos
+        assert mock_upload_thumb.call_count == 2  # Every photo uploaded to R2
+
+    @patch.dict('src.downloader._cookie_cache', clear=True)
+    @patch('src.downloader.CookiesManager.fetch_cookies_file')
+    @patch('yt_dlp.YoutubeDL')
+    def test_tier2_reuses_cached_cookies(self, mock_ydl_class, mock_fetch, temp_dir):
+        """Test Tier 2 reuses cookies fetched from R2 across downloads"""
+        import yt_dlp
+
+        cookie_path = Path(temp_dir) / "cookies.txt"
+        cookie_path.touch()
+        mock_fetch.return_value = str(cookie_path)
+
+        def make_ydl(opts):
+            # Tier 1 (no cookies) hits bot detection, Tier 2 (with cookies) succeeds
+            mock_ydl = MagicMock()
+            if 'cookiefile' in opts:
+                mock_ydl.extract_info.return_value = {'id': 'auth123', 'ext': 'mp4', 'thumbnail': None}
+            else:
+                mock_ydl.extract_info.side_effect = yt_dlp.utils.DownloadError(
+                    "Sign in to confirm you're not a bot"
+                )
+            mock_ctx = MagicMock()
+            mock_ctx.__enter__.return_value = mock_ydl
+            return mock_ctx
+
+        mock_ydl_class.side_effect = make_ydl
+        (Path(temp_dir) / "video_auth123.mp4").touch()
+
+        downloader = VideoDownloader(output_dir=temp_dir)
+        for _ in range(2):
+            video_path, _, _ = downloader.download("https://youtube.com/watch?v=auth123")
+            assert video_path == str(Path(temp_dir) / "video_auth123.mp4")
+
+        # Second auth-required download reuses the first R2 fetch
+        mock_fetch.assert_called_once_with('youtube')
+
+        # Each download used (and removed) its own cookies file
+        cookie_files = [c.args[0]['cookiefile'] for c in mock_ydl_class.call_args_list if 'cookiefile' in c.args[0]]
+        assert len(set(cookie_files)) == 2
+        assert not any(os.path.exists(path) for path in cookie_files)
+
+    @patch.dict('src.downloader._cookie_cache', clear=True)
+    @patch('src.downloader.CookiesManager.fetch_cookies_file')
+    @patch('yt_dlp.YoutubeDL')
+    def test_tier2_keeps_cookies_on_non_auth_error(self, mock_ydl_class, mock_fetch, temp_dir):
+        """Test cached cookies are only dropped when Tier 2 fails on auth"""
+        import yt_dlp
+        from src.downloader import _cookie_cache
+
+        cookie_path = Path(temp_dir) / "cookies.txt"
+        cookie_path.write_text("# Netscape HTTP Cookie File\n")
+        mock_fetch.return_value = str(cookie_path)
+
+        def make_ydl(opts):
+            mock_ydl = MagicMock()
+            mock_ydl.extract_info.side_effect = yt_dlp.utils.DownloadError(
+                "Video unavailable" if 'cookiefile' in opts else "Sign in to confirm you're not a bot"
+            )
+            mock_ctx = MagicMock()
+            mock_ctx.__enter__.return_value = mock_ydl
+            return mock_ctx
+
+        mock_ydl_class.side_effect = make_ydl
+
+        downloader = VideoDownloader(output_dir=temp_dir)
+        with pytest.raises(ValueError, match="even with cookies"):
+            downloader.download("https://youtube.com/watch?v=gone123")
+
+        assert 'youtube' in _cookie_cache
+
+    @patch('src.downloader._last_rate_limited_at', None)
+    @patch('yt_dlp.YoutubeDL')
+    def test_cooldown_only_after_rate_limit(self, mock_ydl_class, temp_dir):
+        """Test sleep intervals are skipped on healthy attempts and applied after a 429"""
+        import yt_dlp
+
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.side_effect = yt_dlp.utils.DownloadError("HTTP Error 429: Too Many Requests")
+        mock_ydl_class.return_value.__enter__.return_value = mock_ydl
+
+        downloader = VideoDownloader(output_dir=temp_dir)
+        for _ in range(2):
+            with pytest.raises(ValueError, match="RETRYABLE"):
+                downloader.download("https://youtube.com/watch?v=busy123")
+
+        first_opts, second_opts = (c.args[0] for c in mock_ydl_class.call_args_list)
+        assert 'sleep_interval' not in first_opts
+        assert second_opts['sleep_interval'] == 5
+
+    @patch('src.downloader.proxy_thumbnail_to_r2')
+    def test_process_thumbnail_skips_r2_urls(self, mock_proxy, temp_dir):
+        """Test thumbnails already hosted on R2 are not proxied again"""
+        r2_url = 'https://aizhu-helper-thumbnails.r2.dev/thumbnails/instagram_abc.jpg'
+
+        downloader = VideoDownloader(output_dir=temp_dir)
+        thumbnail_url = downloader._process_thumbnail({'thumbnail': r2_url})
+
+        assert thumbnail_url == r2_url
+        mock_proxy.assert_not_called()
 
 
 class TestConvenienceFunction:
@@ -278,3 +415,30 @@ class TestConvenienceFunction:
         assert thumbnail_url == "https://example.com/thumb.jpg"
         assert photo_paths is None
         mock_method.assert_called_once_with("https://youtube.com/watch?v=test")
+
+
+class TestCanonicalizeUrl:
+    """Test canonical video ids for cache keys"""
+
+    @pytest.mark.parametrize("url", [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+        "https://youtu.be/dQw4w9WgXcQ?si=tracking",
+        "https://youtube.com/shorts/dQw4w9WgXcQ",
+    ])
+    def test_youtube_variants_share_id(self, url):
+        """Test YouTube share/short/mobile links map to one id"""
+        assert canonicalize_url(url) == "youtube:dQw4w9WgXcQ"
+
+    def test_tiktok_and_instagram_ids(self):
+        """Test TikTok video ids and Instagram shortcodes are extracted"""
+        assert canonicalize_url(
+            "https://www.tiktok.com/@chef/video/7301234567890123456?is_from_webapp=1"
+        ) == "tiktok:7301234567890123456"
+        assert canonicalize_url("https://www.instagram.com/reel/C1a2B3c4D5e/?igsh=abc") == "instagram:C1a2B3c4D5e"
+        assert canonicalize_url("https://instagram.com/p/C1a2B3c4D5e/") == "instagram:C1a2B3c4D5e"
+
+    def test_unknown_urls_fall_back_to_url(self):
+        """Test URLs without a recognizable id keep their query but drop the fragment"""
+        assert canonicalize_url("https://VM.TikTok.com/ZMabc/#x") == "https://vm.tiktok.com/ZMabc/"
+        assert canonicalize_url("https://example.com/v?id=1") == "https://example.com/v?id=1"
@@ -1,12 +1,19 @@
 """
 Unit tests for FrameExtractor
 """
+import io
+import subprocess
+import sys
+import time
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock
-from src.extractor import FrameExtractor, extract_key_frames
+from PIL import Image, ImageDraw
+from src.extractor import (
+    FrameExtractor, dedupe_frames, extract_key_frames, _get_video_duration, _stream_mjpeg_frames
+)
 
 
 @pytest.fixture
@@ -40,6 +47,20 @@ def mock_frames(temp_dir):
     return frame_paths
 
 
+# Minimal JPEG: SOI, empty SOS segment, one byte of scan data, EOI
+FAKE_JPEG = b'\xff\xd8\xff\xda\x00\x02x\xff\xd9'
+
+
+def mock_ffmpeg_process(stdout: bytes, returncode: int = 0):
+    """Create a mock Popen process streaming stdout bytes"""
+    process = MagicMock()
+    process.stdout = io.BytesIO(stdout)
+    process.stderr = io.BytesIO(b'')
+    process.wait.return_value = returncode
+    process.poll.return_value = returncode
+    return process
+
+
 class TestFrameExtractor:
     """Test FrameExtractor class"""
 
@@ -48,6 +69,7 @@ class TestFrameExtractor:
         extractor = FrameExtractor()
         assert extractor.max_frames == 180
         assert extractor.quality == 2
+        assert extractor.target_height == 768
 
     def test_init_custom_params(self):
         """Test initialization with custom parameters"""
@@ -55,30 +77,31 @@ class TestFrameExtractor:
         assert extractor.max_frames == 100
         assert extractor.quality == 5
 
-    @patch('subprocess.run')
-    def test_extract_frames_success(self, mock_run, mock_video_file, temp_dir):
+    @patch('subprocess.Popen')
+    def test_extract_frames_success(self, mock_popen, mock_video_file, temp_dir):
         """Test successful frame extraction"""
-        # Setup mock
-        mock_run.return_value = MagicMock(stderr="FFmpeg output", returncode=0)
+        # Setup mock: 12 JPEG frames streamed over stdout
+        mock_popen.return_value = mock_ffmpeg_process(FAKE_JPEG * 12)
 
-        # Create mock output frames
         output_dir = Path(temp_dir) / "output"
-        output_dir.mkdir()
-        for i in range(1, 13):
-            (output_dir / f"frame_{i:04d}.jpg").touch()
 
         extractor = FrameExtractor()
         frames = extractor.extract_frames(mock_video_file, str(output_dir))
 
         # Verify FFmpeg was called
-        mock_run.assert_called_once()
-        call_args = mock_run.call_args[0][0]
+        mock_popen.assert_called_once()
+        call_args = mock_popen.call_args[0][0]
         assert 'ffmpeg' in call_args
         assert '-i' in call_args
-        assert 'fps=1' in call_args
+        video_filter = call_args[call_args.index('-vf') + 1]
+        assert video_filter.startswith('fps=1,')
+        assert 'scale=-2:min(ih\\,768)' in video_filter  # Analysis-sized output
+        assert 'image2pipe' in call_args
 
-        # Verify frames were found
+        # Verify frames were split and written in order
         assert len(frames) == 12
+        assert frames[0] == str(output_dir / "frame_0001.jpg")
+        assert Path(frames[-1]).read_bytes() == FAKE_JPEG
 
     def test_extract_frames_video_not_found(self, temp_dir):
         """Test extraction with non-existent video file"""
@@ -87,17 +110,229 @@ class TestFrameExtractor:
         with pytest.raises(FileNotFoundError, match="Video file not found"):
             extractor.extract_frames("/nonexistent/video.mp4", temp_dir)
 
-    @patch('subprocess.run')
-    def test_extract_frames_ffmpeg_fails(self, mock_run, mock_video_file, temp_dir):
+    @patch('subprocess.Popen')
+    def test_extract_frames_ffmpeg_fails(self, mock_popen, mock_video_file, temp_dir):
         """Test handling of FFmpeg failure"""
         # Mock FFmpeg failure
-        mock_run.side_effect = Exception("FFmpeg error")
+        mock_popen.side_effect = Exception("FFmpeg error")
 
         extractor = FrameExtractor()
 
         with pytest.raises(Exception, match="FFmpeg error"):
             extractor.extract_frames(mock_video_file, temp_dir)
 
+    @patch('src.extractor._FAILED_HWACCELS', set())
+    @patch('subprocess.Popen')
+    def test_extract_frames_hwaccel_fallback(self, mock_popen, mock_video_file, temp_dir):
+        """Test a failed hardware decode is retried with software decoding"""
+        mock_popen.side_effect = [
+            mock_ffmpeg_process(b'', returncode=1),
+            mock_ffmpeg_process(FAKE_JPEG * 2),
+        ]
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames(mock_video_file, temp_dir)
+
+        assert len(frames) == 2
+        first_cmd, retry_cmd = (c.args[0] for c in mock_popen.call_args_list)
+        assert first_cmd.index('-hwaccel') < first_cmd.index('-i')
+        assert '-hwaccel' not in retry_cmd
+
+        # Later extractions go straight to software decoding
+        assert '-hwaccel' not in FrameExtractor()._input_args(mock_video_file)
+
+    @patch('subprocess.run')
+    def test_uniform_frames_single_ffmpeg_pass(self, mock_run, mock_video_file, temp_dir):
+        """Test uniform frames at intervals are extracted with one FFmpeg call"""
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == 'ffmpeg':
+                # Two timestamps fell on the same frame: only 3 written
+                return MagicMock(stderr=b"frame=    1\rframe=    3 fps=0.0 q=2.0 Lsize=N/A", returncode=0)
+            return MagicMock(stdout="10.0\n", returncode=0)
+
+        mock_run.side_effect = fake_run
+
+        extractor = FrameExtractor()
+        frames = extractor._extract_uniform_frames_at_intervals(mock_video_file, temp_dir, count=4)
+
+        ffmpeg_calls = [c for c in mock_run.call_args_list if c.args[0][0] == 'ffmpeg']
+        assert len(ffmpeg_calls) == 1
+        assert frames == [str(Path(temp_dir) / f"hybrid_uniform_{i:04d}.jpg") for i in range(3)]
+
+    @patch('subprocess.run')
+    def test_uniform_frames_long_video_seek_in_parallel(self, mock_run, mock_video_file, temp_dir):
+        """Test widely spaced timestamps use one fast-seek FFmpeg call per frame"""
+        mock_run.return_value = MagicMock(stdout="600.0\n", returncode=0)
+
+        extractor = FrameExtractor()
+        frames = extractor._extract_uniform_frames_at_intervals(mock_video_file, temp_dir, count=4)
+
+        ffmpeg_calls = [c.args[0] for c in mock_run.call_args_list if c.args[0][0] == 'ffmpeg']
+        assert len(ffmpeg_calls) == 4
+        assert all(cmd.index('-ss') < cmd.index('-i') for cmd in ffmpeg_calls)
+        assert frames == [str(Path(temp_dir) / f"hybrid_uniform_{i:04d}.jpg") for i in range(4)]
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_hybrid_single_decode_pass(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test hybrid extraction decodes the video once for both strategies"""
+        mock_run.return_value = MagicMock(stdout="30.0\n", returncode=0)  # ffprobe only
+
+        def fake_popen(cmd, **kwargs):
+            for i in range(4):
+                (Path(temp_dir) / f"hybrid_uniform_{i:04d}.jpg").touch()
+            (Path(temp_dir) / "uniform_times.txt").write_text(''.join(
+                f"frame:{i}    pts:{t * 1000}    pts_time:{t}\nhybrid_uniform=1\n"
+                for i, t in enumerate([6, 12, 18, 24])
+            ))
+            return mock_ffmpeg_process(FAKE_JPEG * 20)
+
+        mock_popen.side_effect = fake_popen
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames_hybrid(mock_video_file, temp_dir, target_count=12)
+
+        mock_popen.assert_called_once()
+        assert '-filter_complex' in mock_popen.call_args.args[0]
+        assert all(c.args[0][0] == 'ffprobe' for c in mock_run.call_args_list)
+        assert len(frames) == 12  # 8 scene + 4 uniform
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_scene_detection_unknown_duration_runs_scene_pass(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test an unreadable duration skips the short-video fast path instead of failing"""
+        mock_run.return_value = MagicMock(stdout="N/A\n", returncode=0)  # ffprobe
+
+        def fake_popen(cmd, **kwargs):
+            (Path(temp_dir) / "scene_times.txt").write_text(''.join(
+                f"frame:{i}    pts:{t * 1000}    pts_time:{t}\nlavfi.scene_score=0.5\n"
+                for i, t in enumerate([2, 4])
+            ))
+            return mock_ffmpeg_process(FAKE_JPEG * 2)
+
+        mock_popen.side_effect = fake_popen
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames_by_scene_detection(mock_video_file, temp_dir, target_count=2)
+
+        cmd = mock_popen.call_args.args[0]
+        assert 'scene' in cmd[cmd.index('-vf') + 1]
+        assert len(frames) == 2
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_scene_detection_short_video_uses_uniform(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test short videos skip the scene-detection pass"""
+        mock_run.return_value = MagicMock(stdout="15.0\n", returncode=0)  # ffprobe
+        mock_popen.return_value = mock_ffmpeg_process(FAKE_JPEG * 12)
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames_by_scene_detection(mock_video_file, temp_dir, target_count=12)
+
+        mock_popen.assert_called_once()
+        cmd = mock_popen.call_args.args[0]
+        assert cmd[cmd.index('-vf') + 1].startswith('fps=12/15.000,')  # Only the kept frames
+        assert len(frames) == 12
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_scene_detection_picks_by_accumulated_change(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test scene candidates are thinned by accumulated score in one pass"""
+        mock_run.return_value = MagicMock(stdout="120.0\n", returncode=0)  # ffprobe only
+        scores = [0.1] * 8 + [0.8] * 4  # Most change near the end
+
+        def fake_popen(cmd, **kwargs):
+            (Path(temp_dir) / "scene_times.txt").write_text(''.join(
+                f"frame:{i}    pts:{i * 10000}    pts_time:{i * 10}\nlavfi.scene_score={score}\n"
+                for i, score in enumerate(scores)
+            ))
+            return mock_ffmpeg_process(FAKE_JPEG * len(scores))
+
+        mock_popen.side_effect = fake_popen
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames_by_scene_detection(mock_video_file, temp_dir, target_count=4)
+
+        mock_popen.assert_called_once()
+        assert all(c.args[0][0] == 'ffprobe' for c in mock_run.call_args_list)  # No supplement pass
+        assert [Path(f).stem for f in frames] == ['scene_0008', 'scene_0009', 'scene_0010', 'scene_0011']
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_scene_detection_supplements_with_uniform(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test too few scene changes are topped up with uniform frames in temporal order"""
+        mock_run.return_value = MagicMock(stdout="120.0\n", returncode=0)  # uniform at 40, 80s
+
+        def fake_popen(cmd, **kwargs):
+            (Path(temp_dir) / "scene_times.txt").write_text(
+                "frame:0 pts:1 pts_time:10\nlavfi.scene_score=0.5\n"
+                "frame:1 pts:2 pts_time:90\nlavfi.scene_score=0.5\n"
+            )
+            return mock_ffmpeg_process(FAKE_JPEG * 2)
+
+        mock_popen.side_effect = fake_popen
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames_by_scene_detection(mock_video_file, temp_dir, target_count=4)
+
+        assert [Path(f).stem for f in frames] == ['scene_0001', 'uniform_0000', 'uniform_0001', 'scene_0002']
+        assert all(Path(f).exists() for f in frames if 'scene_' in f)
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_hybrid_frames_in_temporal_order(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test hybrid frames are ordered by timestamp, not by filename"""
+        mock_run.return_value = MagicMock(stdout="30.0\n", returncode=0)  # uniform at 6, 12, 18, 24s
+        scene_times = [1, 3, 5, 7, 9, 11, 13, 15]
+
+        # The 12s uniform pick was missed: the remaining frames keep their own times
+        uniform_times = [6, 18, 24]
+
+        def fake_popen(cmd, **kwargs):
+            for i in range(len(uniform_times)):
+                (Path(temp_dir) / f"hybrid_uniform_{i:04d}.jpg").touch()
+            (Path(temp_dir) / "uniform_times.txt").write_text(''.join(
+                f"frame:{i}    pts:{t * 1000}    pts_time:{t}\nhybrid_uniform=1\n"
+                for i, t in enumerate(uniform_times)
+            ))
+            (Path(temp_dir) / "scene_times.txt").write_text(''.join(
+                f"frame:{i}    pts:{t * 1000}    pts_time:{t}\nlavfi.scene_score=0.5\n"
+                for i, t in enumerate(scene_times)
+            ))
+            return mock_ffmpeg_process(FAKE_JPEG * len(scene_times))
+
+        mock_popen.side_effect = fake_popen
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_frames_hybrid(mock_video_file, temp_dir, target_count=12)
+
+        names = [Path(f).stem for f in frames]
+        assert names == [
+            'scene_0001', 'scene_0002', 'scene_0003', 'hybrid_uniform_0000',
+            'scene_0004', 'scene_0005', 'scene_0006',
+            'scene_0007', 'scene_0008', 'hybrid_uniform_0001', 'hybrid_uniform_0002',
+        ]
+        assert not (Path(temp_dir) / "scene_times.txt").exists()
+        assert not (Path(temp_dir) / "uniform_times.txt").exists()
+
+    @patch.object(FrameExtractor, 'extract_frames_by_scene_detection')
+    def test_hybrid_without_uniform_share_uses_scene_detection(self, mock_scene, mock_video_file, temp_dir):
+        """Test scene_ratio=1 skips the uniform branch instead of selecting nothing"""
+        mock_scene.return_value = ['scene_0001.jpg']
+
+        extractor = FrameExtractor()
+        assert extractor.extract_frames_hybrid(mock_video_file, temp_dir, 4, scene_ratio=1.0) == ['scene_0001.jpg']
+        mock_scene.assert_called_once_with(mock_video_file, temp_dir, 4)
+
+    @patch('subprocess.run')
+    def test_video_duration_probed_once(self, mock_run, mock_video_file):
+        """Test ffprobe duration is cached for an unchanged file"""
+        mock_run.return_value = MagicMock(stdout="42.5\n", returncode=0)
+
+        assert _get_video_duration(mock_video_file) == 42.5
+        assert _get_video_duration(mock_video_file) == 42.5
+        mock_run.assert_called_once()
+
     def test_select_key_frames_less_than_target(self):
         """Test key frame selection when total frames < target count"""
         extractor = FrameExtractor()
@@ -119,8 +354,8 @@ class TestFrameExtractor:
         # Should return exactly 12 frames
         assert len(selected) == 12
 
-        # Verify even distribution (every 15th frame: 180/12 = 15)
-        expected_indices = [0, 15, 30, 45, 60, 75, 90, 105, 120, 135, 150, 165]
+        # Verify even distribution including both endpoints (step 179/11)
+        expected_indices = [0, 16, 32, 48, 65, 81, 97, 113, 130, 146, 162, 179]
         for i, expected_idx in enumerate(expected_indices):
             assert selected[i] == frames[expected_idx]
 
@@ -131,26 +366,106 @@ class TestFrameExtractor:
 
         assert selected == []
 
-    @patch.object(FrameExtractor, 'extract_frames')
-    @patch.object(FrameExtractor, 'select_key_frames')
-    def test_extract_and_select(self, mock_select, mock_extract, mock_video_file, temp_dir):
-        """Test combined extract and select workflow"""
-        # Setup mocks
-        all_frames = [f"frame_{i:04d}.jpg" for i in range(1, 181)]
-        key_frames = all_frames[::15]  # Every 15th frame
-
-        mock_extract.return_value = all_frames
-        mock_select.return_value = key_frames
+    @patch.object(FrameExtractor, 'extract_n_frames')
+    def test_extract_and_select(self, mock_extract_n, mock_video_file, temp_dir):
+        """Test uniform extract-and-select asks FFmpeg for exactly the key frames"""
+        key_frames = [f"frame_{i:04d}.jpg" for i in range(1, 13)]
+        mock_extract_n.return_value = key_frames
 
         # Execute
         extractor = FrameExtractor()
         result = extractor.extract_and_select(mock_video_file, temp_dir, key_frame_count=12)
 
         # Verify workflow
-        mock_extract.assert_called_once_with(mock_video_file, temp_dir)
-        mock_select.assert_called_once_with(all_frames, 12)
+        mock_extract_n.assert_called_once_with(mock_video_file, temp_dir, 12)
         assert result == key_frames
 
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_extract_n_frames(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test extract_n_frames encodes only the requested frames"""
+        mock_run.return_value = MagicMock(stdout="120.0\n", returncode=0)  # ffprobe
+        mock_popen.return_value = mock_ffmpeg_process(FAKE_JPEG * 12)
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_n_frames(mock_video_file, temp_dir, 12)
+
+        cmd = mock_popen.call_args.args[0]
+        assert cmd[cmd.index('-vf') + 1].startswith('fps=12/120.000,')
+        assert cmd[cmd.index('-frames:v') + 1] == '12'
+        assert len(frames) == 12
+
+    @patch('subprocess.Popen')
+    @patch('subprocess.run')
+    def test_extract_n_frame_bytes(self, mock_run, mock_popen, mock_video_file, temp_dir):
+        """Test in-memory extraction returns JPEG bytes without writing files"""
+        mock_run.return_value = MagicMock(stdout="120.0\n", returncode=0)  # ffprobe
+        mock_popen.return_value = mock_ffmpeg_process(FAKE_JPEG * 12)
+
+        extractor = FrameExtractor()
+        frames = extractor.extract_n_frame_bytes(mock_video_file, 12)
+
+        assert frames == [FAKE_JPEG] * 12
+        assert list(Path(temp_dir).iterdir()) == [Path(mock_video_file)]
+
+
+class TestStreamMjpegFrames:
+    """Test FFmpeg MJPEG pipe reading"""
+
+    @patch('subprocess.Popen')
+    def test_splits_frames(self, mock_popen):
+        """Test concatenated JPEGs are yielded one by one"""
+        mock_popen.return_value = mock_ffmpeg_process(FAKE_JPEG * 3)
+        assert list(_stream_mjpeg_frames(['ffmpeg'])) == [FAKE_JPEG] * 3
+
+    @patch('src.extractor._MJPEG_MAX_FRAME_BYTES', 1024)
+    @patch('subprocess.Popen')
+    def test_non_jpeg_output_fails_instead_of_buffering(self, mock_popen):
+        """Test output that never completes a frame stops at the buffer cap"""
+        mock_popen.return_value = mock_ffmpeg_process(b'\xff\xd8\xff\xe0\x00\x10' + b'x' * 4096)
+        with pytest.raises(subprocess.CalledProcessError):
+            list(_stream_mjpeg_frames(['ffmpeg']))
+
+    def test_stalled_process_killed_at_deadline(self):
+        """Test a process that never writes is killed and reported as a timeout"""
+        cmd = [sys.executable, '-c', 'import time; time.sleep(30)']
+        start = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            list(_stream_mjpeg_frames(cmd, timeout=0.5))
+        assert time.monotonic() - start < 10
+
+
+def make_jpeg(box_x: int) -> bytes:
+    """Encode a small test frame with a dark box at box_x"""
+    img = Image.new('RGB', (320, 240), (200, 200, 200))
+    ImageDraw.Draw(img).rectangle((box_x, 60, box_x + 100, 180), fill=(20, 20, 20))
+    buffered = io.BytesIO()
+    img.save(buffered, format='JPEG', quality=90)
+    return buffered.getvalue()
+
+
+class TestDedupeFrames:
+    """Test near-duplicate frame removal"""
+
+    def test_collapses_consecutive_duplicates(self):
+        """Test a static shot keeps one frame and order is preserved"""
+        first, second = make_jpeg(20), make_jpeg(200)
+
+        assert dedupe_frames([first, first, first, second]) == [first, second]
+
+    def test_keeps_return_to_earlier_shot(self):
+        """Test only consecutive duplicates are dropped"""
+        first, second = make_jpeg(20), make_jpeg(200)
+
+        assert dedupe_frames([first, second, first]) == [first, second, first]
+
+    def test_reads_paths_and_keeps_unreadable_frames(self, temp_dir):
+        """Test frame paths are hashed and undecodable frames are kept"""
+        path = Path(temp_dir) / "frame.jpg"
+        path.write_bytes(make_jpeg(20))
+
+        assert dedupe_frames([str(path), str(path), b'not a jpeg']) == [str(path), b'not a jpeg']
+
 
 class TestConvenienceFunction:
     """Test convenience function"""
@@ -0,0 +1,75 @@
+"""
+Unit tests for AnalysisCache
+"""
+import json
+from unittest.mock import patch
+from src.llm_cache import AnalysisCache, analysis_cache_key, video_analysis_cache_key
+
+RESULT = {'recipe': {'name': 'Fried Rice', 'ingredients': []}, 'usage_metadata': {'provider': 'gemini'}}
+
+
+def test_cache_key_depends_on_frame_content_and_order(tmp_path):
+    """Test keys hash frame bytes (not paths) in order"""
+    a, b = tmp_path / "a.jpg", tmp_path / "b.jpg"
+    a.write_bytes(b'frame-a')
+    b.write_bytes(b'frame-b')
+
+    key = analysis_cache_key([str(a), str(b)])
+    assert key == analysis_cache_key([b'frame-a', b'frame-b'])
+    assert key != analysis_cache_key([b'frame-b', b'frame-a'])
+    assert key != analysis_cache_key([b'frame-a', b'frame-b'], thumbnail="https://r2.dev/t.jpg")
+    # Length prefixes keep frame boundaries significant
+    assert analysis_cache_key([b'ab', b'c']) != analysis_cache_key([b'a', b'bc'])
+
+
+def test_video_cache_key_depends_on_video_and_settings(tmp_path):
+    """Test video keys change with file content and extraction settings"""
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b'video-a')
+
+    key = video_analysis_cache_key(str(video), 8, 'scene')
+    assert key == video_analysis_cache_key(str(video), 8, 'scene')
+    assert key != video_analysis_cache_key(str(video), 9, 'scene')
+    assert key != video_analysis_cache_key(str(video), 8, 'uniform')
+
+    video.write_bytes(b'video-b')
+    assert key != video_analysis_cache_key(str(video), 8, 'scene')
+
+
+def test_cache_roundtrip(tmp_path):
+    """Test stored results are returned from disk"""
+    cache = AnalysisCache(cache_dir=str(tmp_path))
+    key = analysis_cache_key([b'frame'])
+
+    assert cache.get(key) is None
+    cache.put(key, RESULT)
+    assert cache.get(key) == RESULT
+    assert AnalysisCache(cache_dir=str(tmp_path)).get(key) == RESULT  # Shared across instances
+
+
+def test_cache_expires(tmp_path):
+    """Test entries past their TTL are treated as misses and removed"""
+    cache = AnalysisCache(cache_dir=str(tmp_path), ttl_seconds=10)
+    key = analysis_cache_key([b'frame'])
+
+    with patch('src.llm_cache.time.time', return_value=100.0):
+        cache.put(key, RESULT)
+    with patch('src.llm_cache.time.time', return_value=111.0):
+        assert cache.get(key) is None
+    assert not list(tmp_path.rglob('*.json'))
+
+
+def test_cache_drops_malformed_entries(tmp_path):
+    """Test unreadable or incomplete entries are evicted"""
+    cache = AnalysisCache(cache_dir=str(tmp_path))
+    key = analysis_cache_key([b'frame'])
+    path = tmp_path / key[:2] / f"{key}.json"
+    path.parent.mkdir(parents=True)
+
+    path.write_text(json.dumps({'recipe': {'name': 'x'}}))  # No usage_metadata/ts
+    assert cache.get(key) is None
+    assert not path.exists()
+
+    path.write_text('{not json')
+    assert cache.get(key) is None
+    assert not path.exists()
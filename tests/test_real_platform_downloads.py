@@ -8,6 +8,7 @@ import os
 import sys
 from pathlib import Path
 import tempfile
+from concurrent.futures import Future
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -273,6 +274,8 @@ class TestPlatformDetection:
         """Test other platform detection (TikTok, etc.)"""
         assert downloader._detect_platform('https://www.tiktok.com/@user/video/123') == 'other'
         assert downloader._detect_platform('https://vt.tiktok.com/abc/') == 'other'
+        assert downloader._detect_platform('https://youtu.be.evil.com/abc') == 'other'
+        assert downloader._detect_platform('https://example.com/?next=youtube.com') == 'other'
 
 
 class TestErrorHandling:
@@ -352,6 +355,23 @@ class TestDownloadResult:
         assert thumbnail_url == "https://example.com/thumb.jpg"
         assert photo_paths is None
 
+    def test_download_result_pending_thumbnail(self):
+        """Test thumbnail_url resolves a background thumbnail Future"""
+        future = Future()
+        result = DownloadResult.with_pending_thumbnail("/path/to/video.mp4", future)
+
+        future.set_result("https://example.com/thumb.jpg")
+
+        _, thumbnail_url, _ = result
+        assert thumbnail_url == "https://example.com/thumb.jpg"
+
+    def test_download_result_immutable(self):
+        """Test DownloadResult is frozen"""
+        result = DownloadResult(video_path="/path/to/video.mp4")
+
+        with pytest.raises(AttributeError):
+            result.video_path = "/other.mp4"
+
 
 # Manual test runner for quick verification
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+"""
+Unit tests for streaming_extractor yt-dlp metadata parsing
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from src.streaming_extractor import StreamingError, _parse_printed_metadata, get_video_metadata_only
+
+
+def test_parse_single_url():
+    """Test one value per line, JSON-quoted title and a single format URL"""
+    stdout = (
+        "61.5\nFalse\nhttps://i.ytimg.com/vi/abc/hq.jpg\nhttps://www.youtube.com/watch?v=abc\n"
+        '"Fried rice\\nin 5 minutes"\nhttps://rr1.googlevideo.com/videoplayback?id=1\n'
+    )
+    assert _parse_printed_metadata(stdout) == {
+        'duration': 61.5,
+        'is_live': False,
+        'thumbnail': 'https://i.ytimg.com/vi/abc/hq.jpg',
+        'webpage_url': 'https://www.youtube.com/watch?v=abc',
+        'title': 'Fried rice\nin 5 minutes',
+        'stream_url': 'https://rr1.googlevideo.com/videoplayback?id=1',
+    }
+
+
+def test_parse_merged_formats_uses_video_url():
+    """Test merged formats (one URL per line) yield the first (video) URL"""
+    stdout = (
+        "120\nFalse\nNA\nhttps://www.youtube.com/watch?v=abc\n\"Ramen\"\n"
+        "https://example.com/video.mp4\nhttps://example.com/audio.m4a\n"
+    )
+    metadata = _parse_printed_metadata(stdout)
+    assert metadata['duration'] == 120.0
+    assert metadata['stream_url'] == 'https://example.com/video.mp4'
+
+
+def test_parse_missing_fields():
+    """Test 'NA' values become None and live streams are flagged"""
+    metadata = _parse_printed_metadata("NA\nTrue\nNA\nNA\nNA\nNA\n")
+    assert metadata == {
+        'duration': None,
+        'is_live': True,
+        'thumbnail': None,
+        'webpage_url': None,
+        'title': None,
+        'stream_url': None,
+    }
+
+
+def test_parse_truncated_output():
+    """Test output with too few lines is rejected"""
+    with pytest.raises(StreamingError):
+        _parse_printed_metadata("61.5\nFalse\n")
+
+
+@patch('src.streaming_extractor._write_metadata_cache')
+@patch('src.streaming_extractor._read_metadata_cache', return_value=None)
+@patch('subprocess.run')
+def test_metadata_prints_fields_instead_of_dumping_json(mock_run, mock_read, mock_write):
+    """Test the default lookup asks yt-dlp for the printed fields only"""
+    mock_run.return_value = MagicMock(
+        returncode=0, stdout='30\nFalse\nNA\nNA\n"Soup"\nhttps://example.com/v.mp4\n'
+    )
+
+    metadata = get_video_metadata_only("https://youtu.be/abc")
+
+    cmd = mock_run.call_args.args[0]
+    assert '--dump-json' not in cmd and '--print' in cmd
+    assert metadata['title'] == 'Soup'
+    mock_write.assert_called_once_with('metadata', "https://youtu.be/abc", metadata)